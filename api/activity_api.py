@@ -4,6 +4,7 @@ from flask_login import login_required, current_user
 from db_models import UserActivityLog
 from database import db
 from datetime import datetime
+from utils.rollups import activity_totals, logged_activity
 
 ns = Namespace('activity', description='Universal Activity Logging')
 
@@ -44,16 +45,12 @@ class ActivityStats(Resource):
     @login_required
     def get(self):
         """Get summary stats for the current user's activities"""
-        logs = UserActivityLog.query.filter_by(user_id=current_user.id).order_by(UserActivityLog.timestamp.desc()).limit(100).all()
-        
-        # Simple aggregation for summary
+        # Summed from the daily rollup rather than loading log rows
+        totals = logged_activity(activity_totals(current_user.id))
         stats = {
-            'total_logs': len(logs),
-            'by_type': {},
-            'total_duration': sum((l.duration or 0) for l in logs)
+            'total_logs': sum(count for count, _ in totals.values()),
+            'by_type': {activity_type: count for activity_type, (count, _) in totals.items()},
+            'total_duration': sum(duration for _, duration in totals.values())
         }
-        
-        for l in logs:
-            stats['by_type'][l.activity_type] = stats['by_type'].get(l.activity_type, 0) + 1
             
         return stats, 200
@@ -4,6 +4,7 @@ from db_models import User, ChatSession
 from sqlalchemy import and_
 from datetime import datetime, timedelta
 from database import db
+from utils.rollups import activity_totals, logged_activity
 
 ns = Namespace('analytics', description='Platform analytics')
 
@@ -12,18 +13,11 @@ class UserTrends(Resource):
     @login_required
     def get(self):
         """Get mood and activity trends for the current user"""
-        from db_models import UserActivityLog, Assessment
-        from sqlalchemy import func
+        from db_models import Assessment
         
-        # Last 7 days activity counts
+        # Last 7 days activity counts (daily rollup)
         seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        activity_counts = db.session.query(
-            UserActivityLog.activity_type, 
-            func.count(UserActivityLog.id)
-        ).filter(
-            UserActivityLog.user_id == current_user.id,
-            UserActivityLog.timestamp >= seven_days_ago
-        ).group_by(UserActivityLog.activity_type).all()
+        activity_counts = logged_activity(activity_totals(current_user.id, since=seven_days_ago.date()))
         
         # Severity trends from assessments
         assessments = Assessment.query.filter(
@@ -31,7 +25,7 @@ class UserTrends(Resource):
         ).order_by(Assessment.completed_at.asc()).limit(10).all()
         
         return {
-            'activity_distribution': {k: v for k, v in activity_counts},
+            'activity_distribution': {k: count for k, (count, _) in activity_counts.items()},
             'severity_history': [
                 {
                     'date': a.completed_at.strftime('%Y-%m-%d'),
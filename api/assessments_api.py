@@ -7,6 +7,8 @@ from utils import get_assessment_questions, get_assessment_options, calculate_ph
 import json
 from datetime import datetime
 from utils.common import generate_analysis
+from utils.rate_limiter import rate_limit
+from utils.pagination import keyset_page, page_headers
 
 ns = Namespace('assessments', description='Mental health assessments and results')
 
@@ -19,8 +21,10 @@ submission_model = ns.model('AssessmentSubmission', {
 class Assessments(Resource):
     @login_required
     def get(self):
-        """List user assessments history"""
-        assessments = Assessment.query.filter_by(user_id=current_user.id).order_by(Assessment.completed_at.desc()).all()
+        """List user assessments history (newest first, paginated with ?limit=&cursor=)"""
+        assessments, next_cursor = keyset_page(
+            Assessment.query.filter_by(user_id=current_user.id), Assessment.completed_at, Assessment.id
+        )
         return [
             {
                 'id': a.id,
@@ -29,9 +33,10 @@ class Assessments(Resource):
                 'severity': a.severity_level,
                 'date': a.completed_at.isoformat()
             } for a in assessments
-        ], 200
+        ], 200, page_headers(next_cursor)
 
     @login_required
+    @rate_limit('assessments')
     @ns.expect(submission_model)
     def post(self):
         """Submit a new assessment"""
@@ -73,10 +78,6 @@ class Assessments(Resource):
         db.session.add(log)
         db.session.commit()
         
-        # Invalidate Dashboard Cache
-        from api.dashboard_api import invalidate_dashboard_cache
-        invalidate_dashboard_cache(current_user.id)
-        
         return {
             'id': assessment.id,
             'assessment_type': a_type,
@@ -87,6 +88,7 @@ class Assessments(Resource):
 @ns.route('/<int:assessment_id>/pdf')
 class AssessmentPDF(Resource):
     @login_required
+    @rate_limit('assessments')
     def get(self, assessment_id):
         """Get assessment PDF - accessible by counsellors with patient access"""
         from io import BytesIO
@@ -235,6 +237,7 @@ class AssessmentPDF(Resource):
 @ns.route('/export/<int:assessment_id>')
 class ExportAssessmentPDF(Resource):
     @login_required
+    @rate_limit('assessments')
     def get(self, assessment_id):
         """Export assessment result as PDF with counsellor-detailed analysis (legacy endpoint)"""
         from io import BytesIO
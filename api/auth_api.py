@@ -6,10 +6,16 @@ from datetime import datetime, timedelta
 from database import db, r_streaks, r_sessions
 from utils.common import update_user_streak
 from utils.upload_service import upload_profile_picture
+from utils.cache_events import on_event
 import json
 
 ns = Namespace('auth', description='Authentication operations')
 
+@on_event('user.updated')
+def drop_profile_cache(event):
+    """load_user() caches the profile in Redis; any committed change to the row drops it"""
+    r_sessions.delete(f"user_profile:{event['user_id']}")
+
 login_model = ns.model('Login', {
     'username': fields.String(required=True, description='Username'),
     'password': fields.String(required=True, description='Password')
@@ -250,15 +256,9 @@ class Profile(Resource):
         if 'accommodation_type' in data:
             user.accommodation_type = data['accommodation_type']
             
+        # Profile and dashboard caches are dropped by the user.updated event on commit
         db.session.commit()
         
-        # Invalidate profile cache so it re-fetches with new details
-        r_sessions.delete(f"user_profile:{user.id}")
-        
-        # Also invalidate dashboard cache so the top-right profile pic updates
-        from api.dashboard_api import invalidate_dashboard_cache
-        invalidate_dashboard_cache(user.id)
-        
         return {
             'message': 'Profile updated successfully',
             'username': user.username,
@@ -301,9 +301,6 @@ class Onboarding(Resource):
         user.is_onboarded = True
         db.session.commit()
         
-        # Invalidate cache
-        r_sessions.delete(f"user_profile:{user.id}")
-        
         return {
             'message': 'Onboarding completed successfully',
             'is_onboarded': True
@@ -1,8 +1,8 @@
-from flask import request
+from flask import request, Response, stream_with_context
 from flask_restx import Namespace, Resource, fields
 from flask_login import login_required, current_user
 from db_models import ChatSession, ChatMessage, ChatIntent, CrisisAlert
-from database import db, cache
+from database import db
 import requests
 from ollama import Client
 import json
@@ -12,21 +12,32 @@ import redis
 import time
 import os
 import sys
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'models'))
-from json_sanitizer import extract_json
+from json_sanitizer import extract_json, validate_intent, INTENT_SCHEMA, JsonObjectStream, ReplyTextStream
 from flask import current_app
 
 r_context = redis.from_url(f"{os.environ.get('REDIS_URL', 'redis://localhost:6379')}/3")
 r_streaks = redis.from_url(f"{os.environ.get('REDIS_URL', 'redis://localhost:6379')}/4")
 from utils.common import update_user_streak
+from utils.crisis_lexicon import scan_crisis_terms, matched_terms, has_crisis_terms
+from utils.response_cache import response_cache
+from utils.intent_batcher import get_intent_batcher
+from models.llm_client import get_llm_client, CircuitOpenError
+from utils.redis_batch import RedisBatch
+from utils.rate_limiter import rate_limit
+from utils.chat_writer import ChatWriteBuffer
+from utils.pagination import keyset_page, page_headers
+
+# Worker pool for concurrent Ollama calls (pipelined chat mode)
+llm_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('LLM_PIPELINE_WORKERS', 8)), thread_name_prefix='llm')
 
 @celery.task
-def save_chat_message(session_id, message_type, content, crisis_detected=False):
+def save_chat_message(session_id, message_type, content, crisis_detected=False, crisis_keywords=None):
     from app import app
     from database import db
     with app.app_context():
-        msg = ChatMessage(session_id=session_id, message_type=message_type, content=content)
+        msg = ChatMessage(session_id=session_id, message_type=message_type, content=content, crisis_keywords=crisis_keywords)
         db.session.add(msg)
         if crisis_detected and message_type == 'bot':
             chat_session = ChatSession.query.get(session_id)
@@ -131,359 +142,424 @@ chat_response_model = ns.model('ChatResponse', {
     'session_id': fields.Integer()
 })
 
+CRISIS_INTENT = {
+    'emotional_state': 'numb',
+    'intent_type': 'reassurance',
+    'emotional_intensity': 'critical',
+    'help_receptivity': 'seeking',
+    'cognitive_load': 'high',
+    'self_harm_crisis': 'true'
+}
+CRISIS_REPLY = "मैं यहाँ हूं तुम्हारे लिए। कृपया किसी से बात करो - परिवार, दोस्त, या हमारे counsellor से। You're not alone, and help is available. 💚"
+
+# Fixed replies (their audio is pre-warmed in utils/audio_cache)
+DEFAULT_BOT_MESSAGE = "I'm here to listen."
+FALLBACK_REPLIES = {
+    'anxious': "I understand you're feeling anxious. Let's take it one step at a time. Try some deep breathing.",
+    'low': "I hear you. It's okay to feel low sometimes. I'm here to listen and support you.",
+    'frustrated': "It sounds like you're frustrated. Would you like to vent about what's bothering you?",
+    'neutral': "I'm here to listen and support you. How are you feeling today?",
+}
+
+# 429 body for the chat endpoints (limits: 'chatbot' in utils/rate_limiter.RATE_LIMITS)
+CHAT_RATE_LIMITED = {'response': "You're sending messages too fast. Please take a deep breath.", 'crisis_detected': False}
+
+def load_chat_turn_state(session_id):
+    """Context window for the session. Returns (context_key, chat_history)."""
+    context_key = f"chat_context:{session_id}"
+    history_raw = r_context.get(context_key)
+    return context_key, json.loads(history_raw) if history_raw else []
+
+def update_chat_context(context_key, chat_history, user_message, bot_message, batch=None):
+    """Append the turn to the Redis context window (keep last 4); queued on the request batch when given"""
+    chat_history.append({'role': 'user', 'content': user_message})
+    chat_history.append({'role': 'bot', 'content': bot_message})
+    (batch.pipeline(r_context) if batch else r_context).setex(context_key, 3600, json.dumps(chat_history[-4:]))
+
+def flush_redis_batch(batch):
+    try:
+        batch.flush()
+    except Exception as e:
+        current_app.logger.error(f"Failed to flush Redis writes: {e}")
+
+def parse_intent_output(intent_raw):
+    """Parse intent_classifier output into a dict"""
+    try:
+        intent_data = json.loads(intent_raw)
+    except json.JSONDecodeError as e:
+        current_app.logger.warning(f"⚠️ Intent JSON parse error: {e}. Using extract_json fallback.")
+        # Model often adds a summary / example objects around the JSON: take the first full intent object
+        intent_data = extract_json(intent_raw, INTENT_SCHEMA) or extract_json(intent_raw) or {}
+    problems = validate_intent(intent_data) if isinstance(intent_data, dict) else ['not an object']
+    if problems:
+        current_app.logger.warning(f"⚠️ Intent output off-schema: {', '.join(problems)}")
+    return intent_data if isinstance(intent_data, dict) else {}
+
+def parse_convo_output(convo_raw):
+    """Parse convo_LLM output into (bot_message, suggested_feature)"""
+    try:
+        reply_json = json.loads(convo_raw)
+    except json.JSONDecodeError:
+        reply_json = extract_json(convo_raw) or {}
+    
+    bot_message = reply_json.get('response') or reply_json.get('bot_message') or convo_raw
+    return bot_message, reply_json.get('suggested_feature', None)
+
+def suggest_assessment_for_intent(intent_data):
+    """ASSESSMENT SUGGESTION LOGIC for non-crisis intents"""
+    emotional_state = intent_data.get('emotional_state', 'neutral')
+    emotional_intensity = intent_data.get('emotional_intensity', 'mild')
+    help_receptivity = intent_data.get('help_receptivity', 'passive')
+    intent_type = intent_data.get('intent_type', 'casual_chat')
+    cognitive_load = intent_data.get('cognitive_load', 'medium')
+    
+    # PHQ-9: Depression screening (sad, low, numb)
+    if emotional_state in ['sad', 'numb', 'low'] and emotional_intensity in ['moderate', 'high']:
+        return 'PHQ-9'
+    # GAD-7: Anxiety screening (anxious, stressed, overwhelmed)
+    elif emotional_state in ['anxious', 'stressed', 'overwhelmed'] and emotional_intensity in ['moderate', 'high']:
+        return 'GAD-7'
+    # GHQ: General health for critical cases
+    elif emotional_intensity == 'critical':
+        return 'GHQ'
+    # Inkblot: For emotional numbness, dissociation, difficulty expressing, complex trauma
+    elif (emotional_state == 'numb' and emotional_intensity in ['moderate', 'high']) or \
+         (help_receptivity == 'resistant' and emotional_intensity == 'high') or \
+         (intent_type in ['reflection', 'venting'] and emotional_state in ['numb', 'frustrated', 'angry'] and cognitive_load == 'high'):
+        return 'Inkblot'
+    return None
+
+def keyword_fallback(user_message, crisis_matches=None):
+    """
+    KEYWORD-BASED FALLBACK (No Ollama needed)
+    Returns (intent_data, bot_message, suggested_feature, suggested_assessment, crisis_detected)
+    """
+    msg_lower = user_message.lower()
+    if crisis_matches is None:
+        crisis_matches = scan_crisis_terms(user_message)
+    
+    if has_crisis_terms(crisis_matches):
+        return dict(CRISIS_INTENT), CRISIS_REPLY, 'VR Meditation', 'GHQ', True
+    elif any(word in msg_lower for word in ['anxious', 'anxiety', 'panic', 'nervous', 'ghabrahat', 'tension']):
+        intent_data = {
+            'emotional_state': 'anxious',
+            'intent_type': 'grounding',
+            'emotional_intensity': 'moderate',
+            'help_receptivity': 'seeking',
+            'cognitive_load': 'medium',
+            'self_harm_crisis': 'false'
+        }
+        return intent_data, FALLBACK_REPLIES['anxious'], 'AR Breathing', 'GAD-7', False
+    elif any(word in msg_lower for word in ['sad', 'depressed', 'low', 'nahi lagra', 'bad', 'udaas']):
+        intent_data = {
+            'emotional_state': 'low',
+            'intent_type': 'reassurance',
+            'emotional_intensity': 'moderate',
+            'help_receptivity': 'open',
+            'cognitive_load': 'medium',
+            'self_harm_crisis': 'false'
+        }
+        return intent_data, FALLBACK_REPLIES['low'], 'Piano Relaxation', 'PHQ-9', False
+    elif any(word in msg_lower for word in ['angry', 'frustrated', 'irritate', 'gussa']):
+        intent_data = {
+            'emotional_state': 'frustrated',
+            'intent_type': 'venting',
+            'emotional_intensity': 'moderate',
+            'help_receptivity': 'resistant',
+            'cognitive_load': 'high',
+            'self_harm_crisis': 'false'
+        }
+        return intent_data, FALLBACK_REPLIES['frustrated'], 'Sound Venting', None, False
+    
+    intent_data = {
+        'emotional_state': 'neutral',
+        'intent_type': 'casual_chat',
+        'emotional_intensity': 'mild',
+        'help_receptivity': 'open',
+        'cognitive_load': 'low',
+        'self_harm_crisis': 'false'
+    }
+    return intent_data, FALLBACK_REPLIES['neutral'], 'Nature Sounds', None, False
+
+def get_ollama_models():
+    """Get this process's Ollama client and the models from app config"""
+    ollama_client = current_app.config.get('OLLAMA_CLIENT_FACTORY', get_llm_client)()
+    return (
+        ollama_client,
+        current_app.config.get('INTENT_MODEL', 'intent_classifier:latest'),
+        current_app.config.get('CONVO_MODEL', 'convo_LLM:latest')
+    )
+
+def is_pipelined_mode():
+    return current_app.config.get('CHAT_PIPELINE_MODE', 'sequential') == 'pipelined'
+
+def submit_intent_classification(ollama_client, intent_model, user_message):
+    """Future for the intent_classifier response (micro-batched when INTENT_BATCHING is on)"""
+    if current_app.config.get('INTENT_BATCHING'):
+        return get_intent_batcher(ollama_client, intent_model, current_app.config).submit(user_message)
+    return llm_executor.submit(ollama_client.generate, model=intent_model, prompt=user_message, stream=False,
+                               timeout=current_app.config.get('OLLAMA_INTENT_TIMEOUT'))
+
+def generate_chat_reply(user_message, crisis_matches=None):
+    """
+    Run the 2-tier Ollama pipeline for one message.
+
+    sequential: intent_classifier first, then convo_LLM conditioned on the intent JSON.
+    pipelined:  convo_LLM starts on the raw message in parallel with intent classification.
+                The speculative reply is kept unless the turn turns out to be a crisis, in
+                which case it is swapped for the hard-coded crisis reply (keyword override)
+                or re-generated with the intent JSON (model-detected crisis).
+
+    Returns (intent_data, bot_message, suggested_feature, suggested_assessment, crisis_detected).
+    Raises if Ollama is unavailable so callers can use keyword_fallback().
+    """
+    ollama_client, intent_model, convo_model = get_ollama_models()
+    if crisis_matches is None:
+        crisis_matches = scan_crisis_terms(user_message)
+    keyword_crisis_detected = has_crisis_terms(crisis_matches)
+
+    # Keyword crises never use the convo reply, so don't speculate on them
+    convo_future = None
+    if is_pipelined_mode() and not keyword_crisis_detected:
+        convo_future = llm_executor.submit(ollama_client.generate, model=convo_model, prompt=user_message, stream=False,
+                                           timeout=current_app.config.get('OLLAMA_CONVO_TIMEOUT'))
+
+    # STEP 1: Intent Classification
+    current_app.logger.info(f"🔍 Classifying intent for: {user_message[:50]}...")
+    if current_app.config.get('INTENT_BATCHING'):
+        intent_resp = get_intent_batcher(ollama_client, intent_model, current_app.config).classify(user_message)
+    else:
+        intent_resp = ollama_client.generate(
+            model=intent_model,
+            prompt=user_message,
+            stream=False,
+            timeout=current_app.config.get('OLLAMA_INTENT_TIMEOUT')
+        )
+    intent_raw = intent_resp['response'].strip()
+    current_app.logger.info(f"📊 Intent response: {intent_raw[:100]}...")
+
+    intent_data = parse_intent_output(intent_raw)
+    crisis_detected = str(intent_data.get('self_harm_crisis', 'false')).lower() == 'true'
+
+    if keyword_crisis_detected and not crisis_detected:
+        current_app.logger.warning(f"⚠️ CRISIS OVERRIDE: Ollama missed crisis keywords {matched_terms(crisis_matches)} in message!")
+        # Override Ollama's classification
+        intent_data.update(CRISIS_INTENT)
+        return intent_data, CRISIS_REPLY, 'VR Meditation', 'GHQ', True
+
+    # STEP 2: Generate Conversation Response
+    if convo_future is not None and not crisis_detected:
+        current_app.logger.info(f"💬 Using speculative convo_LLM response")
+        convo_resp = convo_future.result()
+    else:
+        if convo_future is not None:
+            # Speculative reply ignored a crisis intent: re-generate with it
+            current_app.logger.warning(f"⚠️ Discarding speculative reply for crisis intent")
+            convo_future.cancel()
+        current_app.logger.info(f"💬 Generating response with convo_LLM")
+        convo_resp = ollama_client.generate(
+            model=convo_model,
+            prompt=user_message + "\n" + intent_raw,
+            stream=False,
+            timeout=current_app.config.get('OLLAMA_CONVO_TIMEOUT')
+        )
+    convo_raw = convo_resp['response'].strip()
+    current_app.logger.info(f"🤖 Convo response: {convo_raw[:100]}...")
+
+    bot_message, suggested_feature = parse_convo_output(convo_raw)
+    current_app.logger.info(f"✅ Parsed - Feature: {suggested_feature}")
+
+    suggested_assessment = None if crisis_detected else suggest_assessment_for_intent(intent_data)
+    return intent_data, bot_message, suggested_feature, suggested_assessment, crisis_detected
+
+def persist_chat_turn(session_id, user_id, user_message, bot_message, intent_data_dict,
+                      suggested_feature, suggested_assessment, crisis_detected, writes):
+    """Save the bot message and the intent analysis (crisis turns are saved synchronously)"""
+    writes.add_message(session_id, 'bot', bot_message, crisis_detected)
+
+    # Save the turn, intent analysis and crisis alert SYNCHRONOUSLY if crisis detected
+    # (write-behind buffer for non-crisis to avoid delays)
+    if crisis_detected:
+        try:
+            current_app.logger.warning(f"🚨 CRISIS DETECTED - Saving alert SYNCHRONOUSLY for user {user_id}")
+            
+            # Extract fields from intent_data
+            emotional_state = intent_data_dict.get('emotional_state')
+            intent_type = intent_data_dict.get('intent_type')
+            emotional_intensity = intent_data_dict.get('emotional_intensity')
+            cognitive_load = intent_data_dict.get('cognitive_load')
+            help_receptivity = intent_data_dict.get('help_receptivity')
+            
+            # This turn's messages go in the same transaction as the alert
+            writes.write_to_session()
+
+            # Save ChatIntent for analytics
+            chat_intent = ChatIntent(
+                session_id=session_id,
+                user_id=user_id,
+                user_message=user_message,
+                intent_data=intent_data_dict,
+                emotional_state=emotional_state,
+                intent_type=intent_type,
+                emotional_intensity=emotional_intensity,
+                cognitive_load=cognitive_load,
+                help_receptivity=help_receptivity,
+                self_harm_crisis=crisis_detected,
+                suggested_feature=suggested_feature,
+                suggested_assessment=suggested_assessment
+            )
+            db.session.add(chat_intent)
+            db.session.flush()  # Get intent ID
+            
+            # Create CrisisAlert
+            severity = 'critical' if emotional_intensity == 'critical' else 'high'
+            crisis_alert = CrisisAlert(
+                user_id=user_id,
+                session_id=session_id,
+                intent_id=chat_intent.id,
+                alert_type='self_harm',
+                severity=severity,
+                message_snippet=user_message[:200],
+                intent_summary={
+                    'emotional_state': emotional_state,
+                    'emotional_intensity': emotional_intensity,
+                    'intent_type': intent_type
+                }
+            )
+            db.session.add(crisis_alert)
+            
+            # Update ChatSession crisis flag
+            chat_session = ChatSession.query.get(session_id)
+            if chat_session:
+                chat_session.crisis_flag = True
+            
+            db.session.commit()
+            writes.clear()
+            current_app.logger.warning(f"✅ CRISIS ALERT SAVED: ID={crisis_alert.id}, Severity={severity}, User={user_id}")
+            
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"❌ Failed to save crisis alert synchronously: {e}")
+    else:
+        # Non-crisis: bulk-inserted by the write-behind flusher
+        writes.add_intent(session_id, user_id, user_message, intent_data_dict, suggested_feature, suggested_assessment)
+
+def lookup_cached_response(user_message, is_potential_crisis, batch=None):
+    """Exact or near-duplicate cached reply; crisis-screened messages always bypass the cache"""
+    stats_pipe = batch.pipeline(response_cache.redis) if batch else None
+    if is_potential_crisis:
+        response_cache.record_bypass(stats_pipe)
+        return None
+    try:
+        cached_response, kind = response_cache.get(user_message, stats_pipe)
+    except Exception as e:
+        current_app.logger.error(f"Response cache lookup failed: {e}")
+        return None
+    if cached_response:
+        current_app.logger.info(f"💾 Cache {'NEAR-HIT' if kind == 'near_hit' else 'HIT'} for message")
+    else:
+        current_app.logger.info(f"💾 Cache MISS for message")
+    return cached_response
+
+def cache_chat_response(user_message, response_data, intent_data, crisis_detected, is_potential_crisis, batch=None):
+    """Cache response for non-crisis messages (TTL depends on intent_type)"""
+    pipe = batch.pipeline(response_cache.redis) if batch else None
+    try:
+        if not crisis_detected and not is_potential_crisis:
+            response_cache.set(user_message, response_data, (intent_data or {}).get('intent_type'), pipe)
+            current_app.logger.info(f"💾 Cached response (intent: {(intent_data or {}).get('intent_type')})")
+        else:
+            # Clear any existing cache for crisis messages
+            response_cache.invalidate(user_message, pipe)
+            current_app.logger.info(f"🚨 Cache CLEARED for crisis message")
+    except Exception as e:
+        current_app.logger.error(f"Response cache update failed: {e}")
+
+def get_or_create_chat_session(session_id):
+    if not session_id:
+        chat_session = ChatSession(user_id=current_user.id)
+        db.session.add(chat_session)
+        db.session.commit()
+        return chat_session.id
+    ChatSession.query.get_or_404(session_id)
+    return session_id
+
+def sse_event(event, data):
+    """Format one Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @ns.route('/chat')
 class Chat(Resource):
     @login_required
+    @rate_limit('chatbot', body=CHAT_RATE_LIMITED)
     @ns.expect(chat_message_model)
     @ns.marshal_with(chat_response_model)
     def post(self):
         """Send a message to the AI chatbot"""
         data = ns.payload
         user_message = data.get('message')
-        session_id = data.get('session_id')
-        
-        if not session_id:
-            chat_session = ChatSession(user_id=current_user.id)
-            db.session.add(chat_session)
-            db.session.commit()
-            session_id = chat_session.id
-        else:
-            chat_session = ChatSession.query.get_or_404(session_id)
-
-        # Rate Limiting: Max 10 messages per minute
-        rate_limit_key = f"chat_limit:{current_user.id}"
-        count = r_context.get(rate_limit_key)
-        if count and int(count) >= 10:
-            return {
-                'response': "You're sending messages too fast. Please take a deep breath.",
-                'crisis_detected': False,
-                'session_id': session_id
-            }, 429
-        r_context.incr(rate_limit_key)
-        if not count: r_context.expire(rate_limit_key, 60)
+        session_id = get_or_create_chat_session(data.get('session_id'))
 
         # Context Management (Redis)
-        context_key = f"chat_context:{session_id}"
-        history_raw = r_context.get(context_key)
-        chat_history = json.loads(history_raw) if history_raw else []
+        context_key, chat_history = load_chat_turn_state(session_id)
+
+        # Writes nobody reads back this request go out together at the end
+        batch = RedisBatch()
 
-        # Save user message asynchronously
-        save_chat_message.delay(session_id, 'user', user_message)
+        # Crisis lexicon screen (one pass; drives cache bypass, override and fallback)
+        crisis_matches = scan_crisis_terms(user_message)
+        is_potential_crisis = bool(crisis_matches)
+
+        # Save user message (write-behind, with the rest of the turn)
+        writes = ChatWriteBuffer()
+        writes.add_message(session_id, 'user', user_message, crisis_keywords=matched_terms(crisis_matches) or None)
         
         # Redis Streak Update
         update_user_streak(r_streaks, current_user)
         
-        bot_message = "I'm here to listen."
+        bot_message = DEFAULT_BOT_MESSAGE
         crisis_detected = False
         suggested_feature = None  # Feature from catalog (breathing, venting, etc.)
         suggested_assessment = None  # Assessment type (PHQ-9, GAD-7, GHQ, Inkblot)
         intent_json_str = '{}' # Store intent JSON for response
 
         # Check cache for similar messages (non-crisis only)
-        msg_hash = hashlib.md5(user_message.lower().strip().encode()).hexdigest()
-        cache_key = f"chatbot_resp:{msg_hash}"
-        
-        # Quick crisis keyword check (don't use cache for crisis) - EXPANDED LIST
-        crisis_keywords = [
-            'kill', 'suicide', 'die', 'end my life', 'harm myself', 'khudkushi',
-            'marna', 'marna hai', 'nahi jeena', 'mar jaunga', 'marr jaunga',
-            'jaan dena', 'suicide karna', 'hurt myself', 'want to die',
-            'no reason to live', 'better off dead', 'can\'t go on', 'give up',
-            'sos', 'help me please', 'emergency'
-        ]
-        is_potential_crisis = any(kw in user_message.lower() for kw in crisis_keywords)
-        
-        if not is_potential_crisis:
-            cached_response = cache.get(cache_key)
-            if cached_response:
-                current_app.logger.info(f"💾 Cache HIT for message hash: {msg_hash[:8]}...")
-                # Save user message
-                save_chat_message.delay(session_id, 'user', user_message)
-                # Save cached bot message
-                save_chat_message.delay(session_id, 'bot', cached_response['response'], cached_response.get('crisis_detected', False))
-                # Update Redis context
-                chat_history.append({'role': 'user', 'content': user_message})
-                chat_history.append({'role': 'bot', 'content': cached_response['response']})
-                r_context.setex(context_key, 3600, json.dumps(chat_history[-4:]))
-                
-                return {
-                    **cached_response,
-                    'session_id': session_id
-                }
-            else:
-                current_app.logger.info(f"💾 Cache MISS for message hash: {msg_hash[:8]}...")
+        cached_response = lookup_cached_response(user_message, is_potential_crisis, batch)
+        if cached_response:
+            # Save cached bot message (user message is already buffered)
+            writes.add_message(session_id, 'bot', cached_response['response'], cached_response.get('crisis_detected', False))
+            writes.flush()
+            # Update Redis context
+            update_chat_context(context_key, chat_history, user_message, cached_response['response'], batch)
+            flush_redis_batch(batch)
+            
+            return {
+                **cached_response,
+                'session_id': session_id
+            }
 
         # Main Logic: Use Direct Ollama Models from app.config (2-tier system)
         try:
-            # Get Ollama client and models from app config
-            ollama_client = current_app.config.get('OLLAMA_CLIENT')
-            intent_model = current_app.config.get('INTENT_MODEL', 'intent_classifier:latest')
-            convo_model = current_app.config.get('CONVO_MODEL', 'convo_LLM:latest')
-            
-            if not ollama_client:
-                raise Exception("Ollama client not configured in app.config")
-            
-            # STEP 1: Intent Classification
-            current_app.logger.info(f"🔍 Classifying intent for: {user_message[:50]}...")
-            intent_resp = ollama_client.generate(
-                model=intent_model,
-                prompt=user_message,
-                stream=False
-            )
-            intent_raw = intent_resp['response'].strip()
-            current_app.logger.info(f"📊 Intent response: {intent_raw[:100]}...")
-            
-            # Parse intent JSON
-            try:
-                intent_data = json.loads(intent_raw)
-            except json.JSONDecodeError as e:
-                current_app.logger.warning(f"⚠️ Intent JSON parse error: {e}. Using extract_json fallback.")
-                intent_data = extract_json(intent_raw) or {}
-            
+            intent_data, bot_message, suggested_feature, suggested_assessment, crisis_detected = generate_chat_reply(user_message, crisis_matches)
             intent_json_str = json.dumps(intent_data) if intent_data else '{}'
-            crisis_detected = str(intent_data.get('self_harm_crisis', 'false')).lower() == 'true'
-            
-            # STEP 2: Generate Conversation Response
-            current_app.logger.info(f"💬 Generating response with convo_LLM")
-            convo_resp = ollama_client.generate(
-                model=convo_model,
-                prompt=user_message + "\n" + intent_raw,
-                stream=False
-            )
-            convo_raw = convo_resp['response'].strip()
-            current_app.logger.info(f"🤖 Convo response: {convo_raw[:100]}...")
-            
-            # Parse conversation response
-            try:
-                reply_json = json.loads(convo_raw)
-            except json.JSONDecodeError:
-                reply_json = extract_json(convo_raw) or {}
-            
-            bot_message = reply_json.get('response') or reply_json.get('bot_message') or convo_raw
-            suggested_feature = reply_json.get('suggested_feature', None)
-            
-            current_app.logger.info(f"✅ Parsed - Feature: {suggested_feature}")
-            
-            # CRISIS KEYWORD SAFETY CHECK (Override Ollama if crisis keywords detected)
-            msg_lower = user_message.lower()
-            crisis_keywords = [
-                'suicide', 'kill myself', 'end my life', 'want to die', 'khudkushi', 
-                'marna', 'marna hai', 'nahi jeena', 'mar jaunga', 'marr jaunga', 
-                'jaan dena', 'suicide karna', 'harm myself', 'hurt myself',
-                'no reason to live', 'better off dead', 'can\'t go on', 'give up',
-                'sos', 'help me please', 'emergency'
-            ]
-            
-            keyword_crisis_detected = any(kw in msg_lower for kw in crisis_keywords)
-            
-            if keyword_crisis_detected and not crisis_detected:
-                current_app.logger.warning(f"⚠️ CRISIS OVERRIDE: Ollama missed crisis keywords in message!")
-                # Override Ollama's classification
-                intent_data['emotional_state'] = 'numb'
-                intent_data['emotional_intensity'] = 'critical'
-                intent_data['self_harm_crisis'] = 'true'
-                intent_data['help_receptivity'] = 'seeking'
-                intent_data['cognitive_load'] = 'high'
-                intent_data['intent_type'] = 'reassurance'
-                
-                bot_message = "मैं यहाँ हूं तुम्हारे लिए। कृपया किसी से बात करो - परिवार, दोस्त, या हमारे counsellor से। You're not alone, and help is available. 💚"
-                suggested_feature = 'VR Meditation'
-                suggested_assessment = 'GHQ'
-                crisis_detected = True
-                intent_json_str = json.dumps(intent_data)
-            
-            # ASSESSMENT SUGGESTION LOGIC (Skip if already set by crisis override)
-            emotional_state = intent_data.get('emotional_state', 'neutral')
-            emotional_intensity = intent_data.get('emotional_intensity', 'mild')
-            help_receptivity = intent_data.get('help_receptivity', 'passive')
-            intent_type = intent_data.get('intent_type', 'casual_chat')
-            cognitive_load = intent_data.get('cognitive_load', 'medium')
-            
-            if not crisis_detected:  # Only suggest if not already crisis-triggered
-                # PHQ-9: Depression screening (sad, low, numb)
-                if emotional_state in ['sad', 'numb', 'low'] and emotional_intensity in ['moderate', 'high']:
-                    suggested_assessment = 'PHQ-9'
-                # GAD-7: Anxiety screening (anxious, stressed, overwhelmed)
-                elif emotional_state in ['anxious', 'stressed', 'overwhelmed'] and emotional_intensity in ['moderate', 'high']:
-                    suggested_assessment = 'GAD-7'
-                # GHQ: General health for critical cases
-                elif emotional_intensity == 'critical':
-                    suggested_assessment = 'GHQ'
-                # Inkblot: For emotional numbness, dissociation, difficulty expressing, complex trauma
-                elif (emotional_state == 'numb' and emotional_intensity in ['moderate', 'high']) or \
-                     (help_receptivity == 'resistant' and emotional_intensity == 'high') or \
-                     (intent_type in ['reflection', 'venting'] and emotional_state in ['numb', 'frustrated', 'angry'] and cognitive_load == 'high'):
-                    suggested_assessment = 'Inkblot'
-                
+        except CircuitOpenError:
+            current_app.logger.warning("⚡ Ollama circuit open. Using keyword-based detection.")
+            intent_data, bot_message, suggested_feature, suggested_assessment, crisis_detected = keyword_fallback(user_message, crisis_matches)
+            intent_json_str = json.dumps(intent_data)
         except Exception as ollama_error:
-            # KEYWORD-BASED FALLBACK (No Ollama needed)
             current_app.logger.error(f"❌ Ollama not available: {ollama_error}. Using keyword-based detection.")
-            
-            msg_lower = user_message.lower()
-            
-            # Crisis detection keywords (English + Hindi/Hinglish)
-            crisis_keywords = [
-                'suicide', 'kill myself', 'end my life', 'want to die', 'khudkushi', 
-                'marna', 'marna hai', 'nahi jeena', 'mar jaunga', 'marr jaunga', 
-                'jaan dena', 'suicide karna', 'harm myself', 'hurt myself',
-                'no reason to live', 'better off dead', 'can\'t go on', 'give up',
-                'sos', 'help me', 'emergency'
-            ]
-            
-            is_crisis = any(kw in msg_lower for kw in crisis_keywords)
-            
-            # Keyword-based classification
-            if is_crisis:
-                intent_data = {
-                    'emotional_state': 'numb',
-                    'intent_type': 'reassurance',
-                    'emotional_intensity': 'critical',
-                    'help_receptivity': 'seeking',
-                    'cognitive_load': 'high',
-                    'self_harm_crisis': 'true'
-                }
-                bot_message = "मैं यहाँ हूं तुम्हारे लिए। कृपया किसी से बात करो - परिवार, दोस्त, या हमारे counsellor से। You're not alone, and help is available. 💚"
-                suggested_feature = 'VR Meditation'
-                suggested_assessment = 'GHQ'
-                crisis_detected = True
-            elif any(word in msg_lower for word in ['anxious', 'anxiety', 'panic', 'nervous', 'ghabrahat', 'tension']):
-                intent_data = {
-                    'emotional_state': 'anxious',
-                    'intent_type': 'grounding',
-                    'emotional_intensity': 'moderate',
-                    'help_receptivity': 'seeking',
-                    'cognitive_load': 'medium',
-                    'self_harm_crisis': 'false'
-                }
-                bot_message = "I understand you're feeling anxious. Let's take it one step at a time. Try some deep breathing."
-                suggested_feature = 'AR Breathing'
-                suggested_assessment = 'GAD-7'
-                crisis_detected = False
-            elif any(word in msg_lower for word in ['sad', 'depressed', 'low', 'nahi lagra', 'bad', 'udaas']):
-                intent_data = {
-                    'emotional_state': 'low',
-                    'intent_type': 'reassurance',
-                    'emotional_intensity': 'moderate',
-                    'help_receptivity': 'open',
-                    'cognitive_load': 'medium',
-                    'self_harm_crisis': 'false'
-                }
-                bot_message = "I hear you. It's okay to feel low sometimes. I'm here to listen and support you."
-                suggested_feature = 'Piano Relaxation'
-                suggested_assessment = 'PHQ-9'
-                crisis_detected = False
-            elif any(word in msg_lower for word in ['angry', 'frustrated', 'irritate', 'gussa']):
-                intent_data = {
-                    'emotional_state': 'frustrated',
-                    'intent_type': 'venting',
-                    'emotional_intensity': 'moderate',
-                    'help_receptivity': 'resistant',
-                    'cognitive_load': 'high',
-                    'self_harm_crisis': 'false'
-                }
-                bot_message = "It sounds like you're frustrated. Would you like to vent about what's bothering you?"
-                suggested_feature = 'Sound Venting'
-                suggested_assessment = None
-                crisis_detected = False
-            else:
-                intent_data = {
-                    'emotional_state': 'neutral',
-                    'intent_type': 'casual_chat',
-                    'emotional_intensity': 'mild',
-                    'help_receptivity': 'open',
-                    'cognitive_load': 'low',
-                    'self_harm_crisis': 'false'
-                }
-                bot_message = "I'm here to listen and support you. How are you feeling today?"
-                suggested_feature = 'Nature Sounds'
-                suggested_assessment = None
-                crisis_detected = False
-            
+            intent_data, bot_message, suggested_feature, suggested_assessment, crisis_detected = keyword_fallback(user_message, crisis_matches)
             intent_json_str = json.dumps(intent_data)
 
-        # Save bot message asynchronously
-        save_chat_message.delay(session_id, 'bot', bot_message, crisis_detected)
-        
-        # Save intent analysis and create crisis alert SYNCHRONOUSLY if crisis detected
-        # (Async for non-crisis to avoid delays)
-        if crisis_detected:
-            try:
-                intent_data_dict = json.loads(intent_json_str) if intent_json_str else {}
-                current_app.logger.warning(f"🚨 CRISIS DETECTED - Saving alert SYNCHRONOUSLY for user {current_user.id}")
-                
-                # Extract fields from intent_data
-                emotional_state = intent_data_dict.get('emotional_state')
-                intent_type = intent_data_dict.get('intent_type')
-                emotional_intensity = intent_data_dict.get('emotional_intensity')
-                cognitive_load = intent_data_dict.get('cognitive_load')
-                help_receptivity = intent_data_dict.get('help_receptivity')
-                
-                # Save ChatIntent for analytics
-                chat_intent = ChatIntent(
-                    session_id=session_id,
-                    user_id=current_user.id,
-                    user_message=user_message,
-                    intent_data=intent_data_dict,
-                    emotional_state=emotional_state,
-                    intent_type=intent_type,
-                    emotional_intensity=emotional_intensity,
-                    cognitive_load=cognitive_load,
-                    help_receptivity=help_receptivity,
-                    self_harm_crisis=crisis_detected,
-                    suggested_feature=suggested_feature,
-                    suggested_assessment=suggested_assessment
-                )
-                db.session.add(chat_intent)
-                db.session.flush()  # Get intent ID
-                
-                # Create CrisisAlert
-                severity = 'critical' if emotional_intensity == 'critical' else 'high'
-                crisis_alert = CrisisAlert(
-                    user_id=current_user.id,
-                    session_id=session_id,
-                    intent_id=chat_intent.id,
-                    alert_type='self_harm',
-                    severity=severity,
-                    message_snippet=user_message[:200],
-                    intent_summary={
-                        'emotional_state': emotional_state,
-                        'emotional_intensity': emotional_intensity,
-                        'intent_type': intent_type
-                    }
-                )
-                db.session.add(crisis_alert)
-                
-                # Update ChatSession crisis flag
-                chat_session = ChatSession.query.get(session_id)
-                if chat_session:
-                    chat_session.crisis_flag = True
-                
-                db.session.commit()
-                current_app.logger.warning(f"✅ CRISIS ALERT SAVED: ID={crisis_alert.id}, Severity={severity}, User={current_user.id}")
-                
-            except Exception as e:
-                db.session.rollback()
-                current_app.logger.error(f"❌ Failed to save crisis alert synchronously: {e}")
-        else:
-            # Non-crisis: use async task (Celery)
-            try:
-                intent_data_dict = json.loads(intent_json_str) if intent_json_str else {}
-                save_intent_and_alert.delay(
-                    session_id=session_id,
-                    user_id=current_user.id,
-                    user_message=user_message,
-                    intent_data=intent_data_dict,
-                    suggested_feature=suggested_feature,
-                    suggested_assessment=suggested_assessment,
-                    crisis_detected=crisis_detected
-                )
-            except Exception as e:
-                current_app.logger.error(f"Failed to queue intent/alert save: {e}")
+        persist_chat_turn(
+            session_id, current_user.id, user_message, bot_message,
+            json.loads(intent_json_str) if intent_json_str else {},
+            suggested_feature, suggested_assessment, crisis_detected, writes
+        )
+        writes.flush()
         
         # Update Redis context
-        chat_history.append({'role': 'user', 'content': user_message})
-        chat_history.append({'role': 'bot', 'content': bot_message})
-        r_context.setex(context_key, 3600, json.dumps(chat_history[-4:])) # Keep last 4
+        update_chat_context(context_key, chat_history, user_message, bot_message, batch)
         
         response_data = {
             'response': bot_message,
@@ -495,30 +571,212 @@ class Chat(Resource):
             'session_id': session_id
         }
         
-        # Cache response for non-crisis messages (10 min TTL)
-        if not crisis_detected and not is_potential_crisis:
-            cache.set(cache_key, response_data, timeout=600)
-            current_app.logger.info(f"💾 Cached response for hash: {msg_hash[:8]}... (TTL: 10min)")
-        elif crisis_detected or is_potential_crisis:
-            # Clear any existing cache for crisis messages
-            cache.delete(cache_key)
-            current_app.logger.info(f"🚨 Cache CLEARED for crisis message hash: {msg_hash[:8]}")
+        cache_chat_response(user_message, response_data, json.loads(intent_json_str), crisis_detected, is_potential_crisis, batch)
+        flush_redis_batch(batch)
         
         return response_data
 
 
+def stream_chat_turn(session_id, user_id, user_message, context_key, chat_history, crisis_matches, writes, frame=sse_event):
+    """
+    Generator behind /chat/stream. Emits SSE frames:
+      session -> {session_id}
+      token   -> {delta}  (convo_LLM reply text as it is generated)
+      done    -> same payload as /chat (authoritative reply, intent JSON, crisis flags)
+    frame(event, data) builds each item (the voice socket takes plain tuples).
+    If the client disconnects mid-stream the turn is still generated and persisted.
+    """
+    connected = True
+    yield frame('session', {'session_id': session_id})
+
+    is_potential_crisis = bool(crisis_matches)
+    batch = RedisBatch()
+
+    cached_response = lookup_cached_response(user_message, is_potential_crisis, batch)
+    if cached_response:
+        writes.add_message(session_id, 'bot', cached_response['response'], cached_response.get('crisis_detected', False))
+        writes.flush()
+        update_chat_context(context_key, chat_history, user_message, cached_response['response'], batch)
+        flush_redis_batch(batch)
+        yield frame('token', {'delta': cached_response['response']})
+        yield frame('done', {**cached_response, 'session_id': session_id})
+        return
+
+    bot_message = DEFAULT_BOT_MESSAGE
+    suggested_feature = None
+    suggested_assessment = None
+    crisis_detected = False
+
+    try:
+        ollama_client, intent_model, convo_model = get_ollama_models()
+        keyword_crisis_detected = has_crisis_terms(crisis_matches)
+        speculative = is_pipelined_mode() and not keyword_crisis_detected
+
+        intent_future = submit_intent_classification(ollama_client, intent_model, user_message)
+        intent_raw = None
+        intent_data = {}
+
+        def resolve_intent():
+            raw = intent_future.result()['response'].strip()
+            data = parse_intent_output(raw)
+            return raw, data, str(data.get('self_harm_crisis', 'false')).lower() == 'true'
+
+        if not speculative:
+            # STEP 1: Intent Classification (convo prompt depends on it)
+            intent_raw, intent_data, crisis_detected = resolve_intent()
+
+        if intent_raw is not None and keyword_crisis_detected and not crisis_detected:
+            # Decide the override before streaming so no LLM text is shown and then retracted
+            current_app.logger.warning(f"⚠️ CRISIS OVERRIDE: Ollama missed crisis keywords {matched_terms(crisis_matches)} in message!")
+            intent_data.update(CRISIS_INTENT)
+            bot_message = CRISIS_REPLY
+            suggested_feature = 'VR Meditation'
+            suggested_assessment = 'GHQ'
+            crisis_detected = True
+        else:
+            # STEP 2: Stream the conversation response. In pipelined mode tokens are
+            # held back until the intent result clears the turn as non-crisis.
+            convo_prompt = user_message if speculative else user_message + "\n" + intent_raw
+            while True:
+                reply_stream = ReplyTextStream()
+                json_stream = JsonObjectStream()
+                convo_parts = []
+                held = []
+                regenerate = False
+                chunks = ollama_client.generate(model=convo_model, prompt=convo_prompt, stream=True,
+                                                timeout=current_app.config.get('OLLAMA_CONVO_TIMEOUT'))
+                for chunk in chunks:
+                    token = chunk.get('response', '')
+                    convo_parts.append(token)
+                    delta = reply_stream.feed(token)
+                    if delta:
+                        held.append(delta)
+                    json_stream.feed(token)
+                    if intent_raw is None and intent_future.done():
+                        intent_raw, intent_data, crisis_detected = resolve_intent()
+                        if crisis_detected:
+                            regenerate = True
+                            break
+                    if intent_raw is not None and held and connected:
+                        try:
+                            yield frame('token', {'delta': ''.join(held)})
+                        except GeneratorExit:
+                            # Client went away: finish generation so the turn is still saved
+                            connected = False
+                        held = []
+                    if json_stream.done:
+                        # Reply object is complete: don't pay for any trailing text
+                        break
+                chunks.close()
+
+                if intent_raw is None:
+                    intent_raw, intent_data, crisis_detected = resolve_intent()
+                    regenerate = crisis_detected
+                if not regenerate:
+                    break
+                current_app.logger.warning(f"⚠️ Discarding speculative reply for crisis intent")
+                convo_prompt = user_message + "\n" + intent_raw
+
+            if held and connected:
+                try:
+                    yield frame('token', {'delta': ''.join(held)})
+                except GeneratorExit:
+                    connected = False
+
+            bot_message, suggested_feature = parse_convo_output(json_stream.raw or ''.join(convo_parts).strip())
+            if not crisis_detected:
+                suggested_assessment = suggest_assessment_for_intent(intent_data)
+
+    except CircuitOpenError:
+        current_app.logger.warning("⚡ Ollama circuit open. Using keyword-based detection.")
+        intent_data, bot_message, suggested_feature, suggested_assessment, crisis_detected = keyword_fallback(user_message, crisis_matches)
+    except Exception as ollama_error:
+        current_app.logger.error(f"❌ Ollama not available: {ollama_error}. Using keyword-based detection.")
+        intent_data, bot_message, suggested_feature, suggested_assessment, crisis_detected = keyword_fallback(user_message, crisis_matches)
+
+    intent_data = intent_data or {}
+    persist_chat_turn(session_id, user_id, user_message, bot_message, intent_data,
+                      suggested_feature, suggested_assessment, crisis_detected, writes)
+    writes.flush()
+    update_chat_context(context_key, chat_history, user_message, bot_message, batch)
+
+    response_data = {
+        'response': bot_message,
+        'crisis_detected': crisis_detected,
+        'sos': crisis_detected,
+        'intent_json': json.dumps(intent_data),
+        'suggested_feature': suggested_feature,
+        'suggested_assessment': suggested_assessment,
+        'session_id': session_id
+    }
+    cache_chat_response(user_message, response_data, intent_data, crisis_detected, is_potential_crisis, batch)
+    flush_redis_batch(batch)
+
+    if connected:
+        yield frame('done', response_data)
+
+
+def start_chat_turn(user_message, session_id=None, frame=sse_event):
+    """Record current_user's message and return the stream_chat_turn generator answering it"""
+    session_id = get_or_create_chat_session(session_id)
+    context_key, chat_history = load_chat_turn_state(session_id)
+
+    crisis_matches = scan_crisis_terms(user_message)
+    writes = ChatWriteBuffer()
+    writes.add_message(session_id, 'user', user_message, crisis_keywords=matched_terms(crisis_matches) or None)
+    # Enqueue the student's message now: a client that disconnects mid-reply still keeps it
+    writes.flush()
+    update_user_streak(r_streaks, current_user)
+    return stream_chat_turn(session_id, current_user.id, user_message, context_key, chat_history, crisis_matches, writes, frame)
+
+
+@ns.route('/chat/stream')
+class ChatStream(Resource):
+    @login_required
+    @rate_limit('chatbot', body=CHAT_RATE_LIMITED)
+    @ns.expect(chat_message_model)
+    def post(self):
+        """Send a message to the AI chatbot and stream the reply as Server-Sent Events"""
+        data = ns.payload
+        return Response(
+            stream_with_context(start_chat_turn(data.get('message'), data.get('session_id'))),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+
 @ns.route('/history')
 class ChatHistory(Resource):
     @login_required
     def get(self):
-        """Get full chat history for the user"""
-        sessions = ChatSession.query.filter_by(user_id=current_user.id).order_by(ChatSession.session_start.desc()).all()
-        history = []
-        for s in sessions:
-            messages = ChatMessage.query.filter_by(session_id=s.id).order_by(ChatMessage.timestamp.asc()).all()
-            history.append({
-                'session_id': s.id,
-                'start_time': s.session_start.isoformat(),
-                'messages': [{'role': m.message_type, 'content': m.content, 'time': m.timestamp.isoformat()} for m in messages]
-            })
-        return history
+        """Get chat history for the user, newest session first (paginated with ?limit=&cursor=)"""
+        sessions, next_cursor = keyset_page(
+            ChatSession.query.filter_by(user_id=current_user.id), ChatSession.session_start, ChatSession.id
+        )
+        # Messages for the whole page in one query
+        messages_by_session = {s.id: [] for s in sessions}
+        if sessions:
+            for m in ChatMessage.query.filter(ChatMessage.session_id.in_(messages_by_session)).order_by(
+                ChatMessage.timestamp.asc(), ChatMessage.id.asc()
+            ):
+                messages_by_session[m.session_id].append(m)
+        history = [{
+            'session_id': s.id,
+            'start_time': s.session_start.isoformat(),
+            'messages': [{'role': m.message_type, 'content': m.content, 'time': m.timestamp.isoformat()} for m in messages_by_session[s.id]]
+        } for s in sessions]
+        return history, 200, page_headers(next_cursor)
+
+
+@ns.route('/cache-stats')
+class ChatCacheStats(Resource):
+    @login_required
+    def get(self):
+        """Response cache hit / near-hit / miss counters (Admin only)"""
+        if current_user.role != 'admin':
+            return {'message': 'Access denied'}, 403
+        try:
+            return response_cache.stats(), 200
+        except Exception as e:
+            current_app.logger.error(f"Failed to read cache stats: {e}")
+            return {'message': 'Cache stats unavailable'}, 503
@@ -5,6 +5,8 @@ from db_models import AvailabilitySlot, ConsultationRequest, User
 from database import db
 from datetime import datetime
 from utils.email_service import send_consultation_request_email, send_consultation_status_email
+from utils.pagination import keyset_page, page_headers
+from sqlalchemy.orm import joinedload
 
 ns = Namespace('consultation', description='Consultation booking and availability')
 
@@ -182,12 +184,15 @@ class BookSlot(Resource):
 class MyRequests(Resource):
     @login_required
     def get(self):
-        """Get current user's consultation requests"""
-        requests = ConsultationRequest.query.filter_by(user_id=current_user.id).order_by(ConsultationRequest.created_at.desc()).all()
+        """Get current user's consultation requests (newest first, paginated with ?limit=&cursor=)"""
+        requests, next_cursor = keyset_page(
+            ConsultationRequest.query.options(joinedload(ConsultationRequest.counsellor)).filter_by(user_id=current_user.id),
+            ConsultationRequest.created_at, ConsultationRequest.id
+        )
         return [
             {
                 'id': r.id,
-                'counsellor_name': User.query.get(r.counsellor_id).full_name if r.counsellor_id else 'TBD',
+                'counsellor_name': r.counsellor.full_name if r.counsellor else 'TBD',
                 'status': r.status,
                 'sessionDateTime': r.session_datetime.isoformat() if r.session_datetime else None,
                 'createdAt': r.created_at.isoformat(),
@@ -196,7 +201,7 @@ class MyRequests(Resource):
                 'contactPreference': r.contact_preference,
                 'meetingLink': r.chat_video_link
             } for r in requests
-        ], 200
+        ], 200, page_headers(next_cursor)
 
 @ns.route('/counsellor/requests')
 class CounsellorRequests(Resource):
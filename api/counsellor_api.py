@@ -1,9 +1,17 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_login import login_required, current_user
-from db_models import User, UserActivityLog, Assessment, ChatSession, CrisisAlert, ChatIntent, ConsultationRequest, MeditationSession, VentingPost, InkblotResult
+from db_models import User, UserActivityLog, Assessment, ChatSession, CrisisAlert, ChatIntent, ConsultationRequest, MeditationSession, VentingPost, InkblotResult, StudentRiskSnapshot
 from database import db
 from datetime import datetime, timedelta
+from utils.cache_aside import cached_value, tagged_key, bump_tags
+from utils.cache_events import on_event
+from utils.batch_loader import BatchLoader, run_sections
+from utils.student_status import crisis_session_users
+from utils.risk_snapshot import rolled_counts, RETENTION_DAYS
+from utils.pagination import keyset_page, page_headers
+from sqlalchemy.orm import joinedload
+from collections import Counter
 
 ns = Namespace('counsellor', description='Counsellor Dashboard and Patient Insights')
 
@@ -32,10 +40,11 @@ class CounsellorInbox(Resource):
         if current_user.role != 'counsellor':
             return {'message': 'Unauthorized'}, 403
         
-        # Get all requests for this counsellor
-        requests = ConsultationRequest.query.filter_by(
-            counsellor_id=current_user.id
-        ).order_by(ConsultationRequest.created_at.desc()).all()
+        # Requests for this counsellor, newest first (paginated with ?limit=&cursor=)
+        requests, next_cursor = keyset_page(
+            ConsultationRequest.query.options(joinedload(ConsultationRequest.user)).filter_by(counsellor_id=current_user.id),
+            ConsultationRequest.created_at, ConsultationRequest.id
+        )
         
         return [{
             'id': r.id,
@@ -53,7 +62,7 @@ class CounsellorInbox(Resource):
             'time_ago': get_time_ago(r.created_at),
             'is_new': r.status == 'pending',
             'meeting_link': r.chat_video_link
-        } for r in requests], 200
+        } for r in requests], 200, page_headers(next_cursor)
 
 @ns.route('/inbox/<int:request_id>/action')
 class InboxAction(Resource):
@@ -125,9 +134,11 @@ class CounsellorPatients(Resource):
             status='booked'
         ).all()
         
-        # Get unique patients
-        patient_ids = list(set([r.user_id for r in booked_requests]))
+        # Get unique patients; per-patient counts come from the rows already loaded plus one grouped query
+        pending_sessions = Counter(r.user_id for r in booked_requests)
+        patient_ids = list(pending_sessions)
         patients = User.query.filter(User.id.in_(patient_ids)).all()
+        at_risk = crisis_session_users(patient_ids) if patient_ids else set()
         
         return [{
             'id': p.id,
@@ -137,14 +148,279 @@ class CounsellorPatients(Resource):
             'profile_picture': p.profile_picture,
             'login_streak': p.login_streak,
             'last_login': p.last_login.isoformat() if p.last_login else None,
-            'has_crisis': ChatSession.query.filter_by(user_id=p.id, crisis_flag=True).count() > 0,
-            'pending_sessions': ConsultationRequest.query.filter_by(
-                user_id=p.id, 
-                counsellor_id=current_user.id, 
-                status='booked'
-            ).count()
+            'has_crisis': p.id in at_risk,
+            'pending_sessions': pending_sessions[p.id]
         } for p in patients], 200
 
+PATIENT_INSIGHTS_CACHE_TTL = 1800
+
+@on_event('assessment.created', 'crisis_alert.*', 'chat_intent.created', 'activity.logged',
+          'meditation.completed', 'venting.post_created', 'inkblot.completed', 'consultation.*', 'user.updated')
+def expire_patient_insights(event):
+    """Patient insights are cached per counsellor; one tag covers every counsellor's copy"""
+    bump_tags(f"patient:{event['user_id']}")
+
+ATTACHMENT_MODELS = {'assessment': Assessment, 'inkblot': InkblotResult}
+
+def _patient_assessments(patient_id):
+    return [{
+        'id': a.id,
+        'type': a.assessment_type,
+        'score': a.score,
+        'severity': a.severity_level,
+        'responses': a.responses,
+        'recommendations': a.recommendations,
+        'completed_at': a.completed_at.isoformat(),
+        'time_ago': get_time_ago(a.completed_at)
+    } for a in Assessment.query.filter_by(
+        user_id=patient_id
+    ).order_by(Assessment.completed_at.desc()).limit(10).all()]
+
+def _patient_crisis_alerts(patient_id, since):
+    return [{
+        'id': ca.id,
+        'alert_type': ca.alert_type,
+        'severity': ca.severity,
+        'message_snippet': ca.message_snippet,
+        'intent_summary': ca.intent_summary,
+        'acknowledged': ca.acknowledged,
+        'created_at': ca.created_at.isoformat(),
+        'time_ago': get_time_ago(ca.created_at)
+    } for ca in CrisisAlert.query.filter(
+        CrisisAlert.user_id == patient_id,
+        CrisisAlert.created_at >= since
+    ).order_by(CrisisAlert.created_at.desc()).all()]
+
+def _patient_emotional_trends(patient_id, since):
+    return [{
+        'emotional_state': ei.emotional_state,
+        'emotional_intensity': ei.emotional_intensity,
+        'intent_type': ei.intent_type,
+        'cognitive_load': ei.cognitive_load,
+        'help_receptivity': ei.help_receptivity,
+        'self_harm_crisis': ei.self_harm_crisis,
+        'timestamp': ei.timestamp.isoformat()
+    } for ei in ChatIntent.query.filter(
+        ChatIntent.user_id == patient_id,
+        ChatIntent.timestamp >= since
+    ).order_by(ChatIntent.timestamp.desc()).limit(30).all()]
+
+def _patient_activity_logs(patient_id, since):
+    return [{
+        'activity_type': al.activity_type,
+        'action': al.action,
+        'duration': al.duration,
+        'result_value': al.result_value,
+        'timestamp': al.timestamp.isoformat()
+    } for al in UserActivityLog.query.filter(
+        UserActivityLog.user_id == patient_id,
+        UserActivityLog.timestamp >= since
+    ).order_by(UserActivityLog.timestamp.desc()).all()]
+
+def _patient_meditation_sessions(patient_id, since):
+    return [{
+        'session_type': ms.session_type,
+        'duration': ms.duration,
+        'completed_at': ms.completed_at.isoformat()
+    } for ms in MeditationSession.query.filter(
+        MeditationSession.user_id == patient_id,
+        MeditationSession.completed_at >= since
+    ).all()]
+
+def _patient_venting_posts(patient_id, since):
+    return [{
+        'id': vp.id,
+        'content': vp.content[:200] + '...' if len(vp.content) > 200 else vp.content,
+        'anonymous': vp.anonymous,
+        'likes': vp.likes,
+        'created_at': vp.created_at.isoformat()
+    } for vp in VentingPost.query.filter(
+        VentingPost.user_id == patient_id,
+        VentingPost.created_at >= since
+    ).order_by(VentingPost.created_at.desc()).limit(10).all()]
+
+def _patient_inkblot_results(patient_id):
+    return [{
+        'id': ir.id,
+        'created_at': ir.created_at.isoformat(),
+        'sharing_status': ir.sharing_status
+    } for ir in InkblotResult.query.filter_by(
+        user_id=patient_id
+    ).order_by(InkblotResult.created_at.desc()).limit(5).all()]
+
+def _shared_document(kind, doc, shared_at):
+    if kind == 'assessment':
+        return {
+            'type': 'assessment',
+            'id': doc.id,
+            'assessment_type': doc.assessment_type,
+            'score': doc.score,
+            'severity': doc.severity_level,
+            'created_at': doc.created_at.isoformat(),
+            'time_ago': get_time_ago(doc.created_at),
+            'shared_at': shared_at
+        }
+    return {
+        'type': 'inkblot',
+        'id': doc.id,
+        'created_at': doc.created_at.isoformat(),
+        'time_ago': get_time_ago(doc.created_at),
+        'shared_at': shared_at,
+        'has_pdf': doc.pdf_path is not None
+    }
+
+def _patient_consultations(patient_id, counsellor_id):
+    """Consultation history plus the documents shared through it (one IN query per document type)"""
+    consultation_requests = ConsultationRequest.query.filter_by(
+        user_id=patient_id,
+        counsellor_id=counsellor_id
+    ).order_by(ConsultationRequest.created_at.desc()).all()
+    
+    loader = BatchLoader()
+    shared = [(req, attachment) for req in consultation_requests for attachment in (req.attachments or [])
+              if attachment.get('type') in ATTACHMENT_MODELS]
+    for req, attachment in shared:
+        loader.queue(ATTACHMENT_MODELS[attachment['type']], attachment.get('id'))
+    
+    shared_documents = []
+    for req, attachment in shared:
+        doc = loader.get(ATTACHMENT_MODELS[attachment['type']], attachment.get('id'))
+        if doc:
+            shared_documents.append(_shared_document(attachment['type'], doc, req.created_at.isoformat()))
+    
+    history = [{
+        'id': cr.id,
+        'urgency': cr.urgency_level,
+        'status': cr.status,
+        'session_datetime': cr.session_datetime.isoformat() if cr.session_datetime else None,
+        'created_at': cr.created_at.isoformat(),
+        'session_notes': cr.session_notes,
+        'feedback_rating': cr.feedback_rating
+    } for cr in consultation_requests]
+    return history, shared_documents
+
+def _counters(counts, prefix):
+    """{name: n} for the snapshot counters named '<prefix><name>'"""
+    return {name[len(prefix):]: n for name, n in counts.items() if name.startswith(prefix) and n}
+
+def snapshot_risk(snapshot, since):
+    """Risk statistics for the last 30 days from a StudentRiskSnapshot (whole days, every row counted)"""
+    month = rolled_counts(snapshot, RETENTION_DAYS)
+    recent = snapshot.latest_intent_at is not None and snapshot.latest_intent_at >= since
+    return {
+        'emotional_state_counts': _counters(month, 'state:'),
+        'intensity_counts': _counters(month, 'intensity:'),
+        'activity_breakdown': _counters(month, 'activity:'),
+        'total_activities': month['activities'],
+        'total_crisis_alerts': month['crisis_alerts'],
+        'critical_crisis_count': month['crisis:critical'],
+        'high_crisis_count': month['crisis:high'],
+        'current_emotional_state': snapshot.latest_emotional_state if recent else None,
+        'current_emotional_intensity': snapshot.latest_emotional_intensity if recent else None,
+    }
+
+def history_risk(crisis_alerts, emotional_intents, activity_logs):
+    """The same statistics from the listed rows, for a student without a snapshot yet"""
+    emotional_state_counts = Counter(intent['emotional_state'] or 'unknown' for intent in emotional_intents)
+    intensity_counts = Counter(intent['emotional_intensity'] or 'unknown' for intent in emotional_intents)
+    activity_breakdown = Counter(log['activity_type'] for log in activity_logs)
+    latest = emotional_intents[0] if emotional_intents else {}
+    return {
+        'emotional_state_counts': dict(emotional_state_counts),
+        'intensity_counts': dict(intensity_counts),
+        'activity_breakdown': dict(activity_breakdown),
+        'total_activities': len(activity_logs),
+        'total_crisis_alerts': len(crisis_alerts),
+        'critical_crisis_count': sum(1 for ca in crisis_alerts if ca['severity'] == 'critical'),
+        'high_crisis_count': sum(1 for ca in crisis_alerts if ca['severity'] == 'high'),
+        'current_emotional_state': latest.get('emotional_state'),
+        'current_emotional_intensity': latest.get('emotional_intensity'),
+    }
+
+def build_patient_insights(patient, counsellor_id, has_access):
+    """Comprehensive insights for a patient, as seen by the counsellor they booked"""
+    patient_id = patient.id
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    
+    # Independent sections run concurrently, each on its own session: a fixed number of
+    # queries however many documents the patient has shared
+    sections = run_sections({
+        'assessments': lambda: _patient_assessments(patient_id),
+        'crisis_alerts': lambda: _patient_crisis_alerts(patient_id, thirty_days_ago),
+        'emotional_trends': lambda: _patient_emotional_trends(patient_id, thirty_days_ago),
+        'activity_logs': lambda: _patient_activity_logs(patient_id, thirty_days_ago),
+        'meditation_sessions': lambda: _patient_meditation_sessions(patient_id, thirty_days_ago),
+        'venting_posts': lambda: _patient_venting_posts(patient_id, thirty_days_ago),
+        'inkblot_results': lambda: _patient_inkblot_results(patient_id),
+        'consultations': lambda: _patient_consultations(patient_id, counsellor_id),
+    })
+    assessments = sections['assessments']
+    crisis_alerts = sections['crisis_alerts']
+    emotional_intents = sections['emotional_trends']
+    activity_logs = sections['activity_logs']
+    consultation_history, shared_documents = sections['consultations']
+    
+    # Distributions, current state and risk from the risk snapshot; the lists above are for display
+    snapshot = db.session.get(StudentRiskSnapshot, patient_id)
+    if snapshot:
+        risk = snapshot_risk(snapshot, thirty_days_ago)
+    else:
+        risk = history_risk(crisis_alerts, emotional_intents, activity_logs)
+    activity_breakdown = risk['activity_breakdown']
+    critical_crisis_count = risk['critical_crisis_count']
+    high_crisis_count = risk['high_crisis_count']
+    
+    # Risk assessment
+    risk_level = 'low'
+    if critical_crisis_count > 0:
+        risk_level = 'critical'
+    elif high_crisis_count >= 2:
+        risk_level = 'high'
+    elif high_crisis_count == 1 or risk['total_crisis_alerts'] > 0:
+        risk_level = 'moderate'
+    
+    return {
+        'patient_info': {
+            'id': patient.id,
+            'full_name': patient.full_name,
+            'username': patient.username,
+            'email': patient.email,
+            'profile_picture': patient.profile_picture,
+            'login_streak': patient.login_streak,
+            'last_login': patient.last_login.isoformat() if patient.last_login else None,
+            'bio': patient.bio,
+            'accommodation_type': patient.accommodation_type,
+            'current_emotional_state': risk['current_emotional_state'],
+            'current_emotional_intensity': risk['current_emotional_intensity'],
+            'risk_level': risk_level,
+            'latest_consultation_id': has_access.id if has_access else None,
+            'latest_meeting_link': has_access.chat_video_link if has_access else None
+        },
+        'assessments': assessments,
+        'crisis_alerts': crisis_alerts,
+        'emotional_trends': emotional_intents,
+        'activity_logs': activity_logs,
+        'meditation_sessions': sections['meditation_sessions'],
+        'venting_posts': sections['venting_posts'],
+        'inkblot_results': sections['inkblot_results'],
+        'shared_documents': shared_documents,
+        'statistics': {
+            'total_assessments': len(assessments),
+            'total_crisis_alerts': risk['total_crisis_alerts'],
+            'critical_alerts': critical_crisis_count,
+            'high_alerts': high_crisis_count,
+            'total_activities': risk['total_activities'],
+            'meditation_count': activity_breakdown.get('meditation', 0),
+            'chat_count': activity_breakdown.get('chat', 0),
+            'venting_count': activity_breakdown.get('venting', 0),
+            'assessment_count': activity_breakdown.get('assessment', 0),
+            'emotional_state_distribution': risk['emotional_state_counts'],
+            'intensity_distribution': risk['intensity_counts'],
+            'activity_breakdown': activity_breakdown
+        },
+        'consultation_history': consultation_history
+    }
+
 @ns.route('/patient/<int:patient_id>/insights')
 class PatientDetailedInsights(Resource):
     @login_required
@@ -164,219 +440,13 @@ class PatientDetailedInsights(Resource):
             return {'message': 'No active consultation with this patient'}, 403
         
         patient = User.query.get_or_404(patient_id)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        
-        # Get all assessments with full details
-        assessments = Assessment.query.filter_by(
-            user_id=patient_id
-        ).order_by(Assessment.completed_at.desc()).limit(10).all()
-        
-        # Get crisis alerts
-        crisis_alerts = CrisisAlert.query.filter(
-            CrisisAlert.user_id == patient_id,
-            CrisisAlert.created_at >= thirty_days_ago
-        ).order_by(CrisisAlert.created_at.desc()).all()
-        
-        # Get emotional trends from chat intents
-        emotional_intents = ChatIntent.query.filter(
-            ChatIntent.user_id == patient_id,
-            ChatIntent.timestamp >= thirty_days_ago
-        ).order_by(ChatIntent.timestamp.desc()).limit(30).all()
-        
-        # Get activity logs
-        activity_logs = UserActivityLog.query.filter(
-            UserActivityLog.user_id == patient_id,
-            UserActivityLog.timestamp >= thirty_days_ago
-        ).order_by(UserActivityLog.timestamp.desc()).all()
-        
-        # Get meditation sessions
-        meditation_sessions = MeditationSession.query.filter(
-            MeditationSession.user_id == patient_id,
-            MeditationSession.completed_at >= thirty_days_ago
-        ).all()
-        
-        # Get venting posts
-        venting_posts = VentingPost.query.filter(
-            VentingPost.user_id == patient_id,
-            VentingPost.created_at >= thirty_days_ago
-        ).order_by(VentingPost.created_at.desc()).limit(10).all()
-        
-        # Get inkblot results if any
-        inkblot_results = InkblotResult.query.filter_by(
-            user_id=patient_id
-        ).order_by(InkblotResult.created_at.desc()).limit(5).all()
         
-        # Get shared documents (attachments from consultation requests)
-        shared_documents = []
-        consultation_requests = ConsultationRequest.query.filter_by(
-            user_id=patient_id,
-            counsellor_id=current_user.id
-        ).all()
-        
-        for req in consultation_requests:
-            if req.attachments:
-                for attachment in req.attachments:
-                    if attachment.get('type') == 'assessment':
-                        assessment = Assessment.query.get(attachment.get('id'))
-                        if assessment:
-                            shared_documents.append({
-                                'type': 'assessment',
-                                'id': assessment.id,
-                                'assessment_type': assessment.assessment_type,
-                                'score': assessment.score,
-                                'severity': assessment.severity_level,
-                                'created_at': assessment.created_at.isoformat(),
-                                'time_ago': get_time_ago(assessment.created_at),
-                                'shared_at': req.created_at.isoformat()
-                            })
-                    elif attachment.get('type') == 'inkblot':
-                        inkblot = InkblotResult.query.get(attachment.get('id'))
-                        if inkblot:
-                            shared_documents.append({
-                                'type': 'inkblot',
-                                'id': inkblot.id,
-                                'created_at': inkblot.created_at.isoformat(),
-                                'time_ago': get_time_ago(inkblot.created_at),
-                                'shared_at': req.created_at.isoformat(),
-                                'has_pdf': inkblot.pdf_path is not None
-                            })
-        
-        # Calculate emotional state distribution
-        emotional_state_counts = {}
-        for intent in emotional_intents:
-            state = intent.emotional_state or 'unknown'
-            emotional_state_counts[state] = emotional_state_counts.get(state, 0) + 1
-        
-        # Calculate intensity distribution
-        intensity_counts = {}
-        for intent in emotional_intents:
-            intensity = intent.emotional_intensity or 'unknown'
-            intensity_counts[intensity] = intensity_counts.get(intensity, 0) + 1
-        
-        # Activity breakdown
-        activity_breakdown = {}
-        for log in activity_logs:
-            activity_type = log.activity_type
-            activity_breakdown[activity_type] = activity_breakdown.get(activity_type, 0) + 1
-        
-        # Most recent emotional state
-        current_emotional_state = None
-        current_emotional_intensity = None
-        if emotional_intents:
-            latest = emotional_intents[0]
-            current_emotional_state = latest.emotional_state
-            current_emotional_intensity = latest.emotional_intensity
-        
-        # Risk assessment
-        critical_crisis_count = sum(1 for ca in crisis_alerts if ca.severity == 'critical')
-        high_crisis_count = sum(1 for ca in crisis_alerts if ca.severity == 'high')
-        risk_level = 'low'
-        if critical_crisis_count > 0:
-            risk_level = 'critical'
-        elif high_crisis_count >= 2:
-            risk_level = 'high'
-        elif high_crisis_count == 1 or len(crisis_alerts) > 0:
-            risk_level = 'moderate'
-        
-        return {
-            'patient_info': {
-                'id': patient.id,
-                'full_name': patient.full_name,
-                'username': patient.username,
-                'email': patient.email,
-                'profile_picture': patient.profile_picture,
-                'login_streak': patient.login_streak,
-                'last_login': patient.last_login.isoformat() if patient.last_login else None,
-                'bio': patient.bio,
-                'accommodation_type': patient.accommodation_type,
-                'current_emotional_state': current_emotional_state,
-                'current_emotional_intensity': current_emotional_intensity,
-                'risk_level': risk_level,
-                'latest_consultation_id': has_access.id if has_access else None,
-                'latest_meeting_link': has_access.chat_video_link if has_access else None
-            },
-            'assessments': [{
-                'id': a.id,
-                'type': a.assessment_type,
-                'score': a.score,
-                'severity': a.severity_level,
-                'responses': a.responses,
-                'recommendations': a.recommendations,
-                'completed_at': a.completed_at.isoformat(),
-                'time_ago': get_time_ago(a.completed_at)
-            } for a in assessments],
-            'crisis_alerts': [{
-                'id': ca.id,
-                'alert_type': ca.alert_type,
-                'severity': ca.severity,
-                'message_snippet': ca.message_snippet,
-                'intent_summary': ca.intent_summary,
-                'acknowledged': ca.acknowledged,
-                'created_at': ca.created_at.isoformat(),
-                'time_ago': get_time_ago(ca.created_at)
-            } for ca in crisis_alerts],
-            'emotional_trends': [{
-                'emotional_state': ei.emotional_state,
-                'emotional_intensity': ei.emotional_intensity,
-                'intent_type': ei.intent_type,
-                'cognitive_load': ei.cognitive_load,
-                'help_receptivity': ei.help_receptivity,
-                'self_harm_crisis': ei.self_harm_crisis,
-                'timestamp': ei.timestamp.isoformat()
-            } for ei in emotional_intents],
-            'activity_logs': [{
-                'activity_type': al.activity_type,
-                'action': al.action,
-                'duration': al.duration,
-                'result_value': al.result_value,
-                'timestamp': al.timestamp.isoformat()
-            } for al in activity_logs],
-            'meditation_sessions': [{
-                'session_type': ms.session_type,
-                'duration': ms.duration,
-                'completed_at': ms.completed_at.isoformat()
-            } for ms in meditation_sessions],
-            'venting_posts': [{
-                'id': vp.id,
-                'content': vp.content[:200] + '...' if len(vp.content) > 200 else vp.content,
-                'anonymous': vp.anonymous,
-                'likes': vp.likes,
-                'created_at': vp.created_at.isoformat()
-            } for vp in venting_posts],
-            'inkblot_results': [{
-                'id': ir.id,
-                'created_at': ir.created_at.isoformat(),
-                'sharing_status': ir.sharing_status
-            } for ir in inkblot_results],
-            'shared_documents': shared_documents,
-            'statistics': {
-                'total_assessments': len(assessments),
-                'total_crisis_alerts': len(crisis_alerts),
-                'critical_alerts': critical_crisis_count,
-                'high_alerts': high_crisis_count,
-                'total_activities': len(activity_logs),
-                'meditation_count': activity_breakdown.get('meditation', 0),
-                'chat_count': activity_breakdown.get('chat', 0),
-                'venting_count': activity_breakdown.get('venting', 0),
-                'assessment_count': activity_breakdown.get('assessment', 0),
-                'emotional_state_distribution': emotional_state_counts,
-                'intensity_distribution': intensity_counts,
-                'activity_breakdown': activity_breakdown
-            },
-            'consultation_history': [{
-                'id': cr.id,
-                'urgency': cr.urgency_level,
-                'status': cr.status,
-                'session_datetime': cr.session_datetime.isoformat() if cr.session_datetime else None,
-                'created_at': cr.created_at.isoformat(),
-                'session_notes': cr.session_notes,
-                'feedback_rating': cr.feedback_rating
-            } for cr in ConsultationRequest.query.filter_by(
-                user_id=patient_id,
-                counsellor_id=current_user.id
-            ).order_by(ConsultationRequest.created_at.desc()).all()]
-        }, 200
+        # Cache-aside per counsellor/patient: one recompute at a time, stale view served meanwhile
+        return cached_value(
+            tagged_key(f"counsellor:patient_insights:{current_user.id}:{patient_id}", f"patient:{patient_id}"),
+            lambda: build_patient_insights(patient, current_user.id, has_access),
+            ttl=PATIENT_INSIGHTS_CACHE_TTL
+        ), 200
 
 @ns.route('/patient/<int:patient_id>/session-notes')
 class SessionNotes(Resource):
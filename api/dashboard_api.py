@@ -1,11 +1,14 @@
 from flask_restx import Namespace, Resource, fields
 from flask_login import login_required, current_user
-from database import db, cache, r_streaks
+from database import db, r_streaks
 from db_models import User, RoutineTask, Assessment, MeditationSession, ChatSession, ConsultationRequest
 from datetime import datetime, timedelta
 from sqlalchemy import func, or_
 from sqlalchemy.orm import joinedload
 from utils.common import update_user_streak, get_user_streak
+from utils.cache_aside import cached_value, store_value, invalidate, claim_refresh
+from utils.cache_events import on_event
+import time
 
 ns = Namespace('dashboard', description='User dashboard and statistics')
 
@@ -107,6 +110,11 @@ def get_dashboard_summary(user):
 
 from utils.common import celery
 
+DASHBOARD_CACHE_TTL = 3600  # writes that change the summary invalidate it through cache events
+
+def dashboard_cache_key(user_id):
+    return f"dashboard:v2:{user_id}"
+
 @celery.task
 def precalculate_dashboard_task(user_id):
     """Background task to pre-calculate dashboard stats and store in Redis"""
@@ -116,20 +124,29 @@ def precalculate_dashboard_task(user_id):
     if os.getcwd() not in sys.path:
         sys.path.append(os.getcwd())
     import app as flask_app
-    from database import cache
     from db_models import User
     with flask_app.app.app_context():
         user = User.query.get(user_id)
         if user:
+            start = time.perf_counter()
             summary = get_dashboard_summary(user)
-            cache.set(f"dashboard_user_{user_id}", summary, timeout=600)
+            store_value(dashboard_cache_key(user_id), summary, DASHBOARD_CACHE_TTL, time.perf_counter() - start)
 
 def invalidate_dashboard_cache(user_id, proactive=True):
     """Invalidate cache and optionally trigger background re-calculation"""
-    # cache is imported globally from database
-    cache.delete(f"dashboard_user_{user_id}")
-    if proactive:
-        precalculate_dashboard_task.delay(user_id)
+    key = dashboard_cache_key(user_id)
+    invalidate(key)
+    # Every listening process sees the same event; only the one holding the refresh lock queues the task
+    if proactive and claim_refresh(key):
+        try:
+            precalculate_dashboard_task.delay(user_id)
+        except Exception:
+            invalidate(f"{key}:lock")
+            raise
+
+@on_event('assessment.created', 'meditation.completed', 'routine_task.*', 'consultation.*', 'user.updated')
+def refresh_dashboard_on_change(event):
+    invalidate_dashboard_cache(event['user_id'])
 
 @ns.route('')
 class Dashboard(Resource):
@@ -137,16 +154,11 @@ class Dashboard(Resource):
     @ns.marshal_with(dashboard_model)
     def get(self):
         """Get user dashboard summary stats"""
-        cache_key = f"dashboard_user_{current_user.id}"
-        cached_data = cache.get(cache_key)
-        
-        # If cache exists, return immediately for "Instant Load"
-        if cached_data:
-            return cached_data
-
-        # If not, calculate, cache, and return
-        result = get_dashboard_summary(current_user)
-        
-        # Cache for 10 minutes (invalidated on activity)
-        cache.set(cache_key, result, timeout=600)
-        return result
+        # Cached for ~1 hour (invalidated by cache events); stale entries are served while a task refreshes them
+        user = current_user._get_current_object()
+        return cached_value(
+            dashboard_cache_key(user.id),
+            lambda: get_dashboard_summary(user),
+            ttl=DASHBOARD_CACHE_TTL,
+            refresh=lambda: precalculate_dashboard_task.delay(user.id)
+        )
@@ -9,6 +9,7 @@ from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from datetime import datetime
+from utils.pagination import keyset_page, page_headers
 
 ns = Namespace('inkblot', description='Inkblot test operations')
 
@@ -90,15 +91,17 @@ class FinishInkblot(Resource):
 class AllResults(Resource):
     @login_required
     def get(self):
-        """Get history of inkblot results"""
-        results = InkblotResult.query.filter_by(user_id=current_user.id).order_by(InkblotResult.created_at.desc()).all()
+        """Get history of inkblot results (newest first, paginated with ?limit=&cursor=)"""
+        results, next_cursor = keyset_page(
+            InkblotResult.query.filter_by(user_id=current_user.id), InkblotResult.created_at, InkblotResult.id
+        )
         return [
             {
                 'id': r.id,
                 'date': r.created_at.isoformat(),
                 'blot_count': len(r.responses)
             } for r in results
-        ], 200
+        ], 200, page_headers(next_cursor)
 
 @ns.route('/<int:result_id>/details')
 class InkblotDetails(Resource):
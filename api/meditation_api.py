@@ -5,9 +5,9 @@ from db_models import MeditationSession, CrisisAlert, ChatSession, ChatIntent
 from database import db, cache
 from utils import get_meditation_content
 from datetime import datetime, timedelta
-from sqlalchemy import func
 from app import r_streaks
 from utils.common import update_user_streak, get_user_streak
+from utils.rollups import activity_totals, prefixed_total, MEDITATION_PREFIX
 
 ns = Namespace('meditation', description='Meditation content and session tracking')
 
@@ -122,10 +122,6 @@ class CompleteMeditation(Resource):
         # Redis Streak Update
         update_user_streak(r_streaks, current_user)
         
-        # Invalidate Dashboard Cache
-        from api.dashboard_api import invalidate_dashboard_cache
-        invalidate_dashboard_cache(current_user.id)
-        
         db.session.commit()
         return {'message': 'Meditation session saved'}, 201
 
@@ -134,12 +130,9 @@ class MeditationStats(Resource):
     @login_required
     def get(self):
         """Get user's meditation statistics"""
-        stats = db.session.query(
-            func.count(MeditationSession.id).label('total_sessions'),
-            func.sum(MeditationSession.duration).label('total_seconds')
-        ).filter_by(user_id=current_user.id).first()
+        total_sessions, total_seconds = prefixed_total(activity_totals(current_user.id), MEDITATION_PREFIX)
 
-        total_minutes = int((stats.total_seconds or 0) / 60)
+        total_minutes = int(total_seconds / 60)
         
         # Calculate streak (simplified version: count of distinct days in last 7 days? Or just return login streak for now)
         # For better UX, let's use the login streak or just mock it in backend if not strict.
@@ -148,7 +141,7 @@ class MeditationStats(Resource):
         # For now, let's just return total counts.
         
         return {
-            'total_sessions': stats.total_sessions or 0,
+            'total_sessions': total_sessions,
             'total_minutes': total_minutes,
             'streak': get_user_streak(r_streaks, current_user)
         }, 200
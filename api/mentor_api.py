@@ -11,95 +11,40 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.units import inch
 from utils.celery_app import celery
+from utils.student_status import compute_student_statuses
+from utils.cache_aside import cached_value, store_value, invalidate
+from utils.cache_events import on_event
+from utils.org_analytics import cached_org_dashboard_stats
 import json
+import time
 
 ns = Namespace('mentor', description='Mentor and Student Management')
 
+INSIGHTS_CACHE_TTL = 1800
+
+def insights_cache_key(student_id):
+    return f"mentor:student_insights:{student_id}"
+
+@on_event('assessment.created', 'activity.logged', 'crisis_alert.*', 'chat_intent.created', 'user.updated')
+def drop_student_insights(event):
+    invalidate(insights_cache_key(event['user_id']))
+
 @celery.task
 def precalculate_student_insights(student_id):
     """Background task to calculate and cache student insights"""
-    try:
-        student = User.query.get(student_id)
-        if not student:
+    from app import app
+    with app.app_context():
+        try:
+            student = User.query.get(student_id)
+            if not student:
+                return None
+            start = time.perf_counter()
+            insights = build_student_insights(student)
+            store_value(insights_cache_key(student_id), insights, INSIGHTS_CACHE_TTL, time.perf_counter() - start)
+            return insights
+        except Exception as e:
+            print(f"Error calculating insights for student {student_id}: {e}")
             return None
-            
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        
-        # Get all data
-        assessments = Assessment.query.filter_by(user_id=student_id).order_by(Assessment.completed_at.desc()).limit(5).all()
-        logs = UserActivityLog.query.filter_by(user_id=student_id).order_by(UserActivityLog.timestamp.desc()).limit(20).all()
-        crisis_sessions = ChatSession.query.filter_by(user_id=student_id, crisis_flag=True).count()
-        recent_crisis_alerts = CrisisAlert.query.filter(
-            CrisisAlert.user_id == student_id,
-            CrisisAlert.created_at >= thirty_days_ago
-        ).order_by(CrisisAlert.created_at.desc()).limit(5).all()
-        recent_intents = ChatIntent.query.filter(
-            ChatIntent.user_id == student_id,
-            ChatIntent.timestamp >= thirty_days_ago
-        ).order_by(ChatIntent.timestamp.desc()).limit(10).all()
-        
-        # Calculate stats
-        current_emotional_state = None
-        current_emotional_intensity = None
-        if recent_intents:
-            latest_intent = recent_intents[0]
-            current_emotional_state = latest_intent.emotional_state
-            current_emotional_intensity = latest_intent.emotional_intensity
-        
-        engagement_level = "Low"
-        if student.login_streak > 5: engagement_level = "Medium"
-        if student.login_streak > 15: engagement_level = "High"
-        
-        activity_stats = {
-            'total_activities': len(logs),
-            'meditation_count': sum(1 for l in logs if l.activity_type == 'meditation'),
-            'assessment_count': sum(1 for l in logs if l.activity_type == 'assessment'),
-            'chat_count': sum(1 for l in logs if l.activity_type == 'chat'),
-            'venting_count': sum(1 for l in logs if l.activity_type == 'venting')
-        }
-        
-        # Build insights object
-        insights = {
-            'student_info': {
-                'name': student.full_name,
-                'username': student.username,
-                'login_streak': student.login_streak,
-                'last_login': student.last_login.isoformat() if student.last_login else None,
-                'engagement_level': engagement_level,
-                'crisis_flags': crisis_sessions,
-                'current_emotional_state': current_emotional_state,
-                'current_emotional_intensity': current_emotional_intensity,
-                'status': calculate_user_status(student_id)
-            },
-            'activity_stats': activity_stats,
-            'crisis_alerts': [{
-                'severity': a.severity,
-                'alert_type': a.alert_type,
-                'message_snippet': a.message_snippet,
-                'created_at': a.created_at.isoformat(),
-                'time_ago': get_time_ago(a.created_at)
-            } for a in recent_crisis_alerts],
-            'recent_activity': [{
-                'type': l.activity_type,
-                'action': l.action_description or l.activity_type,
-                'date': l.timestamp.isoformat(),
-                'duration': getattr(l, 'duration_minutes', None)
-            } for l in logs],
-            'emotional_trends': [{
-                'date': i.timestamp.strftime('%m/%d'),
-                'state': i.emotional_state,
-                'intensity': i.emotional_intensity
-            } for i in recent_intents]
-        }
-        
-        # Cache for 5 minutes
-        cache_key = f"mentor:student_insights:{student_id}"
-        r_sessions.setex(cache_key, 300, json.dumps(insights))
-        
-        return insights
-    except Exception as e:
-        print(f"Error calculating insights for student {student_id}: {e}")
-        return None
 
 @ns.route('/crisis-alerts')
 class CrisisAlerts(Resource):
@@ -118,18 +63,22 @@ class CrisisAlerts(Resource):
             conditions.append(User.organization_id == current_user.organization_id)
         
         students = query.filter(or_(*conditions)).all()
-        student_ids = [s.id for s in students]
+        students_by_id = {s.id: s for s in students}
         
         # Get crisis alerts for these students
         alerts = CrisisAlert.query.filter(
-            CrisisAlert.user_id.in_(student_ids),
+            CrisisAlert.user_id.in_(list(students_by_id)),
             CrisisAlert.acknowledged == False
         ).order_by(CrisisAlert.created_at.desc()).limit(50).all()
         
+        # Status for the alerted students only (fixed number of queries)
+        statuses = compute_student_statuses([students_by_id[uid] for uid in {a.user_id for a in alerts}])
+        
         return [{
             'id': a.id,
             'user_id': a.user_id,
-            'student_name': User.query.get(a.user_id).full_name if User.query.get(a.user_id) else 'Unknown',
+            'student_name': students_by_id[a.user_id].full_name,
+            'student_status': statuses[a.user_id]['status'],
             'alert_type': a.alert_type,
             'severity': a.severity,
             'message_snippet': a.message_snippet,
@@ -184,53 +133,11 @@ def get_time_ago(dt):
         return "Just now"
 
 def calculate_user_status(student_id):
-    """Calculate user status based on emotional state, crisis alerts, and activity"""
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    
-    # Check for recent crisis alerts
-    recent_crisis = CrisisAlert.query.filter(
-        CrisisAlert.user_id == student_id,
-        CrisisAlert.created_at >= seven_days_ago
-    ).order_by(CrisisAlert.created_at.desc()).first()
-    
-    if recent_crisis and recent_crisis.severity in ['critical', 'high']:
-        return "Critical"
-    
-    # Check recent emotional states from chat intents
-    recent_intents = ChatIntent.query.filter(
-        ChatIntent.user_id == student_id,
-        ChatIntent.timestamp >= seven_days_ago
-    ).order_by(ChatIntent.timestamp.desc()).limit(10).all()
-    
-    if recent_intents:
-        # Count negative emotional states
-        negative_states = ['low', 'sad', 'anxious', 'stressed', 'overwhelmed', 'frustrated', 'angry', 'numb']
-        high_intensity_count = sum(1 for intent in recent_intents 
-                                   if intent.emotional_state in negative_states 
-                                   and intent.emotional_intensity in ['moderate', 'high', 'critical'])
-        
-        if high_intensity_count >= 5:  # More than half are negative
-            return "Needs attention"
-    
-    # Check activity engagement
-    recent_activity = UserActivityLog.query.filter(
-        UserActivityLog.user_id == student_id,
-        UserActivityLog.timestamp >= seven_days_ago
-    ).count()
-    
-    # Check student login streak
+    """Calculate user status based on emotional state, crisis alerts, and activity (rules in utils/student_status.py)"""
     student = User.query.get(student_id)
-    
-    # Positive indicators
-    if recent_activity >= 3 and student.login_streak >= 3 and not recent_crisis:
-        return "Doing well"
-    
-    # Default to needs attention if low engagement
-    if recent_activity < 2 or student.login_streak < 2:
-        return "Needs attention"
-    
-    return "Neutral"
+    if not student:
+        return "Neutral"
+    return compute_student_statuses([student])[student_id]['status']
 
 @ns.route('/students')
 class MentorStudents(Resource):
@@ -253,8 +160,9 @@ class MentorStudents(Resource):
             
         students = query.filter(or_(*conditions)).all()
         print(f"DEBUG: Found {len(students)} students")
-        for s in students:
-            print(f" - Found: {s.username} (Org: {s.organization_id})")
+        
+        # Status + risk flag for the whole roster in a fixed number of queries
+        statuses = compute_student_statuses(students)
             
         return [
             {
@@ -264,13 +172,133 @@ class MentorStudents(Resource):
                 'email': s.email,
                 'login_streak': s.login_streak,
                 'profile_picture': s.profile_picture,
-                'has_risk': ChatSession.query.filter_by(user_id=s.id, crisis_flag=True).count() > 0,
-                'status': calculate_user_status(s.id),
+                'has_risk': statuses[s.id]['has_risk'],
+                'status': statuses[s.id]['status'],
                 'last_login': s.last_login.isoformat() if s.last_login else None,
                 'is_onboarded': s.is_onboarded
             } for s in students
         ], 200
 
+def build_student_insights(student):
+    """Mentor view of one student's recent assessments, crisis alerts, emotional trends and activity"""
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    assessments = Assessment.query.filter_by(user_id=student.id).order_by(Assessment.completed_at.desc()).limit(5).all()
+    logs = UserActivityLog.query.filter_by(user_id=student.id).order_by(UserActivityLog.timestamp.desc()).limit(20).all()
+
+    # Get crisis flags (last 30 days)
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    crisis_sessions = ChatSession.query.filter_by(user_id=student.id, crisis_flag=True).count()
+    
+    # Get recent crisis alerts with details
+    recent_crisis_alerts = CrisisAlert.query.filter(
+        CrisisAlert.user_id == student.id,
+        CrisisAlert.created_at >= thirty_days_ago
+    ).order_by(CrisisAlert.created_at.desc()).limit(5).all()
+    
+    # Get recent emotional states from chat intents
+    recent_intents = ChatIntent.query.filter(
+        ChatIntent.user_id == student.id,
+        ChatIntent.timestamp >= thirty_days_ago
+    ).order_by(ChatIntent.timestamp.desc()).limit(10).all()
+    
+    # Calculate current emotional state (most recent)
+    current_emotional_state = None
+    current_emotional_intensity = None
+    if recent_intents:
+        latest_intent = recent_intents[0]
+        current_emotional_state = latest_intent.emotional_state
+        current_emotional_intensity = latest_intent.emotional_intensity
+    
+    # Calculate consistency manually or use streak
+    engagement_level = "Low"
+    if student.login_streak > 5: engagement_level = "Medium"
+    if student.login_streak > 15: engagement_level = "High"
+    
+    # Activity stats
+    activity_stats = {
+        'total_activities': len(logs),
+        'meditation_count': sum(1 for l in logs if l.activity_type == 'meditation'),
+        'assessment_count': sum(1 for l in logs if l.activity_type == 'assessment'),
+        'chat_count': sum(1 for l in logs if l.activity_type == 'chat'),
+        'venting_count': sum(1 for l in logs if l.activity_type == 'venting')
+    }
+
+    # Parse assessment insights for mentor view
+    assessment_insights = []
+    for a in assessments:
+        if a.recommendations:
+            import json
+            try:
+                full_analysis = json.loads(a.recommendations)
+                mentor_data = full_analysis.get('mentor_view', {})
+                assessment_insights.append({
+                    'type': a.assessment_type,
+                    'severity': a.severity_level,
+                    'score': a.score,
+                    'date': a.completed_at.isoformat(),
+                    'mentor_guidance': mentor_data.get('guidance', ''),
+                    'action_items': mentor_data.get('action_items', []),
+                    'red_flags': mentor_data.get('red_flags', []),
+                    'requires_counselor': mentor_data.get('requires_counselor', False)
+                })
+            except:
+                assessment_insights.append({
+                    'type': a.assessment_type,
+                    'severity': a.severity_level,
+                    'score': a.score,
+                    'date': a.completed_at.isoformat()
+                })
+        else:
+            assessment_insights.append({
+                'type': a.assessment_type,
+                'severity': a.severity_level,
+                'score': a.score,
+                'date': a.completed_at.isoformat()
+            })
+
+    return {
+        'student_info': {
+            'name': student.full_name,
+            'streak': student.login_streak,
+            'email': student.email,
+            'crisis_flags': crisis_sessions,
+            'engagement': engagement_level,
+            'status': compute_student_statuses([student])[student.id]['status'],
+            'current_emotional_state': current_emotional_state,
+            'current_emotional_intensity': current_emotional_intensity,
+            'last_login': student.last_login.isoformat() if student.last_login else None,
+            'profile_picture': student.profile_picture
+        },
+        'recent_assessments': assessment_insights,
+        'crisis_alerts': [
+            {
+                'id': ca.id,
+                'severity': ca.severity,
+                'alert_type': ca.alert_type,
+                'message_snippet': ca.message_snippet,
+                'created_at': ca.created_at.isoformat(),
+                'acknowledged': ca.acknowledged
+            } for ca in recent_crisis_alerts
+        ],
+        'emotional_trends': [
+            {
+                'emotional_state': intent.emotional_state,
+                'emotional_intensity': intent.emotional_intensity,
+                'intent_type': intent.intent_type,
+                'timestamp': intent.timestamp.isoformat()
+            } for intent in recent_intents
+        ],
+        'recent_activity': [
+            {
+                'type': l.activity_type,
+                'action': l.action,
+                'date': l.timestamp.isoformat(),
+                'duration': l.duration
+            } for l in logs
+        ],
+        'activity_stats': activity_stats
+    }
+
 @ns.route('/student/<int:student_id>/insights')
 class StudentInsights(Resource):
     @login_required
@@ -286,134 +314,14 @@ class StudentInsights(Resource):
         if not is_connected and not is_same_org and current_user.role != 'admin':
             return {'message': 'Forbidden: Student not connected to you'}, 403
         
-        # Try to get from Redis cache first
-        cache_key = f"mentor:student_insights:{student_id}"
-        cached_insights = r_sessions.get(cache_key)
-        
-        if cached_insights:
-            return json.loads(cached_insights), 200
-        
-        # If not in cache, trigger background calculation and return quick version
-        precalculate_student_insights.delay(student_id)
-        
-        # Return quick basic info while background task runs
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        assessments = Assessment.query.filter_by(user_id=student.id).order_by(Assessment.completed_at.desc()).limit(5).all()
-        logs = UserActivityLog.query.filter_by(user_id=student.id).order_by(UserActivityLog.timestamp.desc()).limit(20).all()
-
-        # Get crisis flags (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        crisis_sessions = ChatSession.query.filter_by(user_id=student.id, crisis_flag=True).count()
-        
-        # Get recent crisis alerts with details
-        recent_crisis_alerts = CrisisAlert.query.filter(
-            CrisisAlert.user_id == student.id,
-            CrisisAlert.created_at >= thirty_days_ago
-        ).order_by(CrisisAlert.created_at.desc()).limit(5).all()
-        
-        # Get recent emotional states from chat intents
-        recent_intents = ChatIntent.query.filter(
-            ChatIntent.user_id == student.id,
-            ChatIntent.timestamp >= thirty_days_ago
-        ).order_by(ChatIntent.timestamp.desc()).limit(10).all()
-        
-        # Calculate current emotional state (most recent)
-        current_emotional_state = None
-        current_emotional_intensity = None
-        if recent_intents:
-            latest_intent = recent_intents[0]
-            current_emotional_state = latest_intent.emotional_state
-            current_emotional_intensity = latest_intent.emotional_intensity
-        
-        # Calculate consistency manually or use streak
-        engagement_level = "Low"
-        if student.login_streak > 5: engagement_level = "Medium"
-        if student.login_streak > 15: engagement_level = "High"
-        
-        # Activity stats
-        activity_stats = {
-            'total_activities': len(logs),
-            'meditation_count': sum(1 for l in logs if l.activity_type == 'meditation'),
-            'assessment_count': sum(1 for l in logs if l.activity_type == 'assessment'),
-            'chat_count': sum(1 for l in logs if l.activity_type == 'chat'),
-            'venting_count': sum(1 for l in logs if l.activity_type == 'venting')
-        }
-
-        # Parse assessment insights for mentor view
-        assessment_insights = []
-        for a in assessments:
-            if a.recommendations:
-                import json
-                try:
-                    full_analysis = json.loads(a.recommendations)
-                    mentor_data = full_analysis.get('mentor_view', {})
-                    assessment_insights.append({
-                        'type': a.assessment_type,
-                        'severity': a.severity_level,
-                        'score': a.score,
-                        'date': a.completed_at.isoformat(),
-                        'mentor_guidance': mentor_data.get('guidance', ''),
-                        'action_items': mentor_data.get('action_items', []),
-                        'red_flags': mentor_data.get('red_flags', []),
-                        'requires_counselor': mentor_data.get('requires_counselor', False)
-                    })
-                except:
-                    assessment_insights.append({
-                        'type': a.assessment_type,
-                        'severity': a.severity_level,
-                        'score': a.score,
-                        'date': a.completed_at.isoformat()
-                    })
-            else:
-                assessment_insights.append({
-                    'type': a.assessment_type,
-                    'severity': a.severity_level,
-                    'score': a.score,
-                    'date': a.completed_at.isoformat()
-                })
-
-        return {
-            'student_info': {
-                'name': student.full_name,
-                'streak': student.login_streak,
-                'email': student.email,
-                'crisis_flags': crisis_sessions,
-                'engagement': engagement_level,
-                'status': calculate_user_status(student.id),
-                'current_emotional_state': current_emotional_state,
-                'current_emotional_intensity': current_emotional_intensity,
-                'last_login': student.last_login.isoformat() if student.last_login else None,
-                'profile_picture': student.profile_picture
-            },
-            'recent_assessments': assessment_insights,
-            'crisis_alerts': [
-                {
-                    'id': ca.id,
-                    'severity': ca.severity,
-                    'alert_type': ca.alert_type,
-                    'message_snippet': ca.message_snippet,
-                    'created_at': ca.created_at.isoformat(),
-                    'acknowledged': ca.acknowledged
-                } for ca in recent_crisis_alerts
-            ],
-            'emotional_trends': [
-                {
-                    'emotional_state': intent.emotional_state,
-                    'emotional_intensity': intent.emotional_intensity,
-                    'intent_type': intent.intent_type,
-                    'timestamp': intent.timestamp.isoformat()
-                } for intent in recent_intents
-            ],
-            'recent_activity': [
-                {
-                    'type': l.activity_type,
-                    'action': l.action,
-                    'date': l.timestamp.isoformat(),
-                    'duration': l.duration
-                } for l in logs
-            ],
-            'activity_stats': activity_stats
-        }, 200
+        # Cache-aside: one recompute per student (single flight), refreshed in the background before it goes stale
+        insights = cached_value(
+            insights_cache_key(student_id),
+            lambda: build_student_insights(student),
+            ttl=INSIGHTS_CACHE_TTL,
+            refresh=lambda: precalculate_student_insights.delay(student_id)
+        )
+        return insights, 200
 
 @ns.route('/connect')
 class ConnectMentor(Resource):
@@ -448,6 +356,15 @@ class ListMentors(Resource):
             } for m in mentors
         ], 200
 
+@ns.route('/org-dashboard')
+class OrgDashboard(Resource):
+    @login_required
+    def get(self):
+        """Organisation-wide wellbeing figures (same data as /mentor_dashboard)"""
+        if current_user.role not in ['teacher', 'admin']:
+            return {'message': 'Unauthorized'}, 403
+        return cached_org_dashboard_stats(current_user.organization_id), 200
+
 @ns.route('/notifications')
 class MentorNotifications(Resource):
     @login_required
@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask_login import login_required, current_user
-from db_models import MeditationSession, RoutineTask, Assessment
+from db_models import RoutineTask
+from utils.rollups import activity_totals, prefixed_total, MEDITATION_PREFIX, ASSESSMENT_PREFIX
 
 ns = Namespace('perenall', description='Kalpavriksha Plant Companion')
 
@@ -9,9 +10,11 @@ class PlantStats(Resource):
     @login_required
     def get(self):
         """Get plant growth points"""
-        med_count = MeditationSession.query.filter_by(user_id=current_user.id).count()
+        totals = activity_totals(current_user.id)
+        med_count, _ = prefixed_total(totals, MEDITATION_PREFIX)
+        assess_count, _ = prefixed_total(totals, ASSESSMENT_PREFIX)
+        # Task status can flip back and forth, so completed tasks are counted live
         task_count = RoutineTask.query.filter_by(user_id=current_user.id, status='completed').count()
-        assess_count = Assessment.query.filter_by(user_id=current_user.id).count()
         
         points = (med_count * 5) + (task_count * 3) + (assess_count * 7)
         return {'growth_points': points, 'level': (points // 50) + 1}, 200
@@ -44,10 +44,6 @@ class Routine(Resource):
         db.session.add(task)
         db.session.commit()
         
-        # Invalidate Dashboard Cache
-        from api.dashboard_api import invalidate_dashboard_cache
-        invalidate_dashboard_cache(current_user.id)
-        
         return task.as_dict(), 201
 
 @ns.route('/<int:task_id>/toggle')
@@ -62,10 +58,6 @@ class ToggleTask(Resource):
         task.status = 'completed' if task.status == 'pending' else 'pending'
         db.session.commit()
         
-        # Invalidate Dashboard Cache
-        from api.dashboard_api import invalidate_dashboard_cache
-        invalidate_dashboard_cache(current_user.id)
-        
         return {'id': task.id, 'status': task.status}, 200
 
 @ns.route('/<int:task_id>')
@@ -80,8 +72,4 @@ class DeleteTask(Resource):
         db.session.delete(task)
         db.session.commit()
         
-        # Invalidate Dashboard Cache
-        from api.dashboard_api import invalidate_dashboard_cache
-        invalidate_dashboard_cache(current_user.id)
-        
         return {'message': 'Task deleted successfully'}, 200
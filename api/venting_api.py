@@ -1,9 +1,14 @@
-from flask import request
+from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
 from flask_login import login_required, current_user
 from db_models import VentingPost, VentingResponse, VentingPostLike, SoundVentingSession, User
-from database import db, cache
+from database import db
 from datetime import datetime
+from utils.rate_limiter import rate_limit
+from utils.pagination import page_args, page_headers
+from utils.venting_feed import feed_page, refresh_posts
+from utils.like_store import set_like, forget_like_state
+from sqlalchemy import update, func, case
 
 ns = Namespace('venting', description='Community support and emotional expression')
 
@@ -30,43 +35,13 @@ sound_venting_model = ns.model('SoundVentingSession', {
 class Posts(Resource):
     @login_required
     def get(self):
-        """Get all posts for Community Support (Cached per user)"""
-        cache_key = f"community_posts_user_{current_user.id}"
-        cached = cache.get(cache_key)
-        if cached:
-            return cached, 200
-
-        posts = VentingPost.query.order_by(VentingPost.created_at.desc()).all()
-        
-        # Get list of post IDs liked by current user
-        liked_post_ids = [l.post_id for l in VentingPostLike.query.filter_by(user_id=current_user.id).all()]
-        
-        result = [
-            {
-                'id': p.id,
-                'content': p.content,
-                'anonymous': p.anonymous,
-                'author': 'Anonymous' if p.anonymous else User.query.get(p.user_id).username,
-                'created_at': p.created_at.isoformat(),
-                'likes': p.likes,
-                'liked_by_me': p.id in liked_post_ids,
-                'responses': [
-                    {
-                        'id': r.id,
-                        'content': r.content,
-                        'author': 'Anonymous' if r.anonymous else User.query.get(r.user_id).username,
-                        'created_at': r.created_at.isoformat()
-                    } for r in p.responses
-                ] if p.responses else [],
-                'responses_count': len(p.responses) if p.responses else 0,
-                'is_owner': p.user_id == current_user.id
-            } for p in posts
-        ]
-        
-        cache.set(cache_key, result, timeout=300)
-        return result, 200
+        """Get posts for Community Support, newest first (paginated with ?limit=&cursor=)"""
+        limit, after = page_args()
+        posts, next_cursor = feed_page(current_user.id, limit, after)
+        return posts, 200, page_headers(next_cursor)
 
     @login_required
+    @rate_limit('venting')
     @ns.expect(post_model)
     def post(self):
         """Create a new community support post"""
@@ -78,40 +53,57 @@ class Posts(Resource):
         )
         db.session.add(post)
         db.session.commit()
-        # Invalidate ALL community caches because a new post/like affects everyone's view (likes/responses)
-        # However, since we use per-user keys, we either need a way to clear all or just accept 5min stale for others.
-        # Redis scan/delete is heavy. Better to use a versioned key if we want instant.
-        # For now, let's just clear the current user's cache and let others catch up.
-        cache.delete(f"community_posts_user_{current_user.id}")
+        # The cache event does this too; doing it here lets the author see the post on their next read
+        refresh_posts([post.id])
         return {'message': 'Post created', 'id': post.id}, 201
 
+def _set_like_in_database(post_id, user_id, wanted):
+    """set_like() against the database, for when Redis is unavailable"""
+    if not VentingPost.query.get(post_id):
+        return None
+    existing_like = VentingPostLike.query.filter_by(post_id=post_id, user_id=user_id).first()
+    liked = not existing_like if wanted is None else bool(wanted)
+    if liked == bool(existing_like):
+        return liked, VentingPost.query.get(post_id).likes, False
+    if existing_like:
+        db.session.delete(existing_like)
+    else:
+        db.session.add(VentingPostLike(post_id=post_id, user_id=user_id))
+    new_count = func.coalesce(VentingPost.likes, 0) + (1 if liked else -1)
+    likes = db.session.execute(
+        update(VentingPost).where(VentingPost.id == post_id)
+        .values(likes=case((new_count < 0, 0), else_=new_count))
+        .returning(VentingPost.likes)
+    ).scalar()
+    db.session.commit()
+    return liked, likes, True
+
 @ns.route('/posts/<int:post_id>/like')
 class LikePost(Resource):
     @login_required
+    @rate_limit('venting')
     def post(self, post_id):
-        """Like or Unlike a post"""
-        post = VentingPost.query.get_or_404(post_id)
-        existing_like = VentingPostLike.query.filter_by(post_id=post_id, user_id=current_user.id).first()
-        
-        if existing_like:
-            # Unlike logic: remove like and decrement count
-            db.session.delete(existing_like)
-            post.likes = max(0, post.likes - 1)
-            db.session.commit()
-            cache.delete(f"community_posts_user_{current_user.id}")
-            return {'likes': post.likes, 'liked': False}, 200
-        else:
-            # Like logic: add like and increment count
-            new_like = VentingPostLike(post_id=post_id, user_id=current_user.id)
-            db.session.add(new_like)
-            post.likes += 1
-            db.session.commit()
-            cache.delete(f"community_posts_user_{current_user.id}")
-            return {'likes': post.likes, 'liked': True}, 200
+        """Like or Unlike a post ({"liked": true|false} sets the state, no body toggles it)"""
+        wanted = (request.get_json(silent=True) or {}).get('liked')
+        try:
+            result = set_like(post_id, current_user.id, wanted)
+        except Exception as e:
+            current_app.logger.error(f"❌ Like store unavailable ({e}), writing like to the database")
+            result = _set_like_in_database(post_id, current_user.id, wanted)
+            try:
+                # Redis may be back (or only the script failed): its copy is stale now
+                forget_like_state(post_id, current_user.id)
+            except Exception:
+                pass
+        if result is None:
+            return {'message': 'Post not found'}, 404
+        liked, likes, _ = result
+        return {'likes': likes, 'liked': liked}, 200
 
 @ns.route('/responses')
 class Responses(Resource):
     @login_required
+    @rate_limit('venting')
     @ns.expect(response_model)
     def post(self):
         """Respond to a post"""
@@ -124,16 +116,13 @@ class Responses(Resource):
         )
         db.session.add(response)
         db.session.commit()
-        # Invalidate ALL community caches because a new post/like affects everyone's view (likes/responses)
-        # However, since we use per-user keys, we either need a way to clear all or just accept 5min stale for others.
-        # Redis scan/delete is heavy. Better to use a versioned key if we want instant.
-        # For now, let's just clear the current user's cache and let others catch up.
-        cache.delete(f"community_posts_user_{current_user.id}")
+        refresh_posts([response.post_id])
         return {'message': 'Response added', 'id': response.id, 'likes': 0}, 201
 
 @ns.route('/sound_session')
 class SoundSession(Resource):
     @login_required
+    @rate_limit('venting')
     @ns.expect(sound_venting_model)
     def post(self):
         """Save a sound venting session"""
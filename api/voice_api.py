@@ -1,8 +1,11 @@
-from flask import request
+from flask import request, Response, stream_with_context
 from flask_restx import Namespace, Resource, fields
 from flask_login import login_required
 import os
 import tempfile
+from utils.rate_limiter import rate_limit
+from utils.voice_turn import speak_turn, speaker_for
+from api.chatbot_api import start_chat_turn, sse_event, CHAT_RATE_LIMITED
 
 ns = Namespace('voice', description='Voice services (TTS and STT)')
 
@@ -13,6 +16,7 @@ tts_model = ns.model('TTSRequest', {
 @ns.route('/tts')
 class TextToSpeech(Resource):
     @login_required
+    @rate_limit('voice')
     @ns.expect(tts_model)
     def post(self):
         """Convert text to speech (TTS)"""
@@ -32,6 +36,7 @@ class TextToSpeech(Resource):
 @ns.route('/transcribe')
 class VoiceTranscribeAPI(Resource):
     @login_required
+    @rate_limit('voice')
     def post(self):
         """Transcribe audio file to text (STT)"""
         if 'audio' not in request.files:
@@ -55,3 +60,53 @@ class VoiceTranscribeAPI(Resource):
                     os.unlink(temp_path)
         except Exception as e:
             return {'message': f'Transcription failed: {str(e)}'}, 500
+
+@ns.route('/turn')
+class VoiceTurn(Resource):
+    @login_required
+    @rate_limit('chatbot', body=CHAT_RATE_LIMITED)
+    def post(self):
+        """
+        One voice turn as Server-Sent Events: an `audio` file (multipart, with optional
+        session_id) or JSON {message, session_id} in; transcript, the /chat/stream
+        events and an `audio` event per spoken sentence out.
+        """
+        try:
+            from sarvam_voice_service import sarvam_voice_service
+        except Exception as e:
+            return {'message': f'Voice service unavailable: {str(e)}'}, 503
+
+        if 'audio' in request.files:
+            session_id = request.form.get('session_id', type=int)
+            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
+                request.files['audio'].save(temp_file.name)
+                temp_path = temp_file.name
+            try:
+                message = sarvam_voice_service.transcribe_audio(temp_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+        else:
+            data = request.get_json(silent=True) or {}
+            message, session_id = data.get('message'), data.get('session_id')
+        if not message:
+            return {'message': 'No speech detected'}, 400
+
+        events = speak_turn(
+            start_chat_turn(message, session_id, frame=lambda event, data: (event, data)),
+            speaker_for(sarvam_voice_service, message)
+        )
+
+        def stream():
+            try:
+                yield sse_event('transcript', {'transcript': message})
+                for event, data in events:
+                    yield sse_event(event, data)
+            finally:
+                events.close()
+
+        return Response(
+            stream_with_context(stream()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
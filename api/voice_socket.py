@@ -0,0 +1,197 @@
+"""
+Streaming voice chat over Socket.IO (namespace /voice, login required).
+
+Client -> server:
+    stt_start  {session_id?, sample_rate?, speak?}
+                                                open a stream at 8000, 16000 (default) or
+                                                48000 Hz; with speak, replies are also spoken
+    stt_audio  {seq, pcm}                       16-bit little-endian mono PCM, any frame size;
+                                                seq counts up from 0 per stream
+    stt_stop   {seq}                            end of audio (seq = the next frame's): finish
+                                                the current utterance and close the stream
+
+Server -> client:
+    stt_ready    {sample_rate}
+    stt_partial  {text, stable}                 running transcript; `stable` has stopped changing
+    stt_final    {transcript}                   utterance ended, sent to the chatbot
+    chat_session / chat_token / chat_done       the /chat/stream events for that turn
+    chat_audio   {seq, text, audio_url, audio}  with speak: WAV bytes per reply sentence,
+                                                synthesised while the next is generated
+    chat_error   {message}                      e.g. rate limited (CHAT_RATE_LIMITED body)
+    stt_error    {message}
+
+Socket.IO runs each event in its own thread, so frames (and the stop) are put back in
+seq order under the stream's lock. The chat turn runs after the lock is released: the
+student can keep talking (or interrupt) while the reply streams.
+"""
+import threading
+
+from flask import request, current_app
+from flask_login import current_user
+from flask_socketio import emit
+
+from api.chat_socket import socketio
+from api.chatbot_api import start_chat_turn, CHAT_RATE_LIMITED
+from utils.rate_limiter import limiter
+from utils.speech_backends import VOSK_SAMPLE_RATE, recognizer_pool
+from utils.streaming_stt import StreamingTranscriber, SAMPLE_RATES
+from utils.voice_turn import speak_turn, speaker_for
+from utils.audio_cache import lookup
+
+NAMESPACE = '/voice'
+MAX_FRAME_BYTES = 64 * 1024
+MAX_REORDER_FRAMES = 50
+
+
+class VoiceStream:
+    def __init__(self, session_id, sample_rate, speak=False):
+        self.session_id = session_id
+        self.speak = speak
+        self.transcriber = StreamingTranscriber(recognizer_pool(), sample_rate)
+        self.lock = threading.Lock()
+        self.next_seq = 0
+        self.waiting = {}
+        self.stopped = False
+
+    def feed(self, seq, pcm):
+        """Transcriber events for every frame now in order; pcm=None marks the end (caller holds the lock)"""
+        if seq < self.next_seq or self.stopped:
+            return []
+        self.waiting[seq] = pcm
+        if len(self.waiting) > MAX_REORDER_FRAMES:
+            # A frame never arrived: carry on from the oldest one we have
+            self.next_seq = min(self.waiting)
+        events = []
+        while self.next_seq in self.waiting:
+            frame = self.waiting.pop(self.next_seq)
+            self.next_seq += 1
+            if frame is None:
+                self.stopped = True
+                return events + self.transcriber.finish()
+            events += self.transcriber.feed(frame)
+        return events
+
+
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def _close_stream(sid, stream=None):
+    """Drop sid's stream (only if it is still `stream`, when given)"""
+    with _streams_lock:
+        if stream is None or _streams.get(sid) is stream:
+            stream = _streams.pop(sid, None)
+        else:
+            stream = None
+    if stream:
+        with stream.lock:
+            stream.transcriber.close()
+
+
+def _frame_seq(stream, data):
+    """seq of a frame (the stream's next one when omitted); None after emitting stt_error when malformed"""
+    seq = (data or {}).get('seq', stream.next_seq)
+    if type(seq) is not int or seq < 0:
+        emit('stt_error', {'message': 'seq must be a non-negative integer.'})
+        return None
+    return seq
+
+
+def _feed(stream, seq, pcm):
+    try:
+        with stream.lock:
+            events = stream.feed(seq, pcm)
+    except Exception as e:
+        current_app.logger.error(f"❌ Streaming STT failed: {e}")
+        emit('stt_error', {'message': 'Voice input failed. Please try again.'})
+        _close_stream(request.sid, stream)
+        return
+    if stream.stopped:
+        _close_stream(request.sid, stream)
+    _run_turns(stream, events)
+
+
+def _run_turns(stream, events):
+    """Emit transcriber events; each final transcript becomes a chat turn"""
+    for kind, data in events:
+        emit(f"stt_{kind}", data)
+        if kind != 'final':
+            continue
+        decision = limiter.check('chatbot', current_user.id, current_user.role)
+        if not decision.allowed:
+            emit('chat_error', CHAT_RATE_LIMITED)
+            continue
+        try:
+            turn = start_chat_turn(data['transcript'], stream.session_id, frame=lambda e, d: (e, d))
+            if stream.speak:
+                from sarvam_voice_service import sarvam_voice_service
+                turn = speak_turn(turn, speaker_for(sarvam_voice_service, data['transcript']))
+            for event, payload in turn:
+                if event == 'session':
+                    stream.session_id = payload['session_id']
+                elif event == 'audio' and payload['audio_url']:
+                    path = lookup(payload['audio_url'].rsplit('/', 1)[-1].removesuffix('.wav'))
+                    if path:
+                        with open(path, 'rb') as f:
+                            payload = {**payload, 'audio': f.read()}
+                emit(f"chat_{event}", payload)
+        except Exception as e:
+            current_app.logger.error(f"❌ Voice chat turn failed: {e}")
+            emit('chat_error', {'message': 'Could not answer that. Please try again.'})
+
+
+@socketio.on('connect', namespace=NAMESPACE)
+def voice_connect():
+    if not current_user.is_authenticated:
+        return False
+
+
+@socketio.on('stt_start', namespace=NAMESPACE)
+def stt_start(data=None):
+    data = data or {}
+    decision = limiter.check('voice', current_user.id, current_user.role)
+    if not decision.allowed:
+        emit('stt_error', {'message': 'Too many requests. Please slow down.'})
+        return
+    sample_rate = data.get('sample_rate') or VOSK_SAMPLE_RATE
+    if type(sample_rate) is not int or sample_rate not in SAMPLE_RATES:
+        emit('stt_error', {'message': f'Unsupported sample rate. Use one of {", ".join(map(str, SAMPLE_RATES))}.'})
+        return
+    _close_stream(request.sid)
+    try:
+        stream = VoiceStream(data.get('session_id'), sample_rate, bool(data.get('speak')))
+        # Load the model now rather than on the first word
+        stream.transcriber.pool.model()
+    except Exception as e:
+        current_app.logger.error(f"❌ Streaming STT unavailable: {e}")
+        emit('stt_error', {'message': 'Voice input is not available right now.'})
+        return
+    with _streams_lock:
+        _streams[request.sid] = stream
+    emit('stt_ready', {'sample_rate': stream.transcriber.sample_rate})
+
+
+@socketio.on('stt_audio', namespace=NAMESPACE)
+def stt_audio(data):
+    stream = _streams.get(request.sid)
+    pcm = (data or {}).get('pcm')
+    if not stream or not isinstance(pcm, (bytes, bytearray)) or len(pcm) > MAX_FRAME_BYTES:
+        return
+    seq = _frame_seq(stream, data)
+    if seq is not None:
+        _feed(stream, seq, bytes(pcm))
+
+
+@socketio.on('stt_stop', namespace=NAMESPACE)
+def stt_stop(data=None):
+    stream = _streams.get(request.sid)
+    if not stream:
+        return
+    seq = _frame_seq(stream, data)
+    if seq is not None:
+        _feed(stream, seq, None)
+
+
+@socketio.on('disconnect', namespace=NAMESPACE)
+def voice_disconnect():
+    _close_stream(request.sid)
@@ -20,7 +20,7 @@ from flask_caching import Cache
 import json
 
 # app.py mein ye add karo
-from ollama import Client
+from models.llm_client import get_llm_client
 
 # Load environment variables
 load_dotenv()
@@ -41,11 +41,21 @@ app = Flask(__name__, template_folder='old_tries/templates', static_folder='old_
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
-# Global Ollama client
-ollama_client = Client(host='http://localhost:11434')
-app.config['OLLAMA_CLIENT'] = ollama_client
+# Ollama client factory: one pooled client (keep-alive connections + circuit breaker) per
+# process, created on first use so forked workers never share a parent's connections
+app.config['OLLAMA_CLIENT_FACTORY'] = get_llm_client
 app.config['INTENT_MODEL'] = 'intent_classifier:latest'
 app.config['CONVO_MODEL'] = 'convo_LLM:latest'
+# Per-call read timeouts (seconds); connect timeout is OLLAMA_CONNECT_TIMEOUT
+app.config['OLLAMA_INTENT_TIMEOUT'] = float(os.environ.get('OLLAMA_INTENT_TIMEOUT', 30))
+app.config['OLLAMA_CONVO_TIMEOUT'] = float(os.environ.get('OLLAMA_CONVO_TIMEOUT', 120))
+# 'sequential' (intent -> convo) or 'pipelined' (speculative convo in parallel with intent)
+app.config['CHAT_PIPELINE_MODE'] = os.environ.get('CHAT_PIPELINE_MODE', 'sequential')
+# Micro-batch intent_classifier calls across concurrent chat requests
+app.config['INTENT_BATCHING'] = os.environ.get('INTENT_BATCHING', 'false').lower() == 'true'
+app.config['INTENT_BATCH_WINDOW_MS'] = int(os.environ.get('INTENT_BATCH_WINDOW_MS', 5))
+app.config['INTENT_BATCH_MAX'] = int(os.environ.get('INTENT_BATCH_MAX', 16))
+app.config['INTENT_BATCH_CONCURRENCY'] = int(os.environ.get('INTENT_BATCH_CONCURRENCY', 4))  # match OLLAMA_NUM_PARALLEL
 
 
 # Selective origins to allow credentials (wildcard '*' won't work with supports_credentials=True)
@@ -55,7 +65,8 @@ allowed_origins = [
     "http://localhost:3000",
     "http://localhost:3000"
 ]
-CORS(app, resources={r"/api/*": {"origins": allowed_origins}}, supports_credentials=True)
+CORS(app, resources={r"/api/*": {"origins": allowed_origins}}, supports_credentials=True,
+     expose_headers=['X-Next-Cursor', 'X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset', 'Retry-After'])
 
 api = Api(app, 
           title='Mental Health Support API',
@@ -194,6 +205,8 @@ def load_user(user_id):
 
 with app.app_context():
     import db_models
+    import utils.risk_snapshot  # Keeps StudentRiskSnapshot rows in step with new intents/alerts/activity
+    import utils.rollups  # Upserts daily_user_activity / daily_org_emotions on write
     db.create_all()
     logging.info("Database tables created")
 
@@ -244,8 +257,18 @@ api.add_namespace(activity_ns, path='/activity')
 api.add_namespace(mentor_ns, path='/mentor')
 api.add_namespace(counsellor_ns, path='/counsellor')
 
+def start_background_services():
+    """Threads only the web server runs (main.py); Celery, flask db and scripts import app without them"""
+    # Cache owners registered their invalidation handlers on import above; this process now receives events
+    from utils.cache_events import start_listener
+    start_listener(app)
+    # Synthesise the fixed replies in the background so their audio is ready (paid TTS calls)
+    from utils.audio_cache import start_prewarm
+    start_prewarm()
+
 # Initialize SocketIO
 from api.chat_socket import socketio
+import api.voice_socket  # streaming speech-to-text (/voice namespace)
 socketio.init_app(app, cors_allowed_origins=allowed_origins, async_mode='threading', manage_session=False)
 
 # SocketIO initialization is done above: socketio.init_app(app)
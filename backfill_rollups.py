@@ -0,0 +1,43 @@
+"""
+Recompute the daily_user_activity / daily_org_emotions rollups from the raw tables.
+Run once after the add_daily_rollups migration; safe to re-run for any range.
+
+    python backfill_rollups.py                          # all history
+    python backfill_rollups.py 2026-09-01 2026-09-30    # one date range
+"""
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+
+from app import app
+from database import db
+from db_models import UserActivityLog, MeditationSession, Assessment, ChatIntent
+from utils.rollups import rebuild_rollups
+
+CHUNK_DAYS = 31
+
+def backfill_rollups(start=None, end=None):
+    with app.app_context():
+        if start is None:
+            firsts = [db.session.query(func.min(column)).scalar() for column in (
+                UserActivityLog.timestamp, MeditationSession.completed_at, Assessment.completed_at, ChatIntent.timestamp
+            )]
+            firsts = [f for f in firsts if f]
+            start = min(firsts).date() if firsts else datetime.utcnow().date()
+        end = end or datetime.utcnow().date()
+        print(f"Backfilling rollups from {start} to {end}...")
+        total_activity = total_emotions = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=CHUNK_DAYS - 1), end)
+            activity, emotions = rebuild_rollups(db.session, chunk_start, chunk_end)
+            total_activity += activity
+            total_emotions += emotions
+            print(f"  {chunk_start} .. {chunk_end}: {activity} activity groups, {emotions} emotion groups")
+            chunk_start = chunk_end + timedelta(days=1)
+        print(f"✅ Backfilled {total_activity} activity groups and {total_emotions} emotion groups")
+
+if __name__ == "__main__":
+    dates = [date.fromisoformat(arg) for arg in sys.argv[1:3]]
+    backfill_rollups(*dates)
@@ -0,0 +1,72 @@
+"""
+Sequential vs pipelined chat generation against the stub Ollama server.
+
+Times api.chatbot_api.generate_chat_reply in both CHAT_PIPELINE_MODE settings
+for an ordinary message, a crisis caught only by the intent model (speculative
+reply discarded and re-generated) and a keyword crisis (no convo call at all).
+
+    python -m benchmarks.chat_pipeline_bench --runs 10 --intent-latency 0.3 --convo-latency 1.0
+"""
+import argparse
+import logging
+import statistics
+import time
+
+from flask import Flask
+
+from benchmarks.stub_ollama import start_stub_server
+from models.llm_client import LLMClient
+
+MESSAGES = {
+    'normal': "I have an exam tomorrow and my heart keeps racing",
+    'model crisis': "honestly everyone would be better if I just die",
+    'keyword crisis': "sos this is an emergency",
+}
+
+
+def time_mode(mode, client, runs):
+    from api.chatbot_api import generate_chat_reply
+
+    app = Flask(__name__)
+    app.config.update(
+        OLLAMA_CLIENT_FACTORY=lambda: client,
+        INTENT_MODEL='intent_classifier:latest',
+        CONVO_MODEL='convo_LLM:latest',
+        CHAT_PIPELINE_MODE=mode,
+    )
+    app.logger.setLevel(logging.ERROR)
+    results = {}
+    with app.app_context():
+        for label, message in MESSAGES.items():
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                generate_chat_reply(message)
+                timings.append(time.perf_counter() - start)
+            results[label] = timings
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--intent-latency', type=float, default=0.3)
+    parser.add_argument('--convo-latency', type=float, default=1.0)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.intent_latency, args.convo_latency)
+    client = LLMClient(host=base_url)
+    try:
+        print(f"stub: intent={args.intent_latency}s convo={args.convo_latency}s runs={args.runs}\n")
+        print(f"{'mode':<12} {'message':<16} {'mean ms':>9} {'p50 ms':>9} {'max ms':>9}")
+        for mode in ('sequential', 'pipelined'):
+            for label, timings in time_mode(mode, client, args.runs).items():
+                print(f"{mode:<12} {label:<16} {statistics.mean(timings) * 1000:9.1f} "
+                      f"{statistics.median(timings) * 1000:9.1f} {max(timings) * 1000:9.1f}")
+        print(f"\nmodel calls: {server.calls}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Load test: one intent_classifier call per request vs the micro-batched IntentBatcher.
+
+Simulates a burst (a hostel after an exam): --users concurrent clients each send
+--requests messages drawn from a small pool with skewed popularity, against the
+stub Ollama server with --parallel generation slots. Reports p50/p99 latency,
+throughput and the number of model calls for each path.
+
+    python -m benchmarks.intent_batch_loadtest --users 64 --requests 4 --parallel 4
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from benchmarks.stub_ollama import start_stub_server
+from models.llm_client import LLMClient
+from utils.intent_batcher import IntentBatcher
+
+INTENT_MODEL = 'intent_classifier:latest'
+
+BURST_MESSAGES = [
+    "I think I failed the exam",
+    "exam was so bad i feel sick",
+    "I can't stop overthinking the paper",
+    "I'm so stressed about results",
+    "my parents will be disappointed",
+    "I studied so hard and still blanked out",
+    "everyone else found it easy",
+    "I can't sleep after the exam",
+    "feeling anxious about tomorrow's paper",
+    "I don't know how to tell my parents",
+    "my chest feels tight",
+    "I just want to talk to someone",
+]
+
+
+def build_workload(users, requests, seed):
+    rng = random.Random(seed)
+    # Zipf-like popularity: a few complaints dominate a burst
+    weights = [1 / (rank + 1) for rank in range(len(BURST_MESSAGES))]
+    return [rng.choices(BURST_MESSAGES, weights, k=requests) for _ in range(users)]
+
+
+def run(workload, classify):
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(workload) + 1)
+
+    def user(messages):
+        barrier.wait()
+        for message in messages:
+            start = time.perf_counter()
+            classify(message)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=user, args=(messages,)) for messages in workload]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def report(label, latencies, wall, calls):
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"{label:<10} {cuts[49] * 1000:9.1f} {cuts[98] * 1000:9.1f} {len(latencies) / wall:10.1f} {calls:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=4)
+    parser.add_argument('--intent-latency', type=float, default=0.3)
+    parser.add_argument('--parallel', type=int, default=4, help='stub generation slots (OLLAMA_NUM_PARALLEL)')
+    parser.add_argument('--window-ms', type=int, default=5)
+    parser.add_argument('--max-batch', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(intent_latency=args.intent_latency, parallel=args.parallel)
+    client = LLMClient(host=base_url)
+    workload = build_workload(args.users, args.requests, args.seed)
+    try:
+        print(f"stub: intent={args.intent_latency}s parallel={args.parallel} "
+              f"users={args.users} requests/user={args.requests}\n")
+        print(f"{'path':<10} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>10} {'model calls':>11}")
+
+        latencies, wall = run(workload, lambda m: client.generate(model=INTENT_MODEL, prompt=m, stream=False))
+        report('direct', latencies, wall, server.calls.pop(INTENT_MODEL, 0))
+
+        batcher = IntentBatcher(client, INTENT_MODEL, window_ms=args.window_ms,
+                                max_batch=args.max_batch, max_concurrency=args.parallel)
+        latencies, wall = run(workload, batcher.classify)
+        report('batched', latencies, wall, server.calls.pop(INTENT_MODEL, 0))
+        print(f"\nbatcher: {batcher.stats}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
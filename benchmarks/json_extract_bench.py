@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: regex extract_json vs the brace-balanced JsonObjectStream.
+
+Runs every sample in benchmarks/data/llm_outputs.jsonl (intent_classifier / convo_LLM
+style outputs: clean, pretty-printed with a summary, fenced, nested, braces inside
+strings, trailing text, a broken object before the real one) through:
+
+    regex   - the previous extractor: re.findall(r"\\{[\\s\\S]*?\\}") + json.loads per match
+    full    - extract_json() over the complete text
+    stream  - JsonObjectStream fed 4-character tokens, stopping at the first object
+
+and reports mean microseconds per sample (plus the stream path's cost per token, which
+is what the live chat path pays as tokens arrive) and whether each path recovered the object.
+A --pad option prepends N KB of plain text to every sample to show scaling.
+
+    python -m benchmarks.json_extract_bench --repeat 2000 --pad 16
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'models'))
+from json_sanitizer import extract_json, JsonObjectStream
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'data', 'llm_outputs.jsonl')
+
+
+def regex_extract_json(text):
+    """The extractor this module replaced"""
+    if not text:
+        return None
+    for block in re.findall(r"\{[\s\S]*?\}", text):
+        try:
+            return json.loads(block)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def stream_extract_json(text, token_size=4):
+    stream = JsonObjectStream()
+    for i in range(0, len(text), token_size):
+        obj = stream.feed(text[i:i + token_size])
+        if obj is not None:
+            return obj
+    return stream.finish()
+
+
+def expected_object(text):
+    """Reference answer: first position where json.JSONDecoder can decode a full object"""
+    decoder = json.JSONDecoder()
+    for i, ch in enumerate(text):
+        if ch == '{':
+            try:
+                obj, _ = decoder.raw_decode(text, i)
+                return obj
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def bench(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(text)
+    return (time.perf_counter() - start) / repeat * 1e6, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--pad', type=int, default=0, help='KB of plain text prepended to every sample')
+    args = parser.parse_args()
+
+    with open(CORPUS, encoding='utf-8') as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+    padding = ('The model is thinking out loud here. ' * 30)[:1024] * args.pad
+
+    paths = {'regex': regex_extract_json, 'full': extract_json, 'stream': stream_extract_json}
+    totals = {name: 0.0 for name in paths}
+    correct = {name: 0 for name in paths}
+
+    print(f"{'sample':<26}" + ''.join(f"{name + ' us':>12}" for name in paths) + f"{'us/token':>10}   ok (regex/full/stream)")
+    for sample in samples:
+        text = padding + sample['output']
+        expected = expected_object(text)
+        row, marks = [], []
+        for name, fn in paths.items():
+            micros, result = bench(fn, text, args.repeat)
+            totals[name] += micros
+            ok = result == expected
+            correct[name] += ok
+            row.append(f"{micros:12.1f}")
+            marks.append('y' if ok else 'n')
+        per_token = micros / max(1, -(-len(text) // 4))
+        print(f"{sample['name']:<26}" + ''.join(row) + f"{per_token:10.2f}   " + '/'.join(marks))
+
+    print(f"\n{'mean':<26}" + ''.join(f"{totals[name] / len(samples):12.1f}" for name in paths))
+    print(f"{'correct':<26}" + ''.join(f"{correct[name]:>9}/{len(samples):<2}" for name in paths))
+
+
+if __name__ == '__main__':
+    main()
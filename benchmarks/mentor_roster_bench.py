@@ -0,0 +1,118 @@
+"""
+Mentor roster status: per-student queries vs the batched status engine.
+
+Creates a bench organisation with a mentor and up to max(--sizes) students (reused on
+later runs), fills their history with seed_insights.seed_insights() (which seeds every
+student in the database), then for each roster size computes status + has_risk the
+way MentorStudents.get used to (calculate_user_status plus a crisis-session count per
+student) and with utils.student_status.compute_student_statuses, reporting SQL
+statements per request and latency. Needs the app database (DATABASE_URL).
+
+    python -m benchmarks.mentor_roster_bench --sizes 25,100,400 --repeat 5
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import app, db
+from db_models import User, Organization, ChatSession, CrisisAlert, ChatIntent, UserActivityLog
+from utils.student_status import compute_student_statuses
+
+BENCH_ORG = 'Roster Bench Org'
+
+
+def legacy_status(student_id):
+    """calculate_user_status before the batched engine"""
+    seven_days_ago = datetime.utcnow() - timedelta(days=7)
+    recent_crisis = CrisisAlert.query.filter(
+        CrisisAlert.user_id == student_id,
+        CrisisAlert.created_at >= seven_days_ago
+    ).order_by(CrisisAlert.created_at.desc()).first()
+    if recent_crisis and recent_crisis.severity in ['critical', 'high']:
+        return "Critical"
+    recent_intents = ChatIntent.query.filter(
+        ChatIntent.user_id == student_id,
+        ChatIntent.timestamp >= seven_days_ago
+    ).order_by(ChatIntent.timestamp.desc()).limit(10).all()
+    if recent_intents:
+        negative_states = ['low', 'sad', 'anxious', 'stressed', 'overwhelmed', 'frustrated', 'angry', 'numb']
+        if sum(1 for i in recent_intents if i.emotional_state in negative_states
+               and i.emotional_intensity in ['moderate', 'high', 'critical']) >= 5:
+            return "Needs attention"
+    recent_activity = UserActivityLog.query.filter(
+        UserActivityLog.user_id == student_id,
+        UserActivityLog.timestamp >= seven_days_ago
+    ).count()
+    student = User.query.get(student_id)
+    if recent_activity >= 3 and student.login_streak >= 3 and not recent_crisis:
+        return "Doing well"
+    if recent_activity < 2 or student.login_streak < 2:
+        return "Needs attention"
+    return "Neutral"
+
+
+def legacy_roster(students):
+    return {
+        s.id: {
+            'status': legacy_status(s.id),
+            'has_risk': ChatSession.query.filter_by(user_id=s.id, crisis_flag=True).count() > 0
+        } for s in students
+    }
+
+
+def ensure_roster(size):
+    org = Organization.query.filter_by(name=BENCH_ORG).first()
+    if not org:
+        org = Organization(name=BENCH_ORG)
+        db.session.add(org)
+        db.session.commit()
+    existing = User.query.filter_by(organization_id=org.id, role='student').count()
+    for i in range(existing, size):
+        db.session.add(User(
+            username=f'roster_bench_{i}', email=f'roster_bench_{i}@bench.local', password_hash='!',
+            role='student', full_name=f'Roster Bench {i}', organization_id=org.id
+        ))
+    db.session.commit()
+    return org, size - existing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='25,100,400')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-seed', action='store_true', help='skip seed_insights (roster already seeded)')
+    args = parser.parse_args()
+    sizes = [int(n) for n in args.sizes.split(',')]
+
+    with app.app_context():
+        org, created = ensure_roster(max(sizes))
+        if created and not args.no_seed:
+            from seed_insights import seed_insights
+            seed_insights()
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(1))
+
+        print(f"\n{'students':>8} {'path':<8} {'queries':>8} {'mean ms':>9} {'p50 ms':>9}")
+        for size in sizes:
+            results = {}
+            for label, fn in (('legacy', legacy_roster), ('batched', compute_student_statuses)):
+                timings = []
+                for _ in range(args.repeat):
+                    db.session.expire_all()
+                    # Roster load is the same for both paths and not counted
+                    students = User.query.filter_by(organization_id=org.id, role='student').order_by(User.id).limit(size).all()
+                    statements.clear()
+                    start = time.perf_counter()
+                    results[label] = fn(students)
+                    timings.append((time.perf_counter() - start) * 1000)
+                print(f"{size:>8} {label:<8} {len(statements):>8} {statistics.mean(timings):9.1f} {statistics.median(timings):9.1f}")
+            if results['legacy'] != results['batched']:
+                print(f"{'':>8} WARNING: results differ for {size} students")
+
+
+if __name__ == '__main__':
+    main()
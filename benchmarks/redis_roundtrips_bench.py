@@ -0,0 +1,137 @@
+"""
+Redis round trips per chat message: per-command bookkeeping vs pipelined/scripted.
+
+Replays the Redis side of one Chat.post turn (rate limit, context load, streak,
+response cache lookup/store, context write) - no Ollama, no Celery:
+
+    before - the previous sequence: GET/INCR/EXPIRE rate limit, context GET, streak
+             GET/GET, cache lookup + counter, cache store, context SETEX
+    after  - sliding-window rate limit script, context GET, Lua update_user_streak,
+             cache lookup, then one RedisBatch flush
+
+Round trips are counted at the connection (one per packed send). --rtt-ms adds a
+simulated network delay per round trip to show the latency impact for a Redis that
+isn't on localhost. Uses REDIS_URL; --fake runs against fakeredis (counts stay exact,
+latency is then meaningless).
+
+    python -m benchmarks.redis_roundtrips_bench --turns 200 --rtt-ms 0.5
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import redis
+from flask import Flask
+
+
+class RoundTripCounter:
+    """Counts (and optionally delays) every command batch sent on any Redis connection"""
+
+    def __init__(self, rtt_ms=0.0):
+        self.count = 0
+        self.rtt = rtt_ms / 1000.0
+        self._original = redis.connection.AbstractConnection.send_packed_command
+        counter = self
+
+        def send_packed_command(conn, command, check_health=True):
+            counter.count += 1
+            if counter.rtt:
+                time.sleep(counter.rtt)
+            return counter._original(conn, command, check_health)
+
+        redis.connection.AbstractConnection.send_packed_command = send_packed_command
+
+
+def legacy_streak(r_streaks, user):
+    """update_user_streak before it became a script (user already active today)"""
+    last_raw = r_streaks.get(f"streak_last_active:{user.id}")
+    if last_raw and datetime.strptime(last_raw.decode(), '%Y-%m-%d').date() == datetime.utcnow().date():
+        return int(r_streaks.get(f"streak_count:{user.id}") or 1)
+
+
+def before_turn(cb, user, message, reply):
+    rate_limit_key = f"chat_limit:{user.id}"
+    count = cb.r_context.get(rate_limit_key)
+    if not (count and int(count) >= 10):
+        cb.r_context.incr(rate_limit_key)
+        if not count:
+            cb.r_context.expire(rate_limit_key, 60)
+    context_key = f"chat_context:{user.id}"
+    history_raw = cb.r_context.get(context_key)
+    chat_history = json.loads(history_raw) if history_raw else []
+    legacy_streak(cb.r_streaks, user)
+    cached, _ = cb.response_cache.get(message)
+    if not cached:
+        cb.response_cache.set(message, reply, 'grounding')
+    cb.update_chat_context(context_key, chat_history, message, reply['response'])
+
+
+def after_turn(cb, user, message, reply):
+    cb.limiter.check('chatbot', user.id, 'student')
+    context_key, chat_history = cb.load_chat_turn_state(user.id)
+    cb.update_user_streak(cb.r_streaks, user)
+    batch = cb.RedisBatch()
+    cached = cb.lookup_cached_response(message, False, batch)
+    if not cached:
+        cb.cache_chat_response(message, reply, {'intent_type': 'grounding'}, False, False, batch)
+    cb.update_chat_context(context_key, chat_history, message, reply['response'], batch)
+    cb.flush_redis_batch(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--rtt-ms', type=float, default=0.0)
+    parser.add_argument('--fake', action='store_true', help='use fakeredis instead of REDIS_URL')
+    args = parser.parse_args()
+
+    os.environ.setdefault('GROQ_API_KEY', 'bench')
+    import api.chatbot_api as cb
+    from utils.rate_limiter import SlidingWindowLimiter
+
+    if args.fake:
+        import fakeredis
+        server = fakeredis.FakeServer()
+        cb.r_context = fakeredis.FakeRedis(server=server, db=3)
+        cb.r_streaks = fakeredis.FakeRedis(server=server, db=4)
+        cb.response_cache.redis = fakeredis.FakeRedis(server=server, db=2)
+    cb.limiter = SlidingWindowLimiter(cb.r_context)
+    for client in (cb.r_context, cb.r_streaks, cb.response_cache.redis):
+        client.ping()
+
+    app = Flask(__name__)
+    app.logger.setLevel(logging.ERROR)
+    today = datetime.utcnow().date()
+    reply = {'response': "Let's take a slow breath together.", 'crisis_detected': False}
+    counter = RoundTripCounter(args.rtt_ms)
+
+    print(f"turns={args.turns} simulated rtt={args.rtt_ms}ms{' (fakeredis)' if args.fake else ''}\n")
+    print(f"{'path':<8} {'turn':<11} {'round trips':>12} {'mean ms':>9} {'p50 ms':>9}")
+    with app.app_context():
+        for label, turn in (('before', before_turn), ('after', after_turn)):
+            for kind in ('cache miss', 'cache hit'):
+                trips, timings = [], []
+                for n in range(args.turns):
+                    # Typical mid-conversation turn: a few messages already this minute, streak counted today
+                    user = SimpleNamespace(id=f"bench-{label}-{kind}-{n}", last_streak_date=today, login_streak=3)
+                    cb.r_context.set(f"chat_limit:{user.id}", 3, ex=60)
+                    cb.r_streaks.set(f"streak_last_active:{user.id}", today.strftime('%Y-%m-%d'))
+                    cb.r_streaks.set(f"streak_count:{user.id}", 3)
+                    message = f"exam stress message {n}" if kind == 'cache miss' else "exam stress message"
+                    if kind == 'cache hit':
+                        cb.response_cache.set(message, reply, 'grounding')
+                    start_count, start = counter.count, time.perf_counter()
+                    turn(cb, user, message, reply)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    trips.append(counter.count - start_count)
+                print(f"{label:<8} {kind:<11} {statistics.mean(trips):12.1f} "
+                      f"{statistics.mean(timings):9.2f} {statistics.median(timings):9.2f}")
+
+
+if __name__ == '__main__':
+    main()
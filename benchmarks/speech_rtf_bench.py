@@ -0,0 +1,112 @@
+"""
+Latency and real-time factor (RTF) of the local speech backends on CPU.
+
+RTF = processing time / audio duration; below 1.0 is faster than real time. The
+first call of each backend includes loading its model and is reported separately
+("cold"); the rest show steady-state reuse of the loaded model / recognizer pool.
+
+TTS synthesises SENTENCES; STT transcribes the --audio files, or the TTS output
+when none are given (16-bit mono WAV; other formats need ffmpeg).
+
+    python -m benchmarks.speech_rtf_bench --tts piper --stt vosk --runs 5
+    python -m benchmarks.speech_rtf_bench --tts stub --stt none          # offline smoke run
+"""
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+import wave
+
+from utils.speech_backends import StubTTSBackend, PiperTTSBackend, VoskSTTBackend
+
+SENTENCES = [
+    "I'm here to listen. How are you feeling today?",
+    "Let's take it one step at a time. Try some deep breathing with me.",
+    "मैं यहाँ हूं तुम्हारे लिए। कृपया किसी से बात करो।",
+    "It's okay to feel low sometimes. You're not alone, and help is available.",
+]
+
+
+def wav_seconds(data):
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+def report(label, cold, samples):
+    """samples: [(seconds taken, audio seconds)]"""
+    latencies = [t for t, _ in samples]
+    rtfs = [t / audio for t, audio in samples if audio]
+    print(f"{label:<8} {cold * 1000:9.1f} {statistics.median(latencies) * 1000:9.1f} "
+          f"{max(latencies) * 1000:9.1f} {statistics.median(rtfs):8.3f} {max(rtfs):8.3f}")
+
+
+def bench_tts(backend, runs):
+    start = time.perf_counter()
+    outputs = [backend.synthesize(SENTENCES[0], 'hi-IN')]
+    cold = time.perf_counter() - start
+    samples = []
+    for _ in range(runs):
+        for sentence in SENTENCES:
+            start = time.perf_counter()
+            data = backend.synthesize(sentence, 'hi-IN')
+            samples.append((time.perf_counter() - start, wav_seconds(data)))
+            outputs.append(data)
+    return cold, samples, outputs[:len(SENTENCES)]
+
+
+def bench_stt(backend, paths, runs):
+    def duration(path):
+        try:
+            with wave.open(path, 'rb') as wav:
+                return wav.getnframes() / wav.getframerate()
+        except wave.Error:
+            return 0
+
+    start = time.perf_counter()
+    backend.transcribe(paths[0])
+    cold = time.perf_counter() - start
+    samples = []
+    for _ in range(runs):
+        for path in paths:
+            start = time.perf_counter()
+            backend.transcribe(path)
+            samples.append((time.perf_counter() - start, duration(path)))
+    return cold, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tts', choices=['piper', 'stub', 'none'], default='piper')
+    parser.add_argument('--stt', choices=['vosk', 'none'], default='vosk')
+    parser.add_argument('--audio', nargs='*', default=[], help='WAV files to transcribe (default: the TTS output)')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'stage':<8} {'cold ms':>9} {'p50 ms':>9} {'max ms':>9} {'p50 RTF':>8} {'max RTF':>8}")
+    outputs = []
+    if args.tts != 'none':
+        backend = PiperTTSBackend() if args.tts == 'piper' else StubTTSBackend()
+        cold, samples, outputs = bench_tts(backend, args.runs)
+        report(args.tts, cold, samples)
+
+    if args.stt != 'none':
+        paths, temp_paths = list(args.audio), []
+        for data in ([] if paths else outputs):
+            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
+                f.write(data)
+                temp_paths.append(f.name)
+        paths += temp_paths
+        if not paths:
+            parser.error('--stt needs --audio files or a TTS backend to produce them')
+        try:
+            cold, samples = bench_stt(VoskSTTBackend(), paths, args.runs)
+            report(args.stt, cold, samples)
+        finally:
+            for path in temp_paths:
+                os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
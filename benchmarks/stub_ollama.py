@@ -0,0 +1,158 @@
+"""
+Stub Ollama server for offline benchmarks.
+
+Implements the subset of the Ollama HTTP API the app uses (POST /api/generate,
+streaming and non-streaming) with configurable per-model latency. A per-model
+semaphore mimics OLLAMA_NUM_PARALLEL so queueing under load looks like the real
+server. Replies follow the intent_classifier / convo_LLM output formats.
+
+Usage:
+    server, base_url = start_stub_server(intent_latency=0.3, convo_latency=1.0)
+    ...
+    server.shutdown()
+
+or standalone:  python -m benchmarks.stub_ollama --port 11434
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CRISIS_WORDS = ('suicide', 'die', 'kill myself', 'end my life', 'marna')
+
+INTENT_REPLY = {
+    "emotional_state": "anxious", "intent_type": "grounding", "cognitive_load": "medium",
+    "emotional_intensity": "moderate", "help_receptivity": "seeking", "time_focus": "present",
+    "context_dependency": "standalone", "self_harm_crisis": "false"
+}
+CRISIS_INTENT_REPLY = dict(INTENT_REPLY, emotional_state="numb", emotional_intensity="critical", self_harm_crisis="true")
+
+CONVO_REPLY = {
+    "response": "That sounds like a lot to carry right now. Let's slow things down together, one breath at a time. You're not alone in this.",
+    "suggested_feature": "1/2-Minute Breathing Exercise"
+}
+
+
+def reply_for(model, prompt):
+    """Canned model output for a model/prompt pair"""
+    if model.startswith('intent'):
+        lowered = prompt.lower()
+        intent = CRISIS_INTENT_REPLY if any(w in lowered for w in CRISIS_WORDS) else INTENT_REPLY
+        return json.dumps(intent)
+    return json.dumps(CONVO_REPLY, ensure_ascii=False)
+
+
+def tokenize(text):
+    """Split text into small chunks roughly the size of LLM tokens"""
+    return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client closed a keep-alive connection mid-stream (e.g. stopped at the first JSON object)
+            pass
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        if self.path != '/api/generate':
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        server = self.server
+        model = body.get('model', '')
+        is_intent = model.startswith('intent')
+        text = reply_for(model, body.get('prompt', ''))
+        tokens = tokenize(text)
+        latency = server.intent_latency if is_intent else server.convo_latency
+        per_token = latency / max(len(tokens), 1)
+        stream = body.get('stream', True)
+        server.calls[model] = server.calls.get(model, 0) + 1
+
+        # Only `parallel` generations per model run at once, like OLLAMA_NUM_PARALLEL
+        with server.slots(model):
+            if not stream:
+                time.sleep(latency)
+                payload = json.dumps({
+                    'model': model, 'created_at': datetime.now(timezone.utc).isoformat(),
+                    'response': text, 'done': True, 'done_reason': 'stop'
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            try:
+                for token in tokens:
+                    time.sleep(per_token)
+                    self._chunk(json.dumps({'model': model, 'response': token, 'done': False}).encode() + b"\n")
+                self._chunk(json.dumps({'model': model, 'response': '', 'done': True, 'done_reason': 'stop'}).encode() + b"\n")
+                self._chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                # Client abandoned the stream (e.g. a discarded speculative reply)
+                self.close_connection = True
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # accept a whole burst of clients like the real server
+
+    def __init__(self, address, intent_latency, convo_latency, parallel):
+        super().__init__(address, StubOllamaHandler)
+        self.intent_latency = intent_latency
+        self.convo_latency = convo_latency
+        self.parallel = parallel
+        self.calls = {}
+        self._slots = {}
+        self._slots_lock = threading.Lock()
+
+    def slots(self, model):
+        with self._slots_lock:
+            if model not in self._slots:
+                self._slots[model] = threading.BoundedSemaphore(self.parallel)
+            return self._slots[model]
+
+
+def start_stub_server(intent_latency=0.3, convo_latency=1.0, parallel=4, host='127.0.0.1', port=0):
+    """Start the stub in a daemon thread. Returns (server, base_url)."""
+    server = StubOllamaServer((host, port), intent_latency, convo_latency, parallel)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stub Ollama server')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--intent-latency', type=float, default=0.3)
+    parser.add_argument('--convo-latency', type=float, default=1.0)
+    parser.add_argument('--parallel', type=int, default=4)
+    args = parser.parse_args()
+    server, url = start_stub_server(args.intent_latency, args.convo_latency, args.parallel, port=args.port)
+    print(f"Stub Ollama listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,85 @@
+"""
+Per-reply latency of enhance_chat_response_for_voice: LLM rewrite vs local transliteration.
+
+    before  - the previous path: a Gemini chat_with_ai call per reply to rewrite it in
+              Devanagari (--before gemini, needs GEMINI_API_KEY), or a sleep of --llm-ms
+              standing in for that round trip (--before stub, the default offline)
+    cold    - utils.transliteration with an empty memo (first time a reply is seen)
+    warm    - the same replies again (memo hits: fixed replies, repeated phrases)
+
+Note the shipped "before" passed a conversation_history kwarg chat_with_ai does not
+take, so it raised and fell back to the Roman text (no Devanagari at all).
+
+    python -m benchmarks.voice_enhance_bench --runs 20
+    python -m benchmarks.voice_enhance_bench --before gemini --runs 3
+"""
+import argparse
+import statistics
+import time
+
+from utils.transliteration import transliterate, clear_memo
+
+REPLIES = [
+    "Main samajh sakti hoon, thoda aaram karo. Tum akele nahi ho.",
+    "Aap kaise feel kar rahe ho aaj? Mujhe batao kya hua.",
+    "Gehri saans lijiye aur dheere dheere chhodiye. Sab theek ho jayega.",
+    "Exams ka tension normal hai yaar, ek ek karke padhai karo aur neend poori lo.",
+    "I'm here to listen. Aap apni baat share kar sakte ho, koi judge nahi karega.",
+    "Agar bahut zyada pareshan ho toh kisi dost ya counsellor se zaroor baat karo.",
+]
+
+PROMPT = """Convert this response to natural Hindi Devanagari script for voice synthesis while keeping
+the same meaning and emotional tone. You can mix some English words naturally.
+
+Original response: "{reply}"
+"""
+
+
+def before_gemini(reply):
+    from gemini_service import chat_with_ai
+    return chat_with_ai(PROMPT.format(reply=reply))
+
+
+def timed(fn, replies, runs):
+    samples = []
+    for _ in range(runs):
+        for reply in replies:
+            start = time.perf_counter()
+            fn(reply)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<8} {statistics.median(samples):10.3f} {p95:10.3f} {samples[-1]:10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--before', choices=['stub', 'gemini', 'none'], default='stub')
+    parser.add_argument('--llm-ms', type=float, default=900, help='stub round-trip time')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'path':<8} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    if args.before == 'gemini':
+        report('before', timed(before_gemini, REPLIES, args.runs))
+    elif args.before == 'stub':
+        report('before', timed(lambda reply: time.sleep(args.llm_ms / 1000), REPLIES, min(args.runs, 2)))
+
+    cold = []
+    for _ in range(args.runs):
+        clear_memo()
+        cold += timed(transliterate, REPLIES, 1)
+    report('cold', cold)
+    report('warm', timed(transliterate, REPLIES, args.runs))
+
+    print()
+    for reply in REPLIES[:3]:
+        print(f"{reply}\n  -> {transliterate(reply)}")
+
+
+if __name__ == '__main__':
+    main()
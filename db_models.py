@@ -116,6 +116,7 @@ class OnboardingResponse(db.Model):
     user = db.relationship('User', backref='onboarding_responses')
 
 class ChatSession(db.Model):
+    __table_args__ = (db.Index('ix_chat_session_user_keyset', 'user_id', 'session_start', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     session_start = db.Column(db.DateTime, default=datetime.utcnow)
@@ -171,7 +172,48 @@ class CrisisAlert(db.Model):
     acknowledged_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
+class StudentRiskSnapshot(db.Model):
+    """Per-student rolling risk counters, updated as intents/alerts/activity are written (utils/risk_snapshot.py)"""
+    __tablename__ = 'student_risk_snapshot'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    daily_counts = db.Column(JSONB, nullable=False, default=dict)  # {'YYYY-MM-DD': {counter: n}} for the last 30 days
+    recent_intents = db.Column(JSONB, nullable=False, default=list)  # Last 10 intents: [[iso timestamp, negative 0/1], ...]
+    intents_7d = db.Column(db.Integer, default=0)
+    negative_intents_7d = db.Column(db.Integer, default=0)
+    crisis_alerts_7d = db.Column(db.Integer, default=0)
+    crisis_alerts_30d = db.Column(db.Integer, default=0)
+    activities_7d = db.Column(db.Integer, default=0)
+    activities_30d = db.Column(db.Integer, default=0)
+    counts_as_of = db.Column(db.Date)  # Day the *_7d/*_30d columns were last rolled
+    negative_streak = db.Column(db.Integer, default=0)  # Consecutive negative, elevated-intensity intents
+    latest_emotional_state = db.Column(db.String(50))
+    latest_emotional_intensity = db.Column(db.String(20))
+    latest_intent_at = db.Column(db.DateTime)
+    latest_crisis_severity = db.Column(db.String(20), index=True)
+    latest_crisis_at = db.Column(db.DateTime)
+    last_activity_at = db.Column(db.DateTime, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DailyUserActivity(db.Model):
+    """Per-user daily activity counters, upserted on write and rebuilt nightly (utils/rollups.py)"""
+    __tablename__ = 'daily_user_activity'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    activity_type = db.Column(db.String(60), primary_key=True)  # UserActivityLog type, or 'meditation_session:<type>' / 'assessment:<type>'
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total_duration = db.Column(db.Integer, nullable=False, default=0)
+
+class DailyOrgEmotions(db.Model):
+    """Per-organisation daily emotional-state counts from chat intents (utils/rollups.py)"""
+    __tablename__ = 'daily_org_emotions'
+    organization_id = db.Column(db.Integer, db.ForeignKey('organization.id', ondelete='CASCADE'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    emotional_state = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    elevated_count = db.Column(db.Integer, nullable=False, default=0)  # moderate/high/critical intensity
+
 class Assessment(db.Model):
+    __table_args__ = (db.Index('ix_assessment_user_keyset', 'user_id', 'completed_at', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     assessment_type = db.Column(db.String(10), nullable=False)  # PHQ-9, GAD-7, GHQ
@@ -191,6 +233,7 @@ class MeditationSession(db.Model):
     date = db.Column(db.Date, default=datetime.utcnow().date, index=True)
 
 class VentingPost(db.Model):
+    __table_args__ = (db.Index('ix_venting_post_keyset', 'created_at', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
@@ -234,6 +277,7 @@ class SoundVentingSession(db.Model):
     user = db.relationship('User', backref='sound_venting_sessions')
 
 class InkblotResult(db.Model):
+    __table_args__ = (db.Index('ix_inkblot_result_user_keyset', 'user_id', 'created_at', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     responses = db.Column(JSONB, nullable=False) # Blot index -> short response
@@ -259,6 +303,8 @@ class UserActivityLog(db.Model):
     user = db.relationship('User', backref='activity_logs')
 
 class ConsultationRequest(db.Model):
+    __table_args__ = (db.Index('ix_consultation_request_user_keyset', 'user_id', 'created_at', 'id'),
+                      db.Index('ix_consultation_request_counsellor_keyset', 'counsellor_id', 'created_at', 'id'))
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     counsellor_id = db.Column(db.Integer, db.ForeignKey('user.id'))  # Link to counsellor
@@ -7,6 +7,7 @@ import logging
 import time
 from google import genai
 from google.genai import types
+from utils.crisis_lexicon import scan_crisis_terms, matched_terms, CRISIS
 
 # Initialize Gemini client with API key from environment
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
@@ -16,25 +17,9 @@ if not GEMINI_API_KEY:
 client = genai.Client(api_key=GEMINI_API_KEY)
 
 
-# Crisis keywords for detection
-CRISIS_KEYWORDS = [
-    'suicide', 'kill myself', 'end my life', 'want to die', 'death wish',
-    'self harm', 'cut myself', 'hurt myself', 'overdose', 'jump off',
-    'not worth living', 'nobody cares', 'hopeless', 'worthless',
-    'can\'t go on', 'give up', 'end it all', 'better off dead',
-    'marna hai', 'jaan deni hai', 'maut'
-]
-
 def detect_crisis_keywords(text):
-    """Detect crisis keywords in user input"""
-    text_lower = text.lower()
-    detected = []
-    
-    for keyword in CRISIS_KEYWORDS:
-        if keyword in text_lower:
-            detected.append(keyword)
-    
-    return detected
+    """Crisis-tier keywords in user input (shared lexicon, one pass); warning-tier words don't count"""
+    return matched_terms(scan_crisis_terms(text), tier=CRISIS)
 
 def chat_with_ai(message, user_context=None, chat_history=None, emotional_constraints=None):
     """Chat with Gemini AI for mental health support"""
@@ -20,11 +20,16 @@ if __name__ == "__main__":
     extra_files = []
     extra_dirs = []
     
-    from app import socketio
+    from app import socketio, start_background_services
+    import os
+    use_reloader = True
+    # With the reloader this process only watches files; the serving child (WERKZEUG_RUN_MAIN) runs them
+    if not use_reloader or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services()
     socketio.run(
         app,
         host="0.0.0.0", 
         port=2323, 
         debug=True,
-        use_reloader=True,
+        use_reloader=use_reloader,
     )
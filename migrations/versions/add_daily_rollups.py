@@ -0,0 +1,41 @@
+"""Add daily_user_activity and daily_org_emotions rollup tables
+
+Revision ID: add_daily_rollups
+Revises: add_student_risk_snapshot
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_daily_rollups'
+down_revision = 'add_student_risk_snapshot'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_user_activity',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('activity_type', sa.String(60), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_duration', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'date', 'activity_type')
+    )
+    op.create_table('daily_org_emotions',
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('emotional_state', sa.String(50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('elevated_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organization.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('organization_id', 'date', 'emotional_state')
+    )
+
+
+def downgrade():
+    op.drop_table('daily_org_emotions')
+    op.drop_table('daily_user_activity')
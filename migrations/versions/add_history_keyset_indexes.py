@@ -0,0 +1,33 @@
+"""Add (owner, timestamp, id) indexes for keyset-paginated history listings
+
+Revision ID: add_history_keyset_indexes
+Revises: add_daily_rollups
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_history_keyset_indexes'
+down_revision = 'add_daily_rollups'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_chat_session_user_keyset', 'chat_session', ['user_id', 'session_start', 'id']),
+    ('ix_assessment_user_keyset', 'assessment', ['user_id', 'completed_at', 'id']),
+    ('ix_venting_post_keyset', 'venting_post', ['created_at', 'id']),
+    ('ix_inkblot_result_user_keyset', 'inkblot_result', ['user_id', 'created_at', 'id']),
+    ('ix_consultation_request_user_keyset', 'consultation_request', ['user_id', 'created_at', 'id']),
+    ('ix_consultation_request_counsellor_keyset', 'consultation_request', ['counsellor_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""Add student_risk_snapshot table for incrementally maintained dashboard counters
+
+Revision ID: add_student_risk_snapshot
+Revises: onboarding_and_is_onboarded
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = 'add_student_risk_snapshot'
+down_revision = 'onboarding_and_is_onboarded'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('student_risk_snapshot',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('daily_counts', JSONB, nullable=False, server_default='{}'),
+        sa.Column('recent_intents', JSONB, nullable=False, server_default='[]'),
+        sa.Column('intents_7d', sa.Integer(), server_default='0'),
+        sa.Column('negative_intents_7d', sa.Integer(), server_default='0'),
+        sa.Column('crisis_alerts_7d', sa.Integer(), server_default='0'),
+        sa.Column('crisis_alerts_30d', sa.Integer(), server_default='0'),
+        sa.Column('activities_7d', sa.Integer(), server_default='0'),
+        sa.Column('activities_30d', sa.Integer(), server_default='0'),
+        sa.Column('counts_as_of', sa.Date(), nullable=True),
+        sa.Column('negative_streak', sa.Integer(), server_default='0'),
+        sa.Column('latest_emotional_state', sa.String(50), nullable=True),
+        sa.Column('latest_emotional_intensity', sa.String(20), nullable=True),
+        sa.Column('latest_intent_at', sa.DateTime(), nullable=True),
+        sa.Column('latest_crisis_severity', sa.String(20), nullable=True),
+        sa.Column('latest_crisis_at', sa.DateTime(), nullable=True),
+        sa.Column('last_activity_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_student_risk_snapshot_latest_crisis_severity', 'student_risk_snapshot', ['latest_crisis_severity'])
+    op.create_index('ix_student_risk_snapshot_last_activity_at', 'student_risk_snapshot', ['last_activity_at'])
+
+
+def downgrade():
+    op.drop_table('student_risk_snapshot')
@@ -0,0 +1,37 @@
+"""Enforce one like per user per post and resync venting_post.likes
+
+Revision ID: add_venting_like_unique
+Revises: add_history_keyset_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_venting_like_unique'
+down_revision = 'add_history_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_unique_constraints('venting_post_like')}
+    if 'unique_user_post_like' not in existing:
+        # Keep the first like of any duplicated (post, user) pair
+        op.execute("""
+            DELETE FROM venting_post_like WHERE id NOT IN (
+                SELECT MIN(id) FROM venting_post_like GROUP BY post_id, user_id
+            )
+        """)
+        op.create_unique_constraint('unique_user_post_like', 'venting_post_like', ['post_id', 'user_id'])
+    # Counts drifted under the old read-modify-write toggle; the like rows are authoritative
+    op.execute("""
+        UPDATE venting_post SET likes = (
+            SELECT COUNT(*) FROM venting_post_like WHERE venting_post_like.post_id = venting_post.id
+        )
+    """)
+
+
+def downgrade():
+    op.drop_constraint('unique_user_post_like', 'venting_post_like', type_='unique')
@@ -1,11 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from ollama import Client
 from pydantic import BaseModel
 import json as jsonlib
 from json_sanitizer import extract_json
+from llm_client import get_async_llm_client
 
-client = Client(host='http://localhost:11434')
+# Pooled asyncio client with circuit breaker (shared layer, see llm_client.py)
+client = get_async_llm_client()
 intent_classifier = 'intent_classifier:latest' 
 convo_LLM = 'convo_LLM:latest'
 
@@ -46,11 +47,11 @@ app.add_middleware(
 def root():
     return "hello world"
 @app.post("/send-message", response_model=ChatResponse)
-def send_message(req: ChatRequest):
+async def send_message(req: ChatRequest):
     user_message = req.user_message
 
     # -------- Intent classifier --------
-    intent_resp = client.generate(
+    intent_resp = await client.generate(
         model=intent_classifier,
         prompt=user_message,
         stream=False
@@ -60,11 +61,11 @@ def send_message(req: ChatRequest):
     intent_json = jsonlib.loads(intent_raw)          # DICT
 
     # -------- Conversation model --------
-    convo_resp = client.generate(
+    convo_resp = (await client.generate(
         model=convo_LLM,
         prompt=user_message + "\n" + intent_raw,
         stream=False
-    )["response"]
+    ))["response"]
         # STRING
     parsed = extract_json(convo_resp)
 
@@ -1,7 +1,7 @@
-from ollama import Client
+from llm_client import get_llm_client
 import json as json_lib
-# Initialize the client to connect to the Ollama server running on localhost
-client = Client(host='http://localhost:11434')
+# Shared pooled client for the Ollama server running on localhost (see llm_client.py)
+client = get_llm_client()
 model_name = 'llama3.2'  
 user_message="I feel weirdly low and I don’t know why"
 intent_messages = []
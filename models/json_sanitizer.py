@@ -2,17 +2,245 @@ import json
 import re
 from typing import Optional
 
-def extract_json(text: str) -> Optional[dict]:
-    if not text:
-        return None
+# intent_classifier output format (see models/Modelfile.intent_classifier)
+INTENT_SCHEMA = {
+    'emotional_state': {'calm', 'neutral', 'low', 'sad', 'anxious', 'stressed', 'overwhelmed', 'frustrated', 'angry', 'numb'},
+    'intent_type': {'venting', 'reassurance', 'advice', 'grounding', 'reflection', 'action_planning', 'informational', 'casual_chat'},
+    'cognitive_load': {'low', 'medium', 'high'},
+    'emotional_intensity': {'mild', 'moderate', 'high', 'critical'},
+    'help_receptivity': {'resistant', 'passive', 'open', 'seeking'},
+    'time_focus': {'past', 'present', 'future', 'mixed'},
+    'context_dependency': {'standalone', 'session_dependent'},
+    'self_harm_crisis': {'true', 'false'},
+}
+
+
+def validate_intent(data: dict, schema: dict = INTENT_SCHEMA) -> list:
+    """Return a list of problems ([] when data matches the schema)"""
+    problems = []
+    for field, allowed in schema.items():
+        if field not in data:
+            problems.append(f"missing {field}")
+        elif str(data[field]).lower() not in allowed:
+            problems.append(f"unexpected {field}={data[field]!r}")
+    return problems
+
+
+class JsonObjectStream:
+    """
+    Brace-balanced JSON object extractor that can be fed model tokens one at a time.
+
+    Scanner state (depth, inside-string, pending escape) is carried between tokens, so
+    each token is scanned once and only the text of the current candidate object is
+    kept; runs of ordinary characters are skipped with a compiled regex. feed() returns
+    the first complete object (then `done` is set and the caller can stop generation).
+    A candidate that is not an object ("{not json"), fails to parse, or lacks the
+    schema fields when a schema is given is dropped by rescanning from the next '{',
+    so an object nested in broken text is still found. Call finish() at the end of the
+    output to retry inside a candidate that never closed.
+    """
+    STRUCTURAL = re.compile(r'[{}"]')
+    IN_STRING = re.compile(r'["\\]')
+
+    def __init__(self, schema: Optional[dict] = None):
+        self.schema = schema
+        self.parts = []         # Text of the open candidate from earlier tokens
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False    # Previous token ended on a backslash inside a string
+        self.expect_key = False # Candidate just opened: next non-space char must be '"' or '}'
+        self.result = None
+        self.raw = None         # Source text of the result
+        self.done = False
 
-    # Find all {...} blocks (non-greedy)
-    matches = re.findall(r"\{[\s\S]*?\}", text)
+    def feed(self, token: str) -> Optional[dict]:
+        if self.done or not token:
+            return None
+        return self._scan(token)
 
-    for block in matches:
+    def finish(self) -> Optional[dict]:
+        """End of output: if a candidate never closed, look for an object inside it"""
+        if not self.done and self.depth:
+            text = ''.join(self.parts)[1:]
+            self._reset()
+            return self._scan(text)
+        return self.result
+
+    def _reset(self):
+        self.parts = []
+        self.depth = 0
+        self.in_string = self.escaped = self.expect_key = False
+
+    def _scan(self, text):
+        i, n = 0, len(text)
+        seg = 0  # Where the open candidate starts within this text
+        while i < n:
+            if not self.depth:
+                i = text.find('{', i)
+                if i < 0:
+                    return None
+                seg = i
+                self.depth, self.expect_key = 1, True
+                i += 1
+                continue
+            if self.escaped:
+                self.escaped = False
+                i += 1
+                continue
+            if self.expect_key:
+                while i < n and text[i] in ' \t\r\n':
+                    i += 1
+                if i == n:
+                    break
+                self.expect_key = False
+                if text[i] not in '"}':
+                    # Not an object: rescan from the character after its brace
+                    text = (''.join(self.parts) + text[seg:])[1:]
+                    self._reset()
+                    i, n, seg = 0, len(text), 0
+                    continue
+            if self.in_string:
+                m = self.IN_STRING.search(text, i)
+                if not m:
+                    break
+                i = m.start()
+                if text[i] == '\\':
+                    if i + 1 == n:
+                        self.escaped = True
+                        break
+                    i += 2
+                    continue
+                self.in_string = False
+                i += 1
+                continue
+            m = self.STRUCTURAL.search(text, i)
+            if not m:
+                break
+            i = m.start()
+            ch = text[i]
+            if ch == '"':
+                self.in_string = True
+            elif ch == '{':
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if not self.depth:
+                    candidate = ''.join(self.parts) + text[seg:i + 1]
+                    self.parts = []
+                    if self._accept(candidate):
+                        return self.result
+                    text = candidate[1:] + text[i + 1:]
+                    self._reset()
+                    i, n, seg = 0, len(text), 0
+                    continue
+            i += 1
+        if self.depth:
+            self.parts.append(text[seg:])
+        return None
+
+    def _accept(self, candidate):
         try:
-            return json.loads(block)
+            obj = json.loads(candidate)
         except json.JSONDecodeError:
-            continue
+            return False
+        if not isinstance(obj, dict) or (self.schema and any(field not in obj for field in self.schema)):
+            return False
+        self.result, self.raw, self.done = obj, candidate, True
+        return True
+
+
+_decoder = json.JSONDecoder()
+
+
+def extract_json(text: str, schema: Optional[dict] = None) -> Optional[dict]:
+    """First complete JSON object in text (optionally the first one carrying the schema fields)"""
+    if not text:
+        return None
+    # Fast path: output starts with (or soon reaches) a well-formed object
+    start = text.find('{')
+    if start < 0:
+        return None
+    try:
+        obj, _ = _decoder.raw_decode(text, start)
+        if isinstance(obj, dict) and not (schema and any(field not in obj for field in schema)):
+            return obj
+    except json.JSONDecodeError:
+        pass
+    stream = JsonObjectStream(schema)
+    return stream.feed(text[start:]) or stream.finish()
+
+
+class ReplyTextStream:
+    """
+    Pull the "response" string out of a convo_LLM reply while it is still streaming.
+
+    convo_LLM answers with {"response": "...", "suggested_feature": "..."}; feed()
+    takes raw tokens and returns only the newly decoded characters of the
+    "response" value so they can be forwarded to the user straight away.
+    If the model skips the JSON wrapper, the raw text is passed through as-is.
+    """
+    KEY_PATTERN = re.compile(r'"(?:response|bot_message)"\s*:\s*"')
+    ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = None     # Next undecoded index inside the "response" value
+        self.plain = None   # True when the model answered without JSON
+        self.done = False
+
+    def feed(self, token: str) -> str:
+        self.buffer += token
+
+        if self.plain is None:
+            stripped = self.buffer.lstrip()
+            if not stripped:
+                return ''
+            self.plain = not stripped.startswith('{')
+            if self.plain:
+                self.pos = len(self.buffer) - len(stripped)
+
+        if self.plain:
+            out = self.buffer[self.pos:]
+            self.pos = len(self.buffer)
+            return out
+
+        if self.done:
+            return ''
+
+        if self.pos is None:
+            match = self.KEY_PATTERN.search(self.buffer)
+            if not match:
+                return ''
+            self.pos = match.end()
+
+        buf = self.buffer
+        i = self.pos
+        out = []
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+            if ch == '\\':
+                # Wait for the rest of the escape sequence
+                if i + 1 >= len(buf):
+                    break
+                esc = buf[i + 1]
+                if esc == 'u':
+                    if i + 6 > len(buf):
+                        break
+                    try:
+                        out.append(chr(int(buf[i + 2:i + 6], 16)))
+                    except ValueError:
+                        pass
+                    i += 6
+                    continue
+                out.append(self.ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            out.append(ch)
+            i += 1
 
-    return None
+        self.pos = i
+        return ''.join(out)
@@ -0,0 +1,206 @@
+"""
+Shared Ollama client layer for the Flask app, Celery workers and the FastAPI service.
+
+- One pooled httpx transport per process (keep-alive, bounded connections), shared by
+  every timeout profile, so per-call timeouts don't cost a new connection pool.
+- A circuit breaker shared by the sync and async clients: after OLLAMA_BREAKER_FAILURES
+  consecutive connection failures / timeouts / 5xx, calls fail fast with CircuitOpenError
+  for OLLAMA_BREAKER_RESET seconds, then a single trial call decides whether to close it.
+- get_llm_client() / get_async_llm_client() are fork-safe: a Celery prefork child builds
+  its own pool instead of inheriting the parent's sockets.
+
+LLMClient.generate()/chat() take the same arguments as ollama.Client plus `timeout`.
+"""
+import os
+import threading
+import time
+
+import httpx
+from ollama import AsyncClient, Client, ResponseError
+
+OLLAMA_HOST = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
+MAX_CONNECTIONS = int(os.environ.get('OLLAMA_MAX_CONNECTIONS', 32))
+MAX_KEEPALIVE = int(os.environ.get('OLLAMA_MAX_KEEPALIVE', 16))
+KEEPALIVE_EXPIRY = float(os.environ.get('OLLAMA_KEEPALIVE_EXPIRY', 120))
+CONNECT_TIMEOUT = float(os.environ.get('OLLAMA_CONNECT_TIMEOUT', 2))
+READ_TIMEOUT = float(os.environ.get('OLLAMA_READ_TIMEOUT', 120))
+BREAKER_FAILURES = int(os.environ.get('OLLAMA_BREAKER_FAILURES', 3))
+BREAKER_RESET = float(os.environ.get('OLLAMA_BREAKER_RESET', 30))
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised without touching the network while Ollama is considered down"""
+
+
+def _is_outage(error):
+    if isinstance(error, ResponseError):
+        return error.status_code >= 500
+    return isinstance(error, (ConnectionError, httpx.TransportError))
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let one trial call through (another one if the trial never reported back)
+                self.state = self.HALF_OPEN
+                self.opened_at = time.monotonic()
+                return
+            raise CircuitOpenError(f"Ollama circuit open ({self.failures} consecutive failures)")
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self, error):
+        if not _is_outage(error):
+            # Ollama answered (e.g. unknown model): it is up
+            self.record_success()
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+
+def _timeout(seconds):
+    return httpx.Timeout(seconds or READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def _limits():
+    return httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE,
+                        keepalive_expiry=KEEPALIVE_EXPIRY)
+
+
+class LLMClient:
+    def __init__(self, host=OLLAMA_HOST, breaker=None):
+        self.host = host
+        self.breaker = breaker or CircuitBreaker()
+        self._transport = httpx.HTTPTransport(limits=_limits())
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _client(self, timeout):
+        with self._lock:
+            if timeout not in self._clients:
+                self._clients[timeout] = Client(host=self.host, timeout=_timeout(timeout), transport=self._transport)
+            return self._clients[timeout]
+
+    def _call(self, method, timeout, kwargs):
+        self.breaker.before_call()
+        try:
+            result = getattr(self._client(timeout), method)(**kwargs)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        if kwargs.get('stream'):
+            return self._guard_stream(result)
+        self.breaker.record_success()
+        return result
+
+    def _guard_stream(self, chunks):
+        # The HTTP request only starts on first iteration; the first chunk proves Ollama is up
+        first = True
+        try:
+            for chunk in chunks:
+                if first:
+                    self.breaker.record_success()
+                    first = False
+                yield chunk
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+
+    def generate(self, model, prompt='', stream=False, timeout=None, **kwargs):
+        return self._call('generate', timeout, dict(kwargs, model=model, prompt=prompt, stream=stream))
+
+    def chat(self, model, messages=None, stream=False, timeout=None, **kwargs):
+        return self._call('chat', timeout, dict(kwargs, model=model, messages=messages, stream=stream))
+
+
+class AsyncLLMClient:
+    def __init__(self, host=OLLAMA_HOST, breaker=None):
+        self.host = host
+        self.breaker = breaker or CircuitBreaker()
+        self._transport = httpx.AsyncHTTPTransport(limits=_limits())
+        self._clients = {}
+
+    def _client(self, timeout):
+        if timeout not in self._clients:
+            self._clients[timeout] = AsyncClient(host=self.host, timeout=_timeout(timeout), transport=self._transport)
+        return self._clients[timeout]
+
+    async def _call(self, method, timeout, kwargs):
+        self.breaker.before_call()
+        try:
+            result = await getattr(self._client(timeout), method)(**kwargs)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        if kwargs.get('stream'):
+            return self._guard_stream(result)
+        self.breaker.record_success()
+        return result
+
+    async def _guard_stream(self, chunks):
+        first = True
+        try:
+            async for chunk in chunks:
+                if first:
+                    self.breaker.record_success()
+                    first = False
+                yield chunk
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+
+    async def generate(self, model, prompt='', stream=False, timeout=None, **kwargs):
+        return await self._call('generate', timeout, dict(kwargs, model=model, prompt=prompt, stream=stream))
+
+    async def chat(self, model, messages=None, stream=False, timeout=None, **kwargs):
+        return await self._call('chat', timeout, dict(kwargs, model=model, messages=messages, stream=stream))
+
+
+_process = {'pid': None, 'sync': None, 'async': None, 'breaker': None}
+_process_lock = threading.Lock()
+
+
+def _ensure_process_state():
+    if _process['pid'] != os.getpid():
+        _process.update({'pid': os.getpid(), 'sync': None, 'async': None, 'breaker': CircuitBreaker()})
+
+
+def get_llm_client():
+    """Process-wide pooled sync client"""
+    with _process_lock:
+        _ensure_process_state()
+        if _process['sync'] is None:
+            _process['sync'] = LLMClient(breaker=_process['breaker'])
+        return _process['sync']
+
+
+def get_async_llm_client():
+    """Process-wide pooled asyncio client (shares the circuit breaker with the sync client)"""
+    with _process_lock:
+        _ensure_process_state()
+        if _process['async'] is None:
+            _process['async'] = AsyncLLMClient(breaker=_process['breaker'])
+        return _process['async']
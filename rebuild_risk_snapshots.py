@@ -0,0 +1,25 @@
+"""
+Regenerate StudentRiskSnapshot rows from the last 30 days of history.
+Run once after the add_student_risk_snapshot migration, and whenever the
+snapshots need to be brought back in line with the raw tables.
+
+    python rebuild_risk_snapshots.py            # every student
+    python rebuild_risk_snapshots.py 12 57 301  # specific students
+"""
+import sys
+
+from app import app
+from database import db
+from db_models import User
+from utils.risk_snapshot import rebuild_snapshots
+
+def rebuild_risk_snapshots(user_ids=None):
+    with app.app_context():
+        if not user_ids:
+            user_ids = [uid for uid, in db.session.query(User.id).filter_by(role='student').order_by(User.id)]
+        print(f"Rebuilding risk snapshots for {len(user_ids)} students...")
+        rebuilt = rebuild_snapshots(db.session, user_ids)
+        print(f"✅ Rebuilt {rebuilt} risk snapshots")
+
+if __name__ == "__main__":
+    rebuild_risk_snapshots([int(arg) for arg in sys.argv[1:]])
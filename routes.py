@@ -6,6 +6,8 @@ from gemini_service import chat_with_ai, analyze_assessment_results, suggest_ass
 from utils import (hash_student_id, calculate_phq9_score, calculate_gad7_score, 
                   calculate_ghq_score, get_assessment_questions, get_assessment_options,
                   format_time_ago, get_meditation_content, generate_analysis)
+from utils.crisis_lexicon import scan_crisis_terms, matched_terms, CRISIS
+from utils.org_analytics import cached_org_dashboard_stats
 import json
 import logging
 from datetime import datetime, timedelta
@@ -33,12 +35,8 @@ def get_fallback_response(message):
     """Provide hardcoded fallback responses when AI is unavailable"""
     message_lower = message.lower()
     
-    # Crisis detection keywords
-    crisis_keywords = ['suicide', 'kill myself', 'end my life', 'want to die', 'self harm', 
-                      'hurt myself', 'hopeless', 'worthless', 'better off dead', 'end it all',
-                      'marna hai', 'jaan deni hai', 'maut']
-    
-    detected_crisis = [keyword for keyword in crisis_keywords if keyword in message_lower]
+    # Crisis detection keywords (shared lexicon, crisis tier only: "help me" is not a crisis)
+    detected_crisis = matched_terms(scan_crisis_terms(message), tier=CRISIS)
     is_crisis = len(detected_crisis) > 0
     
     if is_crisis:
@@ -428,7 +426,8 @@ def chat():
         return jsonify({'error': 'Invalid session'}), 400
     
     # Save user message
-    user_msg = ChatMessage(session_id=session_id, message_type='user', content=message)
+    user_msg = ChatMessage(session_id=session_id, message_type='user', content=message,
+                           crisis_keywords=matched_terms(scan_crisis_terms(message)) or None)
     db.session.add(user_msg)
     
     # Get chat history for context
@@ -686,16 +685,13 @@ def voice_transcribe():
 @app.route('/audio/<path:filename>')
 @login_required
 def serve_audio(filename):
-    """Serve generated audio files"""
-    import os
-    import tempfile
+    """Serve generated audio from the content-addressed cache (ETag / Range aware)"""
+    from utils.audio_cache import audio_response
     try:
-        # Construct the full path to the audio file
-        audio_file_path = os.path.join(tempfile.gettempdir(), filename)
-        if os.path.exists(audio_file_path):
-            return send_file(audio_file_path, mimetype='audio/wav')
-        else:
+        response = audio_response(filename)
+        if response is None:
             return jsonify({'error': 'Audio file not found'}), 404
+        return response
     except Exception as e:
         app.logger.error(f"Error serving audio file: {e}")
         return jsonify({'error': 'Failed to serve audio file'}), 500
@@ -1533,59 +1529,10 @@ def mentor_dashboard():
         flash('Access denied. This page is for mentors only.', 'error')
         return redirect(url_for('dashboard'))
     
-    # Analytics for mentors
-    total_students = User.query.filter_by(role='student').count()
-    
-    # Students by accommodation type
-    hostel_students = User.query.filter_by(role='student', accommodation_type='hostel').count()
-    local_students = User.query.filter_by(role='student', accommodation_type='local').count()
-    
-    # Recent assessments statistics
-    recent_assessments = db.session.query(
-        Assessment.assessment_type,
-        Assessment.severity_level,
-        func.count(Assessment.id).label('count')
-    ).filter(
-        Assessment.completed_at >= datetime.utcnow() - timedelta(days=30)
-    ).group_by(Assessment.assessment_type, Assessment.severity_level).all()
-    
-    # Crisis flags in the last 30 days
-    crisis_sessions = ChatSession.query.filter(
-        and_(ChatSession.crisis_flag == True,
-             ChatSession.session_start >= datetime.utcnow() - timedelta(days=30))
-    ).count()
-    
-    # Login streaks
-    active_users = User.query.filter(
-        and_(User.role == 'student',
-             User.last_streak_date >= datetime.utcnow().date() - timedelta(days=7))
-    ).count()
-    
-    # Stress level comparison
-    hostel_stress = db.session.query(func.avg(Assessment.score)).filter(
-        and_(Assessment.assessment_type == 'PHQ-9',
-             Assessment.user_id.in_(
-                 db.session.query(User.id).filter_by(accommodation_type='hostel')
-             ))
-    ).scalar() or 0
-    
-    local_stress = db.session.query(func.avg(Assessment.score)).filter(
-        and_(Assessment.assessment_type == 'PHQ-9',
-             Assessment.user_id.in_(
-                 db.session.query(User.id).filter_by(accommodation_type='local')
-             ))
-    ).scalar() or 0
-    
-    stats = {
-        'total_students': total_students,
-        'hostel_students': hostel_students,
-        'local_students': local_students,
-        'recent_assessments': recent_assessments,
-        'crisis_sessions': crisis_sessions,
-        'active_users': active_users,
-        'hostel_avg_stress': round(hostel_stress, 2),
-        'local_avg_stress': round(local_stress, 2)
-    }
+    # Org-scoped figures from one query, cached per organisation (utils/org_analytics.py)
+    stats = cached_org_dashboard_stats(current_user.organization_id)
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(stats)
     
     return render_template('mentor_dashboard.html', stats=stats)
 
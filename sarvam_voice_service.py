@@ -5,24 +5,48 @@ Integrates with existing MindCare chatbot frontend
 
 import os
 import base64
-import tempfile
 import re
-from sarvamai import SarvamAI
-from gemini_service import chat_with_ai
 from flask import current_app
 import logging
+from utils.audio_cache import synthesize_cached
+from utils.speech_backends import TTS_BACKEND, STT_BACKEND, tts_backend, stt_backend, concat_wav
+from utils.transliteration import transliterate
+from utils.voice_turn import split_sentences
+
+HINDI_KEYWORDS = [
+    'kaise', 'kaisa', 'kya', 'hai', 'hoon', 'ho', 'acha', 'theek',
+    'yaar', 'dost', 'bhai', 'mera', 'tera', 'tum', 'aap',
+    'namaskar', 'namaste', 'kya baat', 'sab kuch', 'koi baat nahi'
+]
+HINDI_KEYWORDS_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, HINDI_KEYWORDS)) + r')\b', re.IGNORECASE)
 
 class SarvamVoiceService:
+    TTS_MODEL = "bulbul:v2"
+    # Per-request input limit: longer text is sent in sentence-aligned chunks and the WAVs joined
+    TTS_MAX_CHARS = 500
+    # Audio cache voice id: a new model or speaker must not reuse old audio
+    voice = f"sarvam/{TTS_MODEL}"
+
     def __init__(self):
         self.api_key = os.getenv('SARVAM_API_KEY')
         self.client = None
-        self.setup_client()
+        self.tts_backend = tts_backend(TTS_BACKEND, self)
+        self.stt_backend = stt_backend(STT_BACKEND, self)
+        if self.tts_backend is self:
+            self.setup_client()
+        elif self.stt_backend is self:
+            # Only STT needs Sarvam now; TTS works without it
+            try:
+                self.setup_client()
+            except Exception:
+                pass
         
     def setup_client(self):
         """Initialize Sarvam AI client"""
         try:
             if not self.api_key:
                 raise ValueError("SARVAM_API_KEY not found in environment variables")
+            from sarvamai import SarvamAI
             self.client = SarvamAI(api_subscription_key=self.api_key)
             # Use print for initialization logging (outside Flask context)
             print("✅ Sarvam AI client initialized successfully")
@@ -37,14 +61,8 @@ class SarvamVoiceService:
         total_chars = sum(1 for c in text if c.isalpha())
         has_devanagari = (devanagari_count / total_chars) > 0.3 if total_chars > 0 else False
         
-        # Check for Hindi keywords in Roman script
-        hindi_keywords = [
-            'kaise', 'kaisa', 'kya', 'hai', 'hoon', 'ho', 'acha', 'theek', 
-            'yaar', 'dost', 'bhai', 'main', 'mera', 'tera', 'tum', 'aap',
-            'namaskar', 'namaste', 'kya baat', 'sab kuch', 'koi baat nahi'
-        ]
-        text_lower = text.lower()
-        has_hindi_context = any(keyword in text_lower for keyword in hindi_keywords)
+        # Check for Hindi keywords in Roman script (whole words: 'ho' must not match "how")
+        has_hindi_context = bool(HINDI_KEYWORDS_RE.search(text))
         
         return {
             'has_devanagari': has_devanagari,
@@ -53,28 +71,30 @@ class SarvamVoiceService:
             'language_code': 'hi-IN' if (has_devanagari or has_hindi_context) else 'en-IN'
         }
     
+    def transcribe(self, audio_file_path):
+        """Transcript of an audio file from the Sarvam AI STT API"""
+        with open(audio_file_path, "rb") as audio_file:
+            response = self.client.speech_to_text.transcribe(
+                file=audio_file,
+                model="saarika:v2.5",
+                language_code="hi-IN"  # Supports both Hindi and English
+            )
+            
+        # Extract transcript from response
+        if hasattr(response, "transcript"):
+            if isinstance(response.transcript, list) and len(response.transcript) > 0:
+                return getattr(response.transcript[0], "text", str(response.transcript[0]))
+            elif isinstance(response.transcript, str):
+                return response.transcript
+            return str(response.transcript)
+        elif isinstance(response, str):
+            return response
+        return ""
+
     def transcribe_audio(self, audio_file_path):
-        """Convert speech to text using Sarvam AI STT"""
+        """Convert speech to text with the configured STT backend"""
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                response = self.client.speech_to_text.transcribe(
-                    file=audio_file,
-                    model="saarika:v2.5",
-                    language_code="hi-IN"  # Supports both Hindi and English
-                )
-                
-            # Extract transcript from response
-            if hasattr(response, "transcript"):
-                if isinstance(response.transcript, list) and len(response.transcript) > 0:
-                    transcript = getattr(response.transcript[0], "text", str(response.transcript[0]))
-                elif isinstance(response.transcript, str):
-                    transcript = response.transcript
-                else:
-                    transcript = str(response.transcript)
-            elif isinstance(response, str):
-                transcript = response
-            else:
-                transcript = ""
+            transcript = self.stt_backend.transcribe(audio_file_path)
                 
             try:
                 current_app.logger.info(f"🎤 STT Success: '{transcript}'")
@@ -94,37 +114,31 @@ class SarvamVoiceService:
         language_info = self.detect_language_and_context(user_message)
         
         if language_info['is_hinglish']:
-            # For Hindi/Hinglish, generate response in Devanagari for better TTS
-            enhanced_prompt = f"""
-            You are 'Buddy', a compassionate mental health chatbot. The user said: "{user_message}"
-            
-            Original response: "{original_response}"
-            
-            Convert this response to natural Hindi Devanagari script for voice synthesis while keeping the same meaning and emotional tone.
-            Write Hindi words in proper Devanagari script. You can mix some English words naturally.
-            Keep it concise and conversational.
-            
-            Examples:
-            - "How are you?" → "आप कैसे हैं?"
-            - "I understand" → "मैं समझ गया"
-            - "That's good" → "यह अच्छा है"
-            """
-            
-            try:
-                # Use existing Gemini service to enhance response
-                enhanced_response = chat_with_ai(enhanced_prompt, conversation_history=[])
-                return enhanced_response.strip()
-            except Exception as e:
-                try:
-                    current_app.logger.warning(f"Response enhancement failed: {e}")
-                except RuntimeError:
-                    print(f"Response enhancement failed: {e}")
-                return original_response
+            # For Hindi/Hinglish, speak Hindi words from Devanagari (local, no LLM call)
+            return self.translate_to_devanagari(original_response)
         
         return original_response
     
+    def synthesize(self, text, language_code):
+        """WAV bytes for already-cleaned text from the Sarvam AI TTS API"""
+        chunks = []
+        for sentence in split_sentences(text, max_chars=self.TTS_MAX_CHARS):
+            if chunks and len(chunks[-1]) + len(sentence) < self.TTS_MAX_CHARS:
+                chunks[-1] += ' ' + sentence
+            else:
+                chunks.append(sentence)
+        parts = []
+        for chunk in chunks or [text]:
+            response = self.client.text_to_speech.convert(
+                text=chunk,
+                target_language_code=language_code,
+                model=self.TTS_MODEL
+            )
+            parts.append(base64.b64decode(response.audios[0]))
+        return concat_wav(parts)
+
     def text_to_speech(self, text, language_code=None):
-        """Convert text to speech using Sarvam AI TTS"""
+        """Convert text to speech (cached by text, language and voice); returns the audio file path"""
         try:
             # Auto-detect language if not provided
             if not language_code:
@@ -139,25 +153,13 @@ class SarvamVoiceService:
             except RuntimeError:
                 print(f"🔊 TTS Request: '{clean_text}' (lang: {language_code})")
             
-            # Call Sarvam TTS API
-            response = self.client.text_to_speech.convert(
-                text=clean_text,
-                target_language_code=language_code,
-                model="bulbul:v2"
-            )
-            
-            # Decode audio data
-            audio_data = base64.b64decode(response.audios[0])
-            
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(audio_data)
-                audio_path = temp_file.name
+            # Synthesised once per (text, language, voice), then served from the audio cache
+            audio_path = synthesize_cached(clean_text, language_code, self.tts_backend)
             
             try:
-                current_app.logger.info(f"✅ TTS Success: Audio saved to {audio_path}")
+                current_app.logger.info(f"✅ TTS Success: Audio at {audio_path}")
             except RuntimeError:
-                print(f"✅ TTS Success: Audio saved to {audio_path}")
+                print(f"✅ TTS Success: Audio at {audio_path}")
             return audio_path
             
         except Exception as e:
@@ -181,36 +183,13 @@ class SarvamVoiceService:
         # Remove extra whitespace
         text = re.sub(r'\s+', ' ', text)
         
-        # Limit length for better performance
-        if len(text) > 300:
-            text = text[:300] + "..."
-        
+        # No length limit: long replies are spoken in full (voice turns stream them per sentence)
         return text.strip()
     
     def translate_to_devanagari(self, hinglish_text):
-        """Translate Hinglish text to pure Devanagari for better TTS"""
+        """Transliterate the Hindi words of Hinglish text to Devanagari for better TTS"""
         try:
-            prompt = f"""
-            Convert this Hinglish text to proper Hindi Devanagari script for text-to-speech synthesis:
-            
-            Input: "{hinglish_text}"
-            
-            Rules:
-            - Convert ALL Hindi words to Devanagari script
-            - Keep English technical terms in English
-            - Maintain the same meaning and tone
-            - Make it natural for speech synthesis
-            
-            Examples:
-            - "Hi, kaise ho?" → "नमस्ते, कैसे हो?"
-            - "Main theek hoon" → "मैं ठीक हूँ"
-            - "Thank you yaar" → "धन्यवाद यार"
-            
-            Output only the converted text:
-            """
-            
-            translated = chat_with_ai(prompt, conversation_history=[])
-            return translated.strip()
+            return transliterate(hinglish_text).strip()
             
         except Exception as e:
             try:
@@ -72,10 +72,13 @@ export default function Community() {
   };
 
   const handleLike = async (postId) => {
+    const target = posts.find(p => p.id === postId);
+    if (!target) return;
+    const isLiking = !target.liked_by_me;
+
     // Optimistic Update
     setPosts(prev => prev.map(p => {
       if (p.id === postId) {
-        const isLiking = !p.liked_by_me;
         return {
           ...p,
           liked_by_me: isLiking,
@@ -86,9 +89,12 @@ export default function Community() {
     }));
 
     try {
+      // Send the wanted state rather than toggling, so repeated clicks cannot flip it back
       const res = await fetch(`${API_URL}/api/venting/posts/${postId}/like`, {
         method: 'POST',
-        credentials: 'include'
+        headers: { 'Content-Type': 'application/json' },
+        credentials: 'include',
+        body: JSON.stringify({ liked: isLiking })
       });
       if (!res.ok) {
         fetchPosts(); // Rollback
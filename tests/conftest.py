@@ -0,0 +1,43 @@
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# utils/__init__ pulls in the LLM client config
+os.environ.setdefault('GROQ_API_KEY', 'test')
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """In-memory Redis standing in for the cache event channel"""
+    fakeredis = pytest.importorskip('fakeredis')
+    import utils.cache_events
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(utils.cache_events, 'r_cache', client)
+    return client
+
+
+@pytest.fixture
+def db_app(monkeypatch, fake_redis):
+    """Flask app on in-memory SQLite with every table; Celery tasks import it as `app`"""
+    from flask import Flask
+    from sqlalchemy.dialects.postgresql import JSONB
+    from sqlalchemy.ext.compiler import compiles
+    from database import db
+    import db_models  # noqa: F401 (registers the tables)
+
+    @compiles(JSONB, 'sqlite')
+    def _jsonb_on_sqlite(type_, compiler, **kw):
+        return 'JSON'
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    monkeypatch.setitem(sys.modules, 'app', types.SimpleNamespace(app=app))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,100 @@
+import os
+import re
+
+import pytest
+from flask import Flask
+
+from utils import audio_cache
+from utils.speech_backends import tts_backend
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('TTS_BACKEND', 'stub')
+    monkeypatch.setenv('AUDIO_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(audio_cache, 'AUDIO_CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def backend(cache_dir):
+    backend = tts_backend(os.environ['TTS_BACKEND'], None)
+    calls = []
+    synthesize = backend.synthesize
+    backend.synthesize = lambda text, language_code: calls.append(text) or synthesize(text, language_code)
+    backend.calls = calls
+    return backend
+
+
+@pytest.fixture
+def client(cache_dir):
+    app = Flask(__name__)
+
+    @app.route('/audio/<path:filename>')
+    def serve_audio(filename):
+        return audio_cache.audio_response(filename) or ('', 404)
+    return app.test_client()
+
+
+def test_audio_key_is_stable_and_covers_voice_language_and_text():
+    key = audio_cache.audio_key("I'm here to listen.", 'en-IN', 'stub')
+    assert re.fullmatch(r'[0-9a-f]{64}', key)
+    assert key == audio_cache.audio_key("I'm here to listen.", 'en-IN', 'stub')
+    assert key != audio_cache.audio_key("I'm here to listen.", 'hi-IN', 'stub')
+    assert key != audio_cache.audio_key("I'm here to listen.", 'en-IN', 'piper/hi_IN-pratham-medium')
+    assert key != audio_cache.audio_key("I'm here to listen!", 'en-IN', 'stub')
+
+
+def test_synthesize_cached_synthesises_once(backend):
+    first = audio_cache.synthesize_cached("Take a deep breath.", 'en-IN', backend)
+    second = audio_cache.synthesize_cached("Take a deep breath.", 'en-IN', backend)
+    assert first == second
+    assert os.path.basename(first) == audio_cache.audio_key("Take a deep breath.", 'en-IN', 'stub') + '.wav'
+    assert backend.calls == ["Take a deep breath."]
+
+
+def test_evict_drops_least_recently_used(cache_dir):
+    keys = [audio_cache.audio_key(f"reply {i}", 'en-IN', 'stub') for i in range(3)]
+    for age, key in zip((300, 200, 100), keys):
+        path = audio_cache.store(key, b'\0' * 1000)
+        os.utime(path, (os.path.getmtime(path) - age,) * 2)
+    # A hit makes the oldest file the most recently used
+    assert audio_cache.lookup(keys[0])
+
+    assert audio_cache.evict(max_bytes=2000) == 2000
+    assert audio_cache.lookup(keys[1]) is None
+    assert audio_cache.lookup(keys[0]) and audio_cache.lookup(keys[2])
+
+
+def test_store_evicts_over_budget(cache_dir, monkeypatch):
+    monkeypatch.setattr(audio_cache, 'AUDIO_CACHE_MAX_BYTES', 2500)
+    old = audio_cache.store('a' * 64, b'\0' * 1000)
+    os.utime(old, (os.path.getmtime(old) - 100,) * 2)
+    audio_cache.store('b' * 64, b'\0' * 1000)
+    audio_cache.store('c' * 64, b'\0' * 1000)
+    assert sorted(os.listdir(cache_dir)) == ['b' * 64 + '.wav', 'c' * 64 + '.wav']
+
+
+def test_serve_audio_etag_304_and_range(backend, client):
+    path = audio_cache.synthesize_cached("Range test", 'en-IN', backend)
+    name = os.path.basename(path)
+    key = name[:-len('.wav')]
+
+    response = client.get(f'/audio/{name}')
+    assert response.status_code == 200
+    assert response.mimetype == 'audio/wav'
+    assert response.headers['ETag'] == f'"{key}"'
+    assert 'immutable' in response.headers['Cache-Control'] and 'private' in response.headers['Cache-Control']
+    assert response.data == open(path, 'rb').read()
+
+    assert client.get(f'/audio/{name}', headers={'If-None-Match': f'"{key}"'}).status_code == 304
+
+    partial = client.get(f'/audio/{name}', headers={'Range': 'bytes=0-99'})
+    assert partial.status_code == 206
+    assert len(partial.data) == 100
+    assert partial.headers['Content-Range'] == f'bytes 0-99/{os.path.getsize(path)}'
+
+
+@pytest.mark.parametrize('filename', ['0' * 64 + '.wav', 'not-a-key.wav', '../etc/passwd'])
+def test_serve_audio_unknown_files_are_404(client, filename):
+    assert client.get(f'/audio/{filename}').status_code == 404
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from database import db
+from db_models import User, ChatSession, ChatMessage, ChatIntent
+from utils import chat_writer
+
+
+@pytest.fixture
+def stream(db_app, monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(chat_writer, 'r_context', client)
+    monkeypatch.setattr(chat_writer, '_enqueue_script', client.register_script(chat_writer.ENQUEUE_LUA))
+    scheduled = []
+    monkeypatch.setattr(chat_writer.flush_chat_writes, 'apply_async', lambda countdown: scheduled.append(countdown))
+    client.scheduled = scheduled
+    return client
+
+
+@pytest.fixture
+def session_id(db_app):
+    user = User(username='student', email='student@example.com', password_hash='x', full_name='Student')
+    db.session.add(user)
+    db.session.commit()
+    chat_session = ChatSession(user_id=user.id)
+    db.session.add(chat_session)
+    db.session.commit()
+    return chat_session.id
+
+
+def buffer_turn(session_id, text, crisis=False):
+    writes = chat_writer.ChatWriteBuffer()
+    writes.add_message(session_id, 'user', text)
+    writes.add_message(session_id, 'bot', f"reply to {text}", crisis_detected=crisis)
+    writes.add_intent(session_id, 1, text, {'emotional_state': 'sad', 'emotional_intensity': 'high'}, None, None)
+    writes.flush()
+
+
+def test_buffered_turns_are_flushed_in_order(stream, session_id):
+    buffer_turn(session_id, 'first')
+    buffer_turn(session_id, 'second', crisis=True)
+    # One delayed flush scheduled for both turns
+    assert stream.scheduled == [chat_writer.FLUSH_INTERVAL_MS / 1000]
+    assert stream.xlen(chat_writer.STREAM_KEY) == 6
+
+    assert chat_writer.flush_chat_writes.run() == 6
+    assert stream.xlen(chat_writer.STREAM_KEY) == 0
+    contents = [m.content for m in ChatMessage.query.order_by(ChatMessage.id)]
+    assert contents == ['first', 'reply to first', 'second', 'reply to second']
+    assert ChatIntent.query.count() == 2
+    assert db.session.get(ChatSession, session_id).crisis_flag
+
+
+def test_rejected_rows_go_to_dead_letter(stream, session_id):
+    writes = chat_writer.ChatWriteBuffer()
+    writes.add_message(session_id, 'user', None)  # content is NOT NULL
+    writes.add_message(session_id, 'user', 'kept')
+    writes.flush()
+    stream.xadd(chat_writer.STREAM_KEY, {'row': json.dumps({'kind': 'message', 'session_id': session_id})})
+
+    chat_writer.flush_chat_writes.run()
+    assert stream.xlen(chat_writer.STREAM_KEY) == 0
+    assert [m.content for m in ChatMessage.query] == ['kept']
+    dead = [json.loads(fields[b'row']) for _, fields in stream.xrange(chat_writer.DEAD_LETTER_KEY)]
+    assert [row.get('content') for row in dead] == [None, None]
+    assert all(fields[b'error'] for _, fields in stream.xrange(chat_writer.DEAD_LETTER_KEY))
+
+
+def test_outage_keeps_rows_and_retries(stream, session_id, monkeypatch):
+    buffer_turn(session_id, 'during outage')
+    stream.scheduled.clear()
+
+    def database_down(rows):
+        raise OperationalError('INSERT', {}, Exception('server closed the connection'))
+    insert_rows = chat_writer.insert_rows
+    monkeypatch.setattr(chat_writer, 'insert_rows', database_down)
+    assert chat_writer.flush_chat_writes.run() == 0
+    assert stream.xlen(chat_writer.STREAM_KEY) == 3
+    assert stream.xlen(chat_writer.DEAD_LETTER_KEY) == 0
+    assert stream.scheduled == [chat_writer.RETRY_SECONDS]
+
+    monkeypatch.setattr(chat_writer, 'insert_rows', insert_rows)
+    assert chat_writer.flush_chat_writes.run() == 3
+    assert ChatMessage.query.count() == 2
+
+
+def test_redis_down_saves_synchronously(db_app, session_id, monkeypatch):
+    monkeypatch.setattr(chat_writer, '_enqueue_script', None)
+    buffer_turn(session_id, 'no redis')
+    assert ChatMessage.query.count() == 2
+    assert ChatIntent.query.count() == 1
@@ -0,0 +1,94 @@
+import pytest
+
+from utils.crisis_lexicon import CRISIS, WARNING, CRISIS_LEXICON, scan_crisis_terms, matched_terms, has_crisis_terms
+
+# Crisis lists the chat paths used before the shared lexicon (gemini_service.CRISIS_KEYWORDS,
+# routes.get_fallback_response, the chatbot cache bypass and keyword fallback)
+GEMINI_KEYWORDS = [
+    'suicide', 'kill myself', 'end my life', 'want to die', 'death wish',
+    'self harm', 'cut myself', 'hurt myself', 'overdose', 'jump off',
+    'not worth living', 'nobody cares', 'hopeless', 'worthless',
+    "can't go on", 'give up', 'end it all', 'better off dead',
+    'marna hai', 'jaan deni hai', 'maut',
+]
+FALLBACK_KEYWORDS = [
+    'suicide', 'kill myself', 'end my life', 'want to die', 'self harm',
+    'hurt myself', 'hopeless', 'worthless', 'better off dead', 'end it all',
+    'marna hai', 'jaan deni hai', 'maut',
+]
+CHATBOT_KEYWORDS = [
+    'suicide', 'end my life', 'harm myself', 'khudkushi', 'marna', 'marna hai', 'nahi jeena',
+    'mar jaunga', 'marr jaunga', 'jaan dena', 'suicide karna', 'hurt myself', 'want to die',
+    'no reason to live', 'better off dead', "can't go on", 'give up', 'sos', 'help me please',
+    'emergency', 'kill myself',
+]
+WARNING_KEYWORDS = ['kill', 'die', 'dying', 'help me']
+
+
+def tiers(text):
+    return {m['term']: m['tier'] for m in scan_crisis_terms(text)}
+
+
+@pytest.mark.parametrize('keyword', sorted(set(GEMINI_KEYWORDS + FALLBACK_KEYWORDS + CHATBOT_KEYWORDS)))
+def test_former_crisis_keywords_are_crisis_tier(keyword):
+    matches = scan_crisis_terms(f"honestly {keyword} right now")
+    assert has_crisis_terms(matches), keyword
+    assert matched_terms(matches, tier=CRISIS)
+
+
+@pytest.mark.parametrize('keyword', WARNING_KEYWORDS)
+def test_ambiguous_words_are_warning_tier(keyword):
+    assert CRISIS_LEXICON[keyword] == WARNING
+    matches = scan_crisis_terms(f"can you {keyword} this")
+    assert matched_terms(matches) and not has_crisis_terms(matches)
+
+
+@pytest.mark.parametrize('message', [
+    "I feel hopeless",
+    "maut aa jaye",
+    "i feel worthless and nobody cares",
+    "mujhe marna hai",
+    "मुझे मरना है",
+    "अब मौत ही रास्ता है",
+])
+def test_crisis_messages(message):
+    assert has_crisis_terms(scan_crisis_terms(message))
+
+
+@pytest.mark.parametrize('message', [
+    "can you help me with my exam",
+    "I'm dying to see the results",
+    "this diet is killing me",
+    "my phone might die",
+])
+def test_everyday_messages_are_not_crisis(message):
+    assert not has_crisis_terms(scan_crisis_terms(message))
+
+
+@pytest.mark.parametrize('message, term', [
+    ("I keep thinking about self-harm", 'self harm'),
+    ("I want to kill-myself", 'kill myself'),
+    ("sometimes I want to end-my-life", 'end my life'),
+    ("i cant go on", "can't go on"),
+    ("mujhe nhi jeena", 'nahi jeena'),
+])
+def test_spelling_and_hyphen_variants(message, term):
+    assert tiers(message).get(term) == CRISIS
+
+
+@pytest.mark.parametrize('message, term', [
+    ("मैं ख़ुदकुशी के बारे में सोचता हूँ", 'खुदकुशी'),
+    # Decomposed nukta (ख + ़) as typed by some keyboards
+    ("मैं \u0916\u093cुदकुशी के बारे में सोचता हूँ", 'खुदकुशी'),
+    ("मेरी ज़िंदगी खत्म है", 'ज़िंदगी खत्म'),
+    ("मेरी जिन्दगी ख़त्म है", 'ज़िंदगी खत्म'),
+    ("मैं मर जाऊँगा", 'मर जाऊंगा'),
+])
+def test_devanagari_variants(message, term):
+    assert tiers(message).get(term) == CRISIS
+
+
+def test_word_boundaries_and_offsets():
+    assert scan_crisis_terms("diet and skills") == []
+    [match] = scan_crisis_terms("I feel hopeless today")
+    assert (match['term'], match['start'], match['end'], match['text']) == ('hopeless', 7, 15, 'hopeless')
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from models.json_sanitizer import INTENT_SCHEMA, JsonObjectStream, ReplyTextStream, extract_json, validate_intent
+
+INTENT = {
+    'emotional_state': 'anxious', 'intent_type': 'reassurance', 'cognitive_load': 'high',
+    'emotional_intensity': 'moderate', 'help_receptivity': 'open', 'time_focus': 'future',
+    'context_dependency': 'standalone', 'self_harm_crisis': 'false',
+}
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def feed_all(stream, tokens):
+    for token in tokens:
+        result = stream.feed(token)
+        if result is not None:
+            return result
+    return stream.finish()
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 1000])
+def test_chunked_feed_returns_first_object(size):
+    text = 'Sure! Here it is: ' + json.dumps(INTENT) + ' Hope that helps {"extra": 1}'
+    stream = JsonObjectStream(INTENT_SCHEMA)
+    assert feed_all(stream, chunks(text, size)) == INTENT
+    assert stream.done and json.loads(stream.raw) == INTENT
+    # Nothing more is scanned once an object has been found
+    assert stream.feed('{"late": true}') is None
+
+
+@pytest.mark.parametrize('size', [1, 4, 1000])
+def test_braces_and_escapes_inside_strings(size):
+    obj = {'response': 'use {braces} and "quotes" \\ back\\slash }{', 'note': 'line\nbreak \u00e9'}
+    text = 'prefix ' + json.dumps(obj) + ' trailing'
+    assert feed_all(JsonObjectStream(), chunks(text, size)) == obj
+
+
+def test_escape_split_across_tokens():
+    stream = JsonObjectStream()
+    assert stream.feed('{"a": "x\\') is None
+    assert stream.escaped
+    assert stream.feed('"}"}') == {'a': 'x"}'}
+
+
+@pytest.mark.parametrize('text', [
+    '{not json} then {"a": 1}',
+    '{"a": 1,} broken, then {"a": 1}',
+    '{"a": 1 "b": 2} then {"a": 1}',
+    '{"unterminated": {"a": 1}',
+])
+def test_broken_candidates_are_skipped(text):
+    assert feed_all(JsonObjectStream(), chunks(text, 3)) == {'a': 1}
+    assert extract_json(text) == {'a': 1}
+
+
+def test_objects_without_schema_fields_are_skipped():
+    partial = {k: v for k, v in INTENT.items() if k != 'time_focus'}
+    text = json.dumps(partial) + '\nCorrected: ' + json.dumps(INTENT)
+    assert extract_json(text, INTENT_SCHEMA) == INTENT
+    assert extract_json(text) == partial
+    assert extract_json(json.dumps(partial), INTENT_SCHEMA) is None
+
+
+@pytest.mark.parametrize('text', [None, '', 'no json here', '{"a": ', '{{{'])
+def test_extract_json_without_object(text):
+    assert extract_json(text) is None
+
+
+def test_extract_json_ignores_trailing_prose():
+    text = '```json\n' + json.dumps(INTENT) + '\n```\nI classified the message as anxious {because}.'
+    assert extract_json(text, INTENT_SCHEMA) == INTENT
+
+
+def test_validate_intent():
+    assert validate_intent(INTENT) == []
+    assert validate_intent({**INTENT, 'self_harm_crisis': True}) == []
+    assert validate_intent({**INTENT, 'emotional_state': 'Anxious'}) == []
+    bad = {**INTENT, 'emotional_state': 'elated', 'cognitive_load': None}
+    del bad['time_focus']
+    assert validate_intent(bad) == [
+        "unexpected emotional_state='elated'",
+        "unexpected cognitive_load=None",
+        "missing time_focus",
+    ]
+
+
+def test_extracted_object_can_still_fail_validation():
+    # Field presence gets it through the extractor; validate_intent catches the values
+    obj = {**INTENT, 'intent_type': 'smalltalk'}
+    assert extract_json('reply: ' + json.dumps(obj), INTENT_SCHEMA) == obj
+    assert validate_intent(obj) == ["unexpected intent_type='smalltalk'"]
+
+
+@pytest.mark.parametrize('size', [1, 2, 5, 1000])
+def test_reply_stream_decodes_response_value(size):
+    reply = {'response': 'Take a breath.\nYou said "tests" \u2014 one at a time \\o/', 'suggested_feature': 'breathing'}
+    stream = ReplyTextStream()
+    out = ''.join(stream.feed(token) for token in chunks(json.dumps(reply), size))
+    assert out == reply['response']
+    assert stream.done
+
+
+def test_reply_stream_unicode_escape_split_across_tokens():
+    stream = ReplyTextStream()
+    assert stream.feed('{"response": "caf\\u00') == 'caf'
+    assert stream.feed('e9 ok"') == '\u00e9 ok'
+    assert stream.feed(', "suggested_feature": "x"}') == ''
+
+
+def test_reply_stream_passes_plain_text_through():
+    stream = ReplyTextStream()
+    assert [stream.feed(t) for t in ['  ', 'Hello', ' there {x}']] == ['', 'Hello', ' there {x}']
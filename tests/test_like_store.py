@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy.exc import DataError
+
+from database import db
+from db_models import User, VentingPost, VentingPostLike
+from utils import like_store
+
+
+@pytest.fixture
+def likes(db_app, monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(like_store, 'r_context', client)
+    monkeypatch.setattr(like_store, '_set_like_script', client.register_script(like_store.SET_LIKE_LUA))
+    monkeypatch.setattr(like_store, '_load_user_script', client.register_script(like_store.LOAD_USER_LUA))
+    monkeypatch.setattr(like_store.flush_likes, 'apply_async', lambda countdown: None)
+    return client
+
+
+@pytest.fixture
+def post_id(db_app):
+    users = [User(username=f'user{i}', email=f'user{i}@example.com', password_hash='x', full_name=f'User {i}')
+             for i in range(1, 6)]
+    db.session.add_all(users)
+    db.session.commit()
+    post = VentingPost(user_id=1, content='rough week', likes=0)
+    db.session.add(post)
+    db.session.commit()
+    return post.id
+
+
+def stored_likes(post_id):
+    db.session.expire_all()
+    return db.session.get(VentingPost, post_id).likes, VentingPostLike.query.filter_by(post_id=post_id).count()
+
+
+def test_repeated_likes_are_idempotent(likes, post_id):
+    assert like_store.set_like(post_id, 2, True) == (True, 1, True)
+    assert like_store.set_like(post_id, 2, True) == (True, 1, False)
+    assert like_store.set_like(post_id, 3, None) == (True, 2, True)
+    assert like_store.set_like(post_id, 3, None) == (False, 1, True)
+    assert like_store.set_like(post_id, 3, False) == (False, 1, False)
+    assert like_store.like_counts([post_id]) == {post_id: 1}
+    assert like_store.liked_ids(2, [post_id]) == {post_id}
+    assert like_store.set_like(9999, 2, True) is None
+
+
+def test_flush_writes_rows_and_counts(likes, post_id):
+    for user_id in (2, 3, 4):
+        like_store.set_like(post_id, user_id, True)
+    like_store.set_like(post_id, 4, False)
+    # Two likes and the unlike of user 4 (a delete of nothing)
+    assert like_store.flush_likes.run() == 3
+    assert stored_likes(post_id) == (2, 2)
+    assert not likes.exists(like_store.PENDING_KEY, like_store.FLUSHING_KEY)
+
+    # Replaying a batch is harmless
+    assert like_store.write_back({(post_id, 2): True, (post_id, 4): False}) == 2
+    assert stored_likes(post_id) == (2, 2)
+
+
+def test_rejected_change_is_dead_lettered(likes, post_id, monkeypatch):
+    for user_id in (2, 3):
+        like_store.set_like(post_id, user_id, True)
+    write_back = like_store.write_back
+
+    def reject_user_3(changes):
+        if (post_id, 3) in changes:
+            raise DataError('INSERT', {}, Exception('bad row'))
+        return write_back(changes)
+    monkeypatch.setattr(like_store, 'write_back', reject_user_3)
+
+    assert like_store.flush_likes.run() == 1
+    assert not likes.exists(like_store.FLUSHING_KEY)
+    assert list(likes.hgetall(like_store.DEAD_LETTER_KEY)) == [f"{post_id}:3".encode()]
+    assert stored_likes(post_id)[1] == 1
+
+
+def test_reload_after_database_fallback_keeps_unflushed_likes(likes, post_id):
+    like_store.set_like(post_id, 2, True)
+    like_store.set_like(post_id, 3, True)
+    # User 4's like went straight to the database while Redis misbehaved
+    db.session.add(VentingPostLike(post_id=post_id, user_id=4))
+    db.session.commit()
+    like_store.forget_like_state(post_id, 4)
+
+    assert like_store.set_like(post_id, 5, True) == (True, 4, True)
+    assert like_store.liked_ids(4, [post_id]) == {post_id}
+    like_store.flush_likes.run()
+    assert stored_likes(post_id) == (4, 4)
+
+
+def test_user_reload_overlays_unflushed_changes(likes, post_id):
+    like_store.set_like(post_id, 2, True)
+    likes.delete(f"{like_store.LIKED_PREFIX}2")
+    assert like_store.liked_ids(2, [post_id]) == {post_id}
+    # Still liked, so repeating the like does not count twice
+    assert like_store.set_like(post_id, 2, True) == (True, 1, False)
+
+
+def test_like_state_expires(likes, post_id):
+    like_store.set_like(post_id, 2, True)
+    for key in (f"{like_store.LIKED_PREFIX}2", f"{like_store.COUNT_PREFIX}{post_id}"):
+        assert 0 < likes.ttl(key) <= like_store.LIKE_STATE_TTL
+
+
+def test_write_back_counts_rows_when_count_expired(likes, post_id):
+    like_store.set_like(post_id, 2, True)
+    like_store.set_like(post_id, 3, True)
+    likes.delete(f"{like_store.COUNT_PREFIX}{post_id}")
+    like_store.flush_likes.run()
+    assert stored_likes(post_id) == (2, 2)
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.exceptions import BadRequest
+
+from database import db
+from db_models import User, ChatSession
+from utils import pagination
+from utils.pagination import decode_cursor, encode_cursor, keyset_page, page_args
+
+START = datetime(2025, 3, 1, 9, 30)
+
+
+@pytest.fixture
+def sessions(db_app):
+    """Ten sessions: two legacy rows without a start time and two sharing one"""
+    db.session.add(User(username='student', email='student@example.com', password_hash='x', full_name='Student'))
+    db.session.commit()
+    starts = [START + timedelta(hours=i) for i in range(6)] + [START + timedelta(hours=2), None, START, None]
+    db.session.add_all([ChatSession(user_id=1, session_start=start or START) for start in starts])
+    db.session.commit()
+    # The column default fills in a None start time, so clear those rows afterwards
+    ids = [s.id for s in ChatSession.query.order_by(ChatSession.id)]
+    legacy = [row_id for row_id, start in zip(ids, starts) if start is None]
+    ChatSession.query.filter(ChatSession.id.in_(legacy)).update({'session_start': None})
+    db.session.commit()
+    return ChatSession.query.filter_by(user_id=1)
+
+
+def expected_order(query):
+    rows = query.all()
+    return [s.id for s in sorted(rows, key=lambda s: s.id, reverse=True) if s.session_start is None] + [
+        s.id for s in sorted((s for s in rows if s.session_start), key=lambda s: (s.session_start, s.id), reverse=True)
+    ]
+
+
+def page_ids(query, limit, after=None):
+    rows, cursor = keyset_page(query, ChatSession.session_start, ChatSession.id, limit=limit, after=after)
+    return [s.id for s in rows], cursor
+
+
+@pytest.mark.parametrize('timestamp, row_id', [(START, 7), (datetime(2025, 3, 1, 9, 30, 15, 123456), 1), (None, 42)])
+def test_cursor_round_trip(timestamp, row_id):
+    cursor = encode_cursor(timestamp, row_id)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (timestamp, row_id)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-a-cursor', encode_cursor(START, 1)[:-3], 'WyJ4IiwgMV0', 'WzFd'])
+def test_bad_cursor_raises(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 4, 10, 11])
+def test_pages_cover_every_row_once(sessions, limit):
+    seen, cursor, after = [], None, None
+    while True:
+        ids, cursor = page_ids(sessions, limit, after)
+        assert 0 < len(ids) <= limit
+        seen += ids
+        if not cursor:
+            break
+        after = decode_cursor(cursor)
+    assert seen == expected_order(sessions)
+
+
+def test_cursor_inside_null_timestamps(sessions):
+    order = expected_order(sessions)
+    ids, cursor = page_ids(sessions, 1)
+    assert decode_cursor(cursor) == (None, ids[0])
+    assert page_ids(sessions, 2, decode_cursor(cursor))[0] == order[1:3]
+
+
+def test_unpaged_request_returns_whole_listing(db_app, sessions):
+    with db_app.test_request_context('/history'):
+        assert page_args() == (None, None)
+        rows, cursor = keyset_page(sessions, ChatSession.session_start, ChatSession.id)
+    assert [s.id for s in rows] == expected_order(sessions) and cursor is None
+
+
+def test_request_args_page(db_app, sessions):
+    order = expected_order(sessions)
+    with db_app.test_request_context('/history?limit=4'):
+        rows, cursor = keyset_page(sessions, ChatSession.session_start, ChatSession.id)
+    assert [s.id for s in rows] == order[:4]
+    with db_app.test_request_context('/history', query_string={'cursor': cursor}):
+        assert page_args()[0] == pagination.DEFAULT_LIMIT
+        rows, cursor = keyset_page(sessions, ChatSession.session_start, ChatSession.id)
+    assert [s.id for s in rows] == order[4:] and cursor is None
+
+
+@pytest.mark.parametrize('query_string, limit', [
+    ('limit=0', 1),
+    ('limit=-5', 1),
+    ('limit=100000', pagination.MAX_LIMIT),
+])
+def test_limit_is_clamped(db_app, query_string, limit):
+    with db_app.test_request_context(f'/history?{query_string}'):
+        assert page_args() == (limit, None)
+
+
+@pytest.mark.parametrize('query_string', ['limit=ten', 'limit=', 'limit=2.5', 'cursor=garbage', 'limit=5&cursor=WzFd'])
+def test_bad_arguments_are_400(db_app, query_string):
+    with db_app.test_request_context(f'/history?{query_string}'):
+        with pytest.raises(BadRequest):
+            page_args()
@@ -0,0 +1,113 @@
+import pytest
+import redis
+from flask import Flask
+from flask_login import LoginManager
+
+from utils import rate_limiter
+from utils.rate_limiter import SlidingWindowLimiter, rate_limit
+
+LIMITS = {'test': {'student': (3, 60), 'default': (5, 60)}}
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    login_manager = LoginManager(app)
+    login_manager.user_loader(lambda user_id: None)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def redis_limiter(app):
+    fakeredis = pytest.importorskip('fakeredis')
+    return SlidingWindowLimiter(fakeredis.FakeRedis(), LIMITS)
+
+
+class FailingRedis:
+    """Registers scripts that fail with the given Redis error"""
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def register_script(self, source):
+        def script(keys, args):
+            self.calls += 1
+            raise self.error
+        return script
+
+
+def test_window_allows_limit_then_blocks(redis_limiter):
+    decisions = [redis_limiter.check('test', 1, 'student') for _ in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions] == [2, 1, 0, 0]
+    assert all(d.backend == 'redis' and d.limit == 3 for d in decisions)
+    assert 0 < decisions[-1].reset_ms <= 60000
+
+
+def test_window_is_per_identity_and_role(redis_limiter):
+    for _ in range(3):
+        redis_limiter.check('test', 1, 'student')
+    assert not redis_limiter.check('test', 1, 'student').allowed
+    assert redis_limiter.check('test', 2, 'student').allowed
+    assert redis_limiter.check('test', 3, 'teacher').limit == 5
+
+
+def test_old_requests_leave_the_window(redis_limiter):
+    for _ in range(3):
+        redis_limiter.check('test', 1, 'student')
+    key = 'rate_limit:test:1'
+    # Age every recorded request past the 60 s window
+    aged = {member: score - 61000 for member, score in redis_limiter.redis.zrange(key, 0, -1, withscores=True)}
+    redis_limiter.redis.zadd(key, aged)
+    decision = redis_limiter.check('test', 1, 'student')
+    assert decision.allowed and decision.remaining == 2
+
+
+@pytest.mark.parametrize('error', [
+    redis.ConnectionError('refused'),
+    redis.TimeoutError('timed out'),
+    redis.ResponseError("READONLY You can't write against a read only replica."),
+    redis.ResponseError('NOSCRIPT No matching script.'),
+])
+def test_redis_errors_fall_back_to_local_windows(app, error):
+    client = FailingRedis(error)
+    limiter = SlidingWindowLimiter(client, LIMITS)
+    decisions = [limiter.check('test', 1, 'student') for _ in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert {d.backend for d in decisions} == {'local'}
+    # Redis is not retried until REDIS_RETRY_SECONDS have passed
+    assert client.calls == 1
+
+
+def test_local_window_expires(app):
+    limiter = SlidingWindowLimiter(None, LIMITS)
+    assert limiter._check_local('k', 1, 50).allowed
+    assert not limiter._check_local('k', 1, 50).allowed
+    limiter._local['k'][0] -= 100
+    assert limiter._check_local('k', 1, 50).allowed
+
+
+def test_decorator_headers_and_429(app, redis_limiter, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'limiter', redis_limiter)
+
+    @app.route('/limited')
+    @rate_limit('test', body={'message': 'slow down', 'response': 'Take a breath.'})
+    def limited():
+        return {'ok': True}, 201
+
+    client = app.test_client()
+    for remaining in (4, 3, 2, 1, 0):
+        response = client.get('/limited')
+        assert response.status_code == 201
+        assert response.headers['X-RateLimit-Limit'] == '5'
+        assert response.headers['X-RateLimit-Remaining'] == str(remaining)
+        assert 0 < int(response.headers['X-RateLimit-Reset']) <= 60
+
+    blocked = client.get('/limited')
+    assert blocked.status_code == 429
+    assert blocked.get_json() == {'message': 'slow down', 'response': 'Take a breath.'}
+    assert blocked.headers['Retry-After'] == blocked.headers['X-RateLimit-Reset']
+    assert blocked.headers['X-RateLimit-Remaining'] == '0'
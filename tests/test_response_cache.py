@@ -0,0 +1,113 @@
+import pytest
+
+from utils import response_cache
+from utils.response_cache import SemanticResponseCache, normalize_message, simhash
+
+MESSAGE = "i feel anxious about my exams tomorrow morning"
+REPLY = {'response': 'Exams can feel huge. What part worries you most?', 'crisis_detected': False}
+
+
+@pytest.fixture
+def cache():
+    fakeredis = pytest.importorskip('fakeredis')
+    return SemanticResponseCache(fakeredis.FakeRedis(), similarity=0.9)
+
+
+def distance(a, b):
+    return bin(simhash(normalize_message(a)) ^ simhash(normalize_message(b))).count('1')
+
+
+@pytest.mark.parametrize('message, tokens', [
+    ("I'm feeling SO anxious!!", ['i', 'am', 'feeling', 'anxious']),
+    ("im feelin anxious", ['i', 'am', 'feeling', 'anxious']),
+    ("I can’t sleep, yaar", ['i', 'can', 'not', 'sleep']),
+    ("mujhe neend nhi aati", ['mujhe', 'neend', 'nahi', 'aati']),
+    ("um... the", []),
+    (None, []),
+])
+def test_normalize_message(message, tokens):
+    assert normalize_message(message) == tokens
+
+
+def test_normalised_variants_hit_exactly(cache):
+    cache.set(MESSAGE, REPLY, 'advice')
+    assert cache.get("I feel SO anxious about my exams tomorrow morning!!") == (REPLY, 'hit')
+
+
+def test_paraphrase_is_a_near_hit(cache):
+    paraphrase = "honestly i feel anxious about my exams tomorrow morning"
+    assert 0 < distance(MESSAGE, paraphrase) <= cache.max_distance
+    cache.set(MESSAGE, REPLY, 'advice')
+    assert cache.get(paraphrase) == (REPLY, 'near_hit')
+
+
+@pytest.mark.parametrize('message', [
+    "i feel happy about my holidays tomorrow morning",
+    "i am feeling anxious about my exams tomorrow morning",
+])
+def test_different_messages_miss(cache, message):
+    assert distance(MESSAGE, message) > cache.max_distance
+    cache.set(MESSAGE, REPLY, 'advice')
+    assert cache.get(message) == (None, 'miss')
+
+
+def test_negated_message_misses_within_distance(cache):
+    message = "i have been sleeping well since the exams ended last week"
+    negated = "i have not been sleeping well since the exams ended last week"
+    # Close enough to be a candidate; only the polarity guard keeps them apart
+    assert distance(message, negated) <= cache.max_distance
+    cache.set(message, REPLY, 'reflection')
+    assert cache.get(negated) == (None, 'miss')
+    cache.set(negated, {'response': 'That sounds exhausting.'}, 'reflection')
+    assert cache.get(message) == (REPLY, 'hit')
+
+
+def test_short_messages_only_hit_exactly(cache):
+    cache.set("feeling low", REPLY, 'casual_chat')
+    assert cache.get("Feeling so low") == (REPLY, 'hit')
+    assert cache.get("feeling low today") == (None, 'miss')
+
+
+@pytest.mark.parametrize('intent_type, ttl', [
+    ('casual_chat', 3600),
+    ('grounding', 1800),
+    ('reassurance', 900),
+    ('venting', 600),
+    ('unknown', response_cache.DEFAULT_TTL),
+    (None, response_cache.DEFAULT_TTL),
+])
+def test_entries_expire_per_intent(cache, intent_type, ttl):
+    cache.set(MESSAGE, REPLY, intent_type)
+    [entry_key] = cache.redis.keys(response_cache.ENTRY_PREFIX + '*')
+    assert ttl - 5 < cache.redis.ttl(entry_key) <= ttl
+    band_keys = cache.redis.keys(response_cache.BAND_PREFIX + '*')
+    assert len(band_keys) == response_cache.BANDS
+    assert all(cache.redis.ttl(key) == max(response_cache.INTENT_TTLS.values()) for key in band_keys)
+
+
+def test_crisis_replies_are_never_stored_or_served(cache):
+    cache.set(MESSAGE, {'response': 'Please reach out', 'crisis_detected': True}, 'venting')
+    assert cache.redis.keys('*') == []
+
+    cache.set(MESSAGE, REPLY, 'venting')
+    cache.invalidate("I feel anxious about my exams tomorrow morning")
+    assert cache.get(MESSAGE) == (None, 'miss')
+
+
+def test_expired_entry_is_dropped_from_bands(cache):
+    cache.set(MESSAGE, REPLY, 'advice')
+    cache.redis.delete(*cache.redis.keys(response_cache.ENTRY_PREFIX + '*'))
+    assert cache.get("honestly i feel anxious about my exams tomorrow morning") == (None, 'miss')
+    assert cache.redis.keys(response_cache.BAND_PREFIX + '*') == []
+
+
+def test_stats(cache):
+    cache.set(MESSAGE, REPLY, 'advice')
+    cache.get(MESSAGE)
+    cache.get("honestly i feel anxious about my exams tomorrow morning")
+    cache.get("something else entirely happened today")
+    cache.record_bypass()
+    assert cache.stats() == {
+        'hit': 1, 'near_hit': 1, 'miss': 1, 'bypass': 1,
+        'hit_rate': 0.6667, 'ollama_calls_saved': 4,
+    }
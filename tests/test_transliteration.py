@@ -0,0 +1,35 @@
+import pytest
+
+from utils.transliteration import transliterate, is_hindi_sentence
+
+
+@pytest.mark.parametrize('reply', [
+    "The main thing is to keep a log of your mood.",
+    "A yoga mat and ten minutes a day can help.",
+    "Omega-3 rich food may help your mood.",
+    "I hear you. Take a deep breath, and let's go one step at a time.",
+    "Your mere presence here matters. Do you have a plan for the day?",
+    "How are you feeling today? Who do you talk to when things get hard?",
+])
+def test_english_replies_are_untouched(reply):
+    assert transliterate(reply) == reply
+
+
+def test_hinglish_sentences_are_transliterated():
+    assert transliterate("Main samajh sakti hoon, thoda aaram karo.") == "मैं समझ सकती हूँ, थोड़ा आराम करो."
+    assert transliterate("Hi, kaise ho? Main theek hoon yaar") == "Hi, कैसे हो? मैं ठीक हूँ यार"
+
+
+def test_mixed_reply_only_rewrites_hindi_sentences():
+    reply = "The main thing is to rest. Aap akele nahi hain."
+    assert transliterate(reply) == "The main thing is to rest. आप अकेले नहीं हैं."
+
+
+def test_english_words_inside_hindi_sentence_are_kept():
+    assert transliterate("Aap kaise feel kar rahe ho aaj?") == "आप कैसे feel कर रहे हो आज?"
+
+
+def test_hindi_sentence_needs_half_unambiguous_hindi_words():
+    assert is_hindi_sentence("kya hua yaar")
+    assert not is_hindi_sentence("keep a log on the main tab")
+    assert not is_hindi_sentence("12345")
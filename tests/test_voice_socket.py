@@ -0,0 +1,29 @@
+from types import SimpleNamespace
+
+import pytest
+
+from api import voice_socket
+
+
+@pytest.fixture
+def emitted(monkeypatch):
+    events = []
+    monkeypatch.setattr(voice_socket, 'emit', lambda event, data: events.append((event, data)))
+    return events
+
+
+@pytest.mark.parametrize('data, seq', [
+    ({'seq': 0}, 0),
+    ({'seq': 12}, 12),
+    ({}, 3),
+    (None, 3),
+])
+def test_frame_seq(emitted, data, seq):
+    assert voice_socket._frame_seq(SimpleNamespace(next_seq=3), data) == seq
+    assert emitted == []
+
+
+@pytest.mark.parametrize('seq', ['1', 'abc', 1.5, None, True, -1, [1], {'n': 1}])
+def test_malformed_seq_is_an_stt_error(emitted, seq):
+    assert voice_socket._frame_seq(SimpleNamespace(next_seq=3), {'seq': seq}) is None
+    assert [event for event, _ in emitted] == ['stt_error']
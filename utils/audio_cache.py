@@ -0,0 +1,162 @@
+"""
+Content-addressed store for synthesised speech.
+
+Audio is filed under sha256(voice, language code, cleaned text), so the same reply in
+the same voice is synthesised once and then served from disk:
+
+    path = synthesize_cached(clean_text, 'hi-IN', backend)   # <AUDIO_CACHE_DIR>/<key>.wav
+
+- Files are written to a temp name and renamed into place, so a reader never sees a
+  partial file; concurrent misses for one key in a process synthesise once.
+- The directory is an LRU bounded by AUDIO_CACHE_MAX_MB: a hit refreshes the file's
+  mtime and each write evicts the least recently used files over the budget.
+- /audio/<key>.wav is immutable, so the key doubles as its ETag; audio_response()
+  answers If-None-Match with 304 and Range with 206 for seeking players.
+
+start_prewarm() synthesises the fixed replies (crisis message, keyword fallbacks) in
+a background thread when the web server starts (app.start_background_services), so the
+most common audio never waits on the TTS API.
+The store lives on local disk: each host warms and fills its own.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import defaultdict
+
+AUDIO_CACHE_DIR = os.environ.get('AUDIO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'mindcare_tts'))
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get('AUDIO_CACHE_MAX_MB', 256)) * 1024 * 1024
+AUDIO_MAX_AGE = 365 * 24 * 3600
+AUDIO_FILENAME_RE = re.compile(r'^[0-9a-f]{64}\.wav$')
+
+_key_locks = defaultdict(threading.Lock)
+_key_locks_guard = threading.Lock()
+_evict_lock = threading.Lock()
+
+
+def audio_key(text, language_code, voice):
+    return hashlib.sha256(f"{voice}\0{language_code}\0{text}".encode('utf-8')).hexdigest()
+
+
+def audio_path(key):
+    return os.path.join(AUDIO_CACHE_DIR, f"{key}.wav")
+
+
+def lookup(key):
+    """Path of the cached audio for key (marking it recently used), or None"""
+    path = audio_path(key)
+    try:
+        os.utime(path)
+        return path
+    except OSError:
+        return None
+
+
+def store(key, data):
+    """Write audio for key atomically and evict over budget"""
+    os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=AUDIO_CACHE_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, audio_path(key))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    evict()
+    return audio_path(key)
+
+
+def audio_response(filename):
+    """send_file response for /audio/<filename> (304 / 206 aware), or None if there is no such audio"""
+    from flask import send_file
+    if not AUDIO_FILENAME_RE.match(filename):
+        return None
+    key = filename[:-len('.wav')]
+    if not lookup(key):
+        return None
+    # Content-addressed, so the key is a strong ETag and the file never changes
+    response = send_file(audio_path(key), mimetype='audio/wav', conditional=True, etag=key, max_age=AUDIO_MAX_AGE)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+
+def evict(max_bytes=None):
+    """Delete least recently used files until the store fits in max_bytes"""
+    max_bytes = AUDIO_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        files = []
+        for entry in os.scandir(AUDIO_CACHE_DIR):
+            if entry.name.endswith('.wav'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+    return total
+
+
+def _key_lock(key):
+    with _key_locks_guard:
+        return _key_locks[key]
+
+
+def synthesize_cached(text, language_code, backend):
+    """Path of the audio for text in backend's voice, synthesising it on a miss"""
+    key = audio_key(text, language_code, backend.voice)
+    path = lookup(key)
+    if path:
+        return path
+    lock = _key_lock(key)
+    with lock:
+        path = lookup(key)
+        if not path:
+            path = store(key, backend.synthesize(text, language_code))
+    with _key_locks_guard:
+        if _key_locks.get(key) is lock and not lock.locked():
+            del _key_locks[key]
+    return path
+
+
+def prewarm_texts():
+    """Replies sent verbatim often enough to keep their audio ready"""
+    from api.chatbot_api import CRISIS_REPLY, DEFAULT_BOT_MESSAGE, CHAT_RATE_LIMITED, FALLBACK_REPLIES
+    return [CRISIS_REPLY, DEFAULT_BOT_MESSAGE, CHAT_RATE_LIMITED['response'], *FALLBACK_REPLIES.values()]
+
+
+def prewarm(texts=None):
+    """Synthesise any of texts (default: prewarm_texts()) not yet in the store"""
+    try:
+        from sarvam_voice_service import sarvam_voice_service
+    except Exception as e:
+        logging.warning(f"⚠️ Skipping TTS pre-warm, voice service unavailable: {e}")
+        return 0
+    warmed = 0
+    for text in texts or prewarm_texts():
+        if sarvam_voice_service.text_to_speech(text):
+            warmed += 1
+    logging.info(f"🔊 TTS cache pre-warmed: {warmed} replies ready")
+    return warmed
+
+
+def start_prewarm():
+    """Pre-warm in the background (AUDIO_PREWARM=false to skip)"""
+    if os.environ.get('AUDIO_PREWARM', 'true').lower() != 'true':
+        return None
+    thread = threading.Thread(target=prewarm, name='tts-prewarm', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,79 @@
+"""
+Batched loading for views that assemble many independent pieces.
+
+BatchLoader collects (model, id) keys first and fetches each model's pending ids with
+one IN query the first time any of them is read, DataLoader-style:
+
+    loader = BatchLoader()
+    for doc in attachments:
+        loader.queue(ATTACHMENT_MODELS[doc['type']], doc['id'])
+    assessment = loader.get(Assessment, 42)   # one query for every queued Assessment
+
+A loader lives for one build of a view; rows are only as fresh as that build.
+
+run_sections() runs independent query sections on a small shared thread pool. Each
+section gets its own app context, and so its own session, which is removed when the
+section finishes; sections must return plain data, not ORM objects.
+"""
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from database import db
+
+SECTION_WORKERS = int(os.environ.get('SECTION_WORKERS', 4))
+
+_pool = ThreadPoolExecutor(max_workers=SECTION_WORKERS, thread_name_prefix='sections')
+
+
+class BatchLoader:
+    def __init__(self, session=None):
+        self.session = session or db.session
+        self._pending = defaultdict(set)
+        self._loaded = defaultdict(dict)
+
+    def queue(self, model, ids):
+        """Mark ids (one or many) to be fetched with the model's next batch"""
+        ids = ids if isinstance(ids, (list, tuple, set)) else [ids]
+        self._pending[model].update(i for i in ids if i is not None and i not in self._loaded[model])
+
+    def _fetch(self, model):
+        ids = self._pending.pop(model, None)
+        if not ids:
+            return
+        rows = self.session.query(model).filter(model.id.in_(ids)).all()
+        loaded = self._loaded[model]
+        loaded.update({row.id: row for row in rows})
+        for missing in ids - loaded.keys():
+            loaded[missing] = None
+
+    def get(self, model, id):
+        """Row for id (None if it does not exist), queued or not"""
+        if id is None:
+            return None
+        if id not in self._loaded[model]:
+            self.queue(model, id)
+            self._fetch(model)
+        return self._loaded[model][id]
+
+    def get_many(self, model, ids):
+        self.queue(model, ids)
+        self._fetch(model)
+        return {i: self._loaded[model][i] for i in ids if self._loaded[model].get(i) is not None}
+
+
+def _run_in_app_context(app, fn):
+    with app.app_context():
+        try:
+            return fn()
+        finally:
+            db.session.remove()
+
+
+def run_sections(sections):
+    """{name: fn} -> {name: fn()}, the sections running concurrently"""
+    app = current_app._get_current_object()
+    futures = {name: _pool.submit(_run_in_app_context, app, fn) for name, fn in sections.items()}
+    return {name: future.result() for name, future in futures.items()}
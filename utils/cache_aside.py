@@ -0,0 +1,137 @@
+"""
+Cache-aside for expensive per-user views (dashboards, insights) with stampede protection.
+
+    summary = cached_value(f"dashboard:v2:{user.id}", lambda: get_dashboard_summary(user), ttl=600,
+                           refresh=lambda: precalculate_dashboard_task.delay(user.id))
+
+- Single flight: on a miss only the caller holding `<key>:lock` computes; the others
+  poll briefly for its result instead of hitting the database too.
+- Jittered TTL: each entry's freshness is ttl +/- jitter, so keys written together
+  (a mentor opening a whole roster) do not expire together.
+- XFetch: while still fresh, a read refreshes early with probability rising as expiry
+  nears, scaled by how long the value took to compute (beta * delta * -ln(rand)).
+- Stale-while-revalidate: after expiry the entry is kept for stale_ttl (default: ttl);
+  one caller refreshes (through `refresh`, e.g. a Celery task that calls store_value,
+  or inline) while everyone else keeps getting the stale value.
+
+Entries are JSON envelopes {value, delta, expiry} in the cache Redis (db 2). If Redis is
+unavailable the value is computed directly.
+
+Caches that fan out over many keys (a feed cached per viewer) embed tag versions in
+their keys with tagged_key(); bump_tags() then retires every such key at once without
+scanning for them, and the old entries age out through their TTL.
+"""
+import json
+import math
+import random
+import time
+
+import redis
+from flask import current_app
+
+from database import r_cache
+
+DEFAULT_JITTER = 0.1
+DEFAULT_BETA = 1.0
+LOCK_TIMEOUT_MS = 30000
+MISS_WAIT_SECONDS = 3.0
+MISS_POLL_SECONDS = 0.05
+
+
+def _lock_key(key):
+    return f"{key}:lock"
+
+
+def store_value(key, value, ttl, compute_time=0.0, stale_ttl=None, jitter=DEFAULT_JITTER, client=None):
+    """Write a fresh entry (and release the refresh lock)"""
+    client = client or r_cache
+    fresh_for = ttl * random.uniform(1 - jitter, 1 + jitter)
+    envelope = {'value': value, 'delta': compute_time, 'expiry': time.time() + fresh_for}
+    keep_for = fresh_for + (ttl if stale_ttl is None else stale_ttl)
+    pipe = client.pipeline(transaction=False)
+    pipe.set(key, json.dumps(envelope), px=int(keep_for * 1000))
+    pipe.delete(_lock_key(key))
+    pipe.execute()
+
+
+def invalidate(key, client=None):
+    (client or r_cache).delete(key)
+
+
+def tagged_key(key, *tags, client=None):
+    """key suffixed with the current version of each tag"""
+    versions = (client or r_cache).mget([f"cache_tag:{tag}" for tag in tags])
+    return key + ''.join(f":{int(v or 0)}" for v in versions)
+
+
+def bump_tags(*tags, client=None):
+    pipe = (client or r_cache).pipeline(transaction=False)
+    for tag in tags:
+        pipe.incr(f"cache_tag:{tag}")
+    pipe.execute()
+
+
+def claim_refresh(key, client=None):
+    """Take the refresh lock for key, e.g. before queueing a task that ends in store_value()"""
+    return _acquire(client or r_cache, key)
+
+
+def _acquire(client, key):
+    return bool(client.set(_lock_key(key), 1, nx=True, px=LOCK_TIMEOUT_MS))
+
+
+def _compute_and_store(client, key, compute, ttl, stale_ttl, jitter):
+    start = time.perf_counter()
+    try:
+        value = compute()
+    except Exception:
+        client.delete(_lock_key(key))
+        raise
+    try:
+        store_value(key, value, ttl, time.perf_counter() - start, stale_ttl, jitter, client)
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        current_app.logger.warning(f"⚠️ Could not cache {key}: {e}")
+    return value
+
+
+def _needs_refresh(envelope, beta):
+    now = time.time()
+    if now >= envelope['expiry']:
+        return True
+    # XFetch: -ln(rand) is exponential, so early refreshes cluster just before expiry
+    return now - envelope['delta'] * beta * math.log(random.random() or 1e-12) >= envelope['expiry']
+
+
+def cached_value(key, compute, ttl, stale_ttl=None, refresh=None, beta=DEFAULT_BETA, jitter=DEFAULT_JITTER, client=None):
+    """
+    Cached result of compute() under key. `refresh`, if given, is called instead of
+    compute() to regenerate a stale entry in the background; it must end in store_value().
+    """
+    client = client or r_cache
+    try:
+        raw = client.get(key)
+        if raw is not None:
+            envelope = json.loads(raw)
+            if _needs_refresh(envelope, beta) and _acquire(client, key):
+                if refresh is None:
+                    return _compute_and_store(client, key, compute, ttl, stale_ttl, jitter)
+                try:
+                    refresh()
+                except Exception as e:
+                    client.delete(_lock_key(key))
+                    current_app.logger.warning(f"⚠️ Background refresh for {key} failed to start: {e}")
+            return envelope['value']
+
+        if _acquire(client, key):
+            return _compute_and_store(client, key, compute, ttl, stale_ttl, jitter)
+
+        # Someone else is computing it: wait for their result rather than stampeding the database
+        deadline = time.monotonic() + MISS_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(MISS_POLL_SECONDS)
+            raw = client.get(key)
+            if raw is not None:
+                return json.loads(raw)['value']
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        current_app.logger.warning(f"⚠️ Cache unavailable for {key}, computing directly: {e}")
+    return compute()
@@ -0,0 +1,179 @@
+"""
+Domain events for cache invalidation.
+
+Rows added, changed or deleted through the ORM are turned into events such as
+`assessment.created`, `meditation.completed` or `venting.post_liked` when the session
+flushes (after_flush, see MODEL_EVENTS), carrying the user's organization_id. They are held on the session and published
+to the CHANNEL pub/sub channel only once the transaction commits, so a cache is never
+dropped for a write that rolls back, and never dropped before the write is visible.
+Core bulk writes (the chat write-behind flusher) add theirs with queue_events().
+
+Cache owners subscribe where the cache lives:
+
+    @on_event('assessment.*', 'consultation.*')
+    def _expire_patient(event):
+        bump_tags(f"patient:{event['user_id']}")
+
+Every web process runs one listener thread (start_listener, started by the server entry
+point through app.start_background_services) that hands each event to
+the matching handlers, inside an app context when one was given. Handlers must be
+idempotent and cheap (delete a key, bump a tag version, re-read one row), since every
+process that subscribes runs them. Pub/sub does not keep events
+for disconnected listeners, so TTLs remain the backstop; they can be long.
+"""
+import fnmatch
+import json
+import logging
+import threading
+import time
+
+import redis
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from database import db, r_cache
+from db_models import (User, Assessment, MeditationSession, RoutineTask, VentingPost, VentingResponse,
+                       VentingPostLike, CrisisAlert, ConsultationRequest, UserActivityLog, InkblotResult)
+
+CHANNEL = 'cache_events'
+PENDING_KEY = 'cache_events_pending'
+
+# model -> ({change: event name}, payload attributes)
+MODEL_EVENTS = {
+    Assessment: ({'created': 'assessment.created'}, ('user_id',)),
+    MeditationSession: ({'created': 'meditation.completed'}, ('user_id',)),
+    RoutineTask: ({'created': 'routine_task.created', 'updated': 'routine_task.updated',
+                   'deleted': 'routine_task.deleted'}, ('user_id',)),
+    VentingPost: ({'created': 'venting.post_created', 'updated': 'venting.post_updated',
+                   'deleted': 'venting.post_deleted'}, ('user_id',)),
+    VentingResponse: ({'created': 'venting.response_created', 'deleted': 'venting.response_deleted'}, ('user_id', 'post_id')),
+    VentingPostLike: ({'created': 'venting.post_liked', 'deleted': 'venting.post_unliked'}, ('user_id', 'post_id')),
+    CrisisAlert: ({'created': 'crisis_alert.created', 'updated': 'crisis_alert.updated'}, ('user_id',)),
+    ConsultationRequest: ({'created': 'consultation.created', 'updated': 'consultation.updated'}, ('user_id', 'counsellor_id')),
+    UserActivityLog: ({'created': 'activity.logged'}, ('user_id',)),
+    InkblotResult: ({'created': 'inkblot.completed'}, ('user_id',)),
+    User: ({'created': 'user.created', 'updated': 'user.updated'}, ()),
+}
+
+_handlers = []
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def domain_event(name, **payload):
+    return {'event': name, **payload}
+
+
+def _event_for(obj, change):
+    spec = MODEL_EVENTS.get(type(obj))
+    if not spec or change not in spec[0]:
+        return None
+    names, attributes = spec
+    payload = {attr: getattr(obj, attr) for attr in attributes}
+    if isinstance(obj, User):
+        payload['user_id'] = obj.id
+    return domain_event(names[change], id=obj.id, **payload)
+
+
+def queue_events(session, events):
+    """Publish events when the session's transaction commits"""
+    _add_organizations(session, [ev for ev in events if 'organization_id' not in ev])
+    session.info.setdefault(PENDING_KEY, []).extend(events)
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_events_after_flush(session, flush_context):
+    # new/dirty/deleted still describe what this flush wrote
+    changes = [(obj, 'created') for obj in session.new]
+    changes += [(obj, 'updated') for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    changes += [(obj, 'deleted') for obj in session.deleted]
+    events = [ev for ev in (_event_for(obj, change) for obj, change in changes) if ev]
+    if events:
+        queue_events(session, events)
+
+
+def _add_organizations(session, events):
+    """Tag events with the user's organization_id so org-wide caches can be retired"""
+    user_ids = {ev['user_id'] for ev in events if ev.get('user_id')}
+    if not user_ids:
+        return
+    # Core execute on the flush's connection: no autoflush inside the flush
+    orgs = dict(session.connection().execute(
+        select(User.id, User.organization_id).where(User.id.in_(user_ids))
+    ).all())
+    for ev in events:
+        ev['organization_id'] = orgs.get(ev.get('user_id'))
+
+
+@event.listens_for(Session, 'after_commit')
+def publish_events_after_commit(session):
+    events = session.info.pop(PENDING_KEY, None)
+    if events:
+        publish(events)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_events_after_rollback(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+def publish(events, client=None):
+    """One message per commit; a failed publish only leaves caches to their TTLs"""
+    try:
+        (client or r_cache).publish(CHANNEL, json.dumps(events, default=str))
+    except redis.RedisError as e:
+        logging.warning(f"⚠️ Could not publish {len(events)} cache events: {e}")
+
+
+def on_event(*patterns):
+    """Register a handler for events matching any of the patterns ('venting.*')"""
+    def register(handler):
+        _handlers.append((patterns, handler))
+        return handler
+    return register
+
+
+def dispatch(events):
+    for ev in events:
+        for patterns, handler in _handlers:
+            if any(fnmatch.fnmatchcase(ev['event'], p) for p in patterns):
+                try:
+                    handler(ev)
+                except Exception as e:
+                    logging.error(f"❌ Cache event handler {handler.__name__} failed for {ev['event']}: {e}")
+
+
+def _dispatch_message(app, data):
+    if app is None:
+        return dispatch(json.loads(data))
+    with app.app_context():
+        try:
+            dispatch(json.loads(data))
+        finally:
+            db.session.remove()
+
+
+def _listen(client, app=None):
+    backoff = 1
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            backoff = 1
+            for message in pubsub.listen():
+                if message['type'] == 'message':
+                    _dispatch_message(app, message['data'])
+        except redis.RedisError as e:
+            logging.warning(f"⚠️ Cache event listener lost Redis ({e}), retrying in {backoff}s")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+def start_listener(app=None, client=None):
+    """Start this process's listener thread (once); handlers run in app's context"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen, args=(client or r_cache, app), name='cache-events', daemon=True)
+            _listener.start()
+    return _listener
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 import os
 
 def make_celery(app_name=__name__):
@@ -9,6 +10,9 @@ def make_celery(app_name=__name__):
         backend=redis_url,
         include=[
             'api.chatbot_api', 
+            'utils.chat_writer',  # Write-behind chat message/intent flusher
+            'utils.like_store',  # Write-behind venting like flusher
+            'utils.rollups',  # Nightly daily_user_activity / daily_org_emotions rollup
             'api.assessments_api', 
             'utils.common', 
             'api.dashboard_api',
@@ -29,5 +33,12 @@ celery.conf.update(
     broker_connection_retry_on_startup=True,
     task_always_eager=False,  # Ensure async execution
     task_ignore_result=True,   # Fire and forget (don't wait for result backend)
-    broker_transport_options={'visibility_timeout': 3600}
+    broker_transport_options={'visibility_timeout': 3600},
+    # Periodic tasks need a beat process: celery -A utils.celery_app.celery beat
+    beat_schedule={
+        'rollup-previous-day': {
+            'task': 'utils.rollups.rollup_previous_day',
+            'schedule': crontab(hour=0, minute=15),
+        },
+    }
 )
@@ -0,0 +1,251 @@
+"""
+Write-behind persistence for ChatMessage / ChatIntent rows.
+
+A chat turn collects its rows in a ChatWriteBuffer and hands them to a Redis stream
+in one script call at the end of the request. flush_chat_writes (Celery) drains the
+stream with one bulk INSERT per table and one commit per CHAT_WRITE_BATCH_ROWS rows.
+The script schedules at most one flush per CHAT_WRITE_FLUSH_MS, plus an immediate one
+once the stream holds CHAT_WRITE_BATCH_ROWS rows, so the broker sees a few tasks per
+second instead of three or four per message.
+
+Core inserts bypass the ORM hooks, so insert_rows() folds intents into the risk
+snapshots and daily_org_emotions and queues their chat_intent.created cache events
+itself.
+
+Crisis turns never wait on the buffer: write_to_session() puts the turn's rows in the
+same synchronous transaction as the ChatIntent and CrisisAlert. If Redis is unavailable
+the rows are inserted synchronously too. Delivery is at-least-once: a flusher that
+dies between commit and XDEL replays those rows.
+
+A batch the database rejects is retried row by row; rows that still fail go to the
+DEAD_LETTER_KEY stream (row + error) so one bad row cannot block the stream. Connection
+errors are not the rows' fault: the batch stays in the stream and the flush is retried
+after CHAT_WRITE_RETRY_S.
+"""
+import json
+import os
+import uuid
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, OperationalError, InterfaceError
+
+from database import db, r_context
+from db_models import ChatMessage, ChatIntent, ChatSession
+from utils.celery_app import celery
+from utils.risk_snapshot import SnapshotEvent, apply_events
+from utils.cache_events import domain_event, queue_events
+from utils.rollups import record_intents
+
+STREAM_KEY = 'chat_writes'
+SCHEDULED_KEY = 'chat_writes:scheduled'
+FLUSH_NOW_KEY = 'chat_writes:flush_now'
+LOCK_KEY = 'chat_writes:lock'
+DEAD_LETTER_KEY = 'chat_writes:dead'
+DEAD_LETTER_MAXLEN = int(os.environ.get('CHAT_WRITE_DEAD_LETTER_MAXLEN', 10000))
+BATCH_ROWS = int(os.environ.get('CHAT_WRITE_BATCH_ROWS', 200))
+FLUSH_INTERVAL_MS = int(os.environ.get('CHAT_WRITE_FLUSH_MS', 1000))
+RETRY_SECONDS = int(os.environ.get('CHAT_WRITE_RETRY_S', 5))
+
+# KEYS: stream, scheduled marker, flush-now marker  ARGV: batch_rows, interval_ms, row...
+# Returns 2 = flush now, 1 = flush after the interval, 0 = a flush is already pending
+ENQUEUE_LUA = """
+for i = 3, #ARGV do
+    redis.call('XADD', KEYS[1], '*', 'row', ARGV[i])
+end
+if redis.call('XLEN', KEYS[1]) >= tonumber(ARGV[1]) and redis.call('SET', KEYS[3], 1, 'NX', 'PX', ARGV[2]) then
+    return 2
+end
+if redis.call('SET', KEYS[2], 1, 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+_enqueue_script = r_context.register_script(ENQUEUE_LUA) if r_context else None
+
+
+def message_values(row):
+    return {
+        'session_id': row['session_id'],
+        'message_type': row['message_type'],
+        'content': row['content'],
+        'crisis_keywords': row.get('crisis_keywords'),
+        'timestamp': datetime.fromisoformat(row['timestamp']),
+    }
+
+
+def intent_values(row):
+    intent_data = row['intent_data'] or {}
+    return {
+        'session_id': row['session_id'],
+        'user_id': row['user_id'],
+        'user_message': row['user_message'],
+        'intent_data': intent_data,
+        'emotional_state': intent_data.get('emotional_state'),
+        'intent_type': intent_data.get('intent_type'),
+        'emotional_intensity': intent_data.get('emotional_intensity'),
+        'cognitive_load': intent_data.get('cognitive_load'),
+        'help_receptivity': intent_data.get('help_receptivity'),
+        'self_harm_crisis': row.get('crisis_detected', False),
+        'suggested_feature': row.get('suggested_feature'),
+        'suggested_assessment': row.get('suggested_assessment'),
+        'timestamp': datetime.fromisoformat(row['timestamp']),
+    }
+
+
+def crisis_session_ids(rows):
+    return {row['session_id'] for row in rows if row['kind'] == 'message' and row.get('crisis_detected')}
+
+
+def insert_rows(rows):
+    """Bulk insert buffered rows in one transaction (messages first, so ids follow turn order)"""
+    messages = [message_values(row) for row in rows if row['kind'] == 'message']
+    intents = [intent_values(row) for row in rows if row['kind'] == 'intent']
+    if messages:
+        db.session.execute(insert(ChatMessage), messages)
+    if intents:
+        db.session.execute(insert(ChatIntent), intents)
+        # Core inserts skip the ORM flush hook, so fold them into the risk snapshots here
+        apply_events(db.session, [
+            SnapshotEvent(i['user_id'], 'intent', i['timestamp'],
+                          {'emotional_state': i['emotional_state'], 'emotional_intensity': i['emotional_intensity']})
+            for i in intents
+        ])
+        queue_events(db.session, [domain_event('chat_intent.created', user_id=uid) for uid in {i['user_id'] for i in intents}])
+        record_intents(db.session, intents)
+    crisis_sessions = crisis_session_ids(rows)
+    if crisis_sessions:
+        ChatSession.query.filter(ChatSession.id.in_(crisis_sessions)).update({'crisis_flag': True}, synchronize_session=False)
+    db.session.commit()
+
+
+def database_unavailable(error):
+    """True when the failure is the connection, not the rows"""
+    return isinstance(error, (OperationalError, InterfaceError)) or getattr(error, 'connection_invalidated', False)
+
+
+def dead_letter(row, error):
+    r_context.xadd(DEAD_LETTER_KEY, {'row': json.dumps(row), 'error': str(error)[:1000]},
+                   maxlen=DEAD_LETTER_MAXLEN, approximate=True)
+
+
+def insert_rows_individually(rows):
+    """Slow path after a failed bulk insert: keep every row that can still be written, dead-letter the rest"""
+    saved = 0
+    for row in rows:
+        try:
+            insert_rows([row])
+            saved += 1
+        except Exception as e:
+            db.session.rollback()
+            if database_unavailable(e):
+                raise
+            dead_letter(row, e)
+            print(f"⚠️ Moved buffered {row.get('kind')} for session {row.get('session_id')} to {DEAD_LETTER_KEY}: {e}")
+    return saved
+
+
+class ChatWriteBuffer:
+    """Rows produced by one chat turn"""
+
+    def __init__(self):
+        self.rows = []
+
+    def add_message(self, session_id, message_type, content, crisis_detected=False, crisis_keywords=None):
+        self.rows.append({
+            'kind': 'message', 'session_id': session_id, 'message_type': message_type, 'content': content,
+            'crisis_detected': crisis_detected and message_type == 'bot', 'crisis_keywords': crisis_keywords,
+            'timestamp': datetime.utcnow().isoformat(),
+        })
+
+    def add_intent(self, session_id, user_id, user_message, intent_data, suggested_feature, suggested_assessment, crisis_detected=False):
+        self.rows.append({
+            'kind': 'intent', 'session_id': session_id, 'user_id': user_id, 'user_message': user_message,
+            'intent_data': intent_data, 'suggested_feature': suggested_feature,
+            'suggested_assessment': suggested_assessment, 'crisis_detected': crisis_detected,
+            'timestamp': datetime.utcnow().isoformat(),
+        })
+
+    def write_to_session(self):
+        """
+        Add the buffered rows to the current db.session for the crisis path. The caller
+        commits and then calls clear(); after a rollback the rows still go through flush().
+        """
+        for row in self.rows:
+            if row['kind'] == 'message':
+                db.session.add(ChatMessage(**message_values(row)))
+            else:
+                db.session.add(ChatIntent(**intent_values(row)))
+
+    def clear(self):
+        self.rows = []
+
+    def flush(self):
+        """Hand the rows to the write-behind stream (one round trip); synchronous insert if Redis is down"""
+        rows, self.rows = self.rows, []
+        if not rows:
+            return
+        try:
+            if _enqueue_script is None:
+                raise ConnectionError('Redis unavailable')
+            action = _enqueue_script(keys=[STREAM_KEY, SCHEDULED_KEY, FLUSH_NOW_KEY],
+                                     args=[BATCH_ROWS, FLUSH_INTERVAL_MS, *[json.dumps(row) for row in rows]])
+        except Exception as e:
+            current_app.logger.error(f"❌ Chat write buffer unavailable ({e}), saving {len(rows)} rows synchronously")
+            try:
+                insert_rows(rows)
+            except Exception as db_error:
+                db.session.rollback()
+                current_app.logger.error(f"❌ Failed to save chat rows: {db_error}")
+            return
+        if action:
+            try:
+                flush_chat_writes.apply_async(countdown=0 if action == 2 else FLUSH_INTERVAL_MS / 1000)
+            except Exception as e:
+                # Rows stay in the stream; the next scheduled flush picks them up
+                current_app.logger.error(f"Failed to schedule chat write flush: {e}")
+
+
+@celery.task
+def flush_chat_writes():
+    """Drain the chat write stream with bulk inserts"""
+    from app import app
+    with app.app_context():
+        token = uuid.uuid4().hex
+        if not r_context.set(LOCK_KEY, token, nx=True, ex=60):
+            # Another flusher is running; come back so rows it missed are not stranded
+            flush_chat_writes.apply_async(countdown=FLUSH_INTERVAL_MS / 1000)
+            return 0
+        total = 0
+        try:
+            # Rows added from here on schedule a new flush
+            r_context.delete(SCHEDULED_KEY, FLUSH_NOW_KEY)
+            while True:
+                entries = r_context.xrange(STREAM_KEY, count=BATCH_ROWS)
+                if not entries:
+                    break
+                rows = [json.loads(fields[b'row']) for _, fields in entries]
+                try:
+                    insert_rows(rows)
+                except Exception as e:
+                    db.session.rollback()
+                    if database_unavailable(e):
+                        raise
+                    insert_rows_individually(rows)
+                r_context.xdel(STREAM_KEY, *[entry_id for entry_id, _ in entries])
+                total += len(rows)
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Chat write flush failed after {total} rows: {e}")
+            # The scheduled marker is gone: retry, or the rows wait for the next chat message
+            try:
+                flush_chat_writes.apply_async(countdown=RETRY_SECONDS)
+            except Exception as schedule_error:
+                print(f"❌ Could not reschedule chat write flush: {schedule_error}")
+        finally:
+            if r_context.get(LOCK_KEY) == token.encode():
+                r_context.delete(LOCK_KEY)
+        if total:
+            print(f"✅ Flushed {total} buffered chat rows")
+        return total
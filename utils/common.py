@@ -680,39 +680,50 @@ def get_user_streak(r_streaks, user):
         return int(count)
     return user.login_streak or 0
 
+# Whole streak update in one atomic round trip.
+# KEYS: count, last_active  ARGV: today, yesterday, seed_last_date, seed_count (seed_* from DB, '' if none)
+# Returns {count, changed}
+STREAK_LUA = """
+local last = redis.call('GET', KEYS[2])
+if not last and ARGV[3] ~= '' then
+    last = ARGV[3]
+    redis.call('SET', KEYS[2], ARGV[3])
+    redis.call('SET', KEYS[1], ARGV[4])
+end
+if last == ARGV[1] then
+    return {tonumber(redis.call('GET', KEYS[1]) or '1'), 0}
+end
+local count = 1
+if last == ARGV[2] then
+    count = redis.call('INCR', KEYS[1])
+else
+    redis.call('SET', KEYS[1], 1)
+end
+redis.call('SET', KEYS[2], ARGV[1])
+return {count, 1}
+"""
+_streak_scripts = {}
+
 def update_user_streak(r_streaks, user):
     """Update user streak based on activity and sync to DB asynchronously"""
     user_id = user.id
-    count_key = f"streak_count:{user_id}"
-    last_key = f"streak_last_active:{user_id}"
-    
     today = datetime.utcnow().date()
-    last_active_raw = r_streaks.get(last_key)
-    
-    # If key doesn't exist in Redis, seed it from DB
-    if not last_active_raw and user.last_streak_date:
-        r_streaks.set(last_key, user.last_streak_date.strftime('%Y-%m-%d'))
-        r_streaks.set(count_key, user.login_streak)
-        last_active_raw = user.last_streak_date.strftime('%Y-%m-%d').encode()
-
-    new_count = 1
-    if last_active_raw:
-        last_active = datetime.strptime(last_active_raw.decode(), '%Y-%m-%d').date()
-        if last_active == today:
-            return int(r_streaks.get(count_key) or 1)
-        elif last_active == today - timedelta(days=1):
-            new_count = r_streaks.incr(count_key)
-        else:
-            new_count = 1
-            r_streaks.set(count_key, new_count)
-    else:
-        new_count = 1
-        r_streaks.set(count_key, new_count)
-        
-    r_streaks.set(last_key, today.strftime('%Y-%m-%d'))
-    
-    # Sync to DB in background
-    sync_streak_to_db.delay(user_id, new_count)
-    
+
+    script = _streak_scripts.get(id(r_streaks))
+    if script is None:
+        script = _streak_scripts[id(r_streaks)] = r_streaks.register_script(STREAK_LUA)
+
+    # If keys don't exist in Redis, the script seeds them from DB
+    seed_date = user.last_streak_date.strftime('%Y-%m-%d') if user.last_streak_date else ''
+    new_count, changed = script(
+        keys=[f"streak_count:{user_id}", f"streak_last_active:{user_id}"],
+        args=[today.strftime('%Y-%m-%d'), (today - timedelta(days=1)).strftime('%Y-%m-%d'),
+              seed_date, user.login_streak or 0]
+    )
+
+    if changed:
+        # Sync to DB in background
+        sync_streak_to_db.delay(user_id, new_count)
+
     return new_count
 
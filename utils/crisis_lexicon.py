@@ -0,0 +1,209 @@
+"""
+Shared crisis keyword lexicon for every chat path.
+
+All terms (English, Hinglish transliterations and Devanagari) are compiled once at
+import into a single trie-shaped regex, so screening a message is one pass over the
+text no matter how many terms the lexicon holds. Matches respect word boundaries
+("die" does not fire on "diet") and come back with their offsets. Words of a phrase may
+be separated by spaces or hyphens ("self-harm").
+
+Tiers:
+    crisis  - explicit self-harm / emergency language; the only tier that may decide a
+              message is a crisis (has_crisis_terms / matched_terms(tier=CRISIS))
+    warning - words that are only sometimes distress ("help me", "die", "kill"); bypasses
+              the response cache and is logged, but never triggers crisis handling on
+              its own. Hopelessness terms ("hopeless", "worthless", "maut") are crisis.
+"""
+import itertools
+import re
+import unicodedata
+
+CRISIS = 'crisis'
+WARNING = 'warning'
+
+# Canonical term -> tier. Tokens listed in TOKEN_VARIANTS expand to their spellings.
+CRISIS_LEXICON = {
+    # English
+    'suicide': CRISIS,
+    'suicidal': CRISIS,
+    'kill myself': CRISIS,
+    'killing myself': CRISIS,
+    'end my life': CRISIS,
+    'take my own life': CRISIS,
+    'end it all': CRISIS,
+    'want to die': CRISIS,
+    'wanna die': CRISIS,
+    'better off dead': CRISIS,
+    'no reason to live': CRISIS,
+    'not worth living': CRISIS,
+    "can't go on": CRISIS,
+    'give up': CRISIS,
+    'self harm': CRISIS,
+    'harm myself': CRISIS,
+    'hurt myself': CRISIS,
+    'cut myself': CRISIS,
+    'overdose': CRISIS,
+    'jump off': CRISIS,
+    'death wish': CRISIS,
+    'hopeless': CRISIS,
+    'worthless': CRISIS,
+    'nobody cares': CRISIS,
+    'sos': CRISIS,
+    'help me please': CRISIS,
+    'emergency': CRISIS,
+    # Hinglish (Roman script)
+    'khudkushi': CRISIS,
+    'atmahatya': CRISIS,
+    'suicide karna': CRISIS,
+    'marna': CRISIS,
+    'marna hai': CRISIS,
+    'marna chahta': CRISIS,
+    'nahi jeena': CRISIS,
+    'jeena nahi': CRISIS,
+    'mar jaunga': CRISIS,
+    'mar jaungi': CRISIS,
+    'jaan dena': CRISIS,
+    'jaan deni hai': CRISIS,
+    'khud ko khatam': CRISIS,
+    'zindagi khatam': CRISIS,
+    'maut': CRISIS,
+    # Devanagari
+    'आत्महत्या': CRISIS,
+    'खुदकुशी': CRISIS,
+    'मरना': CRISIS,
+    'मरना है': CRISIS,
+    'मर जाऊंगा': CRISIS,
+    'मर जाऊंगी': CRISIS,
+    'जीना नहीं': CRISIS,
+    'नहीं जीना': CRISIS,
+    'जान देनी है': CRISIS,
+    'खुद को खत्म': CRISIS,
+    'ज़िंदगी खत्म': CRISIS,
+    'मौत': CRISIS,
+    # Ambiguous on their own ("help me with maths", "dying to see it")
+    'kill': WARNING,
+    'die': WARNING,
+    'dying': WARNING,
+    'help me': WARNING,
+}
+
+# Common transliteration / spelling variants, applied per whitespace-separated token
+TOKEN_VARIANTS = {
+    "can't": ["can't", 'cant', 'cannot', 'can not'],
+    'wanna': ['wanna', 'wana'],
+    'khudkushi': ['khudkushi', 'khudkhushi', 'khudkashi', 'khudkusi'],
+    'atmahatya': ['atmahatya', 'aatmahatya', 'atmhatya', 'aatmhatya'],
+    'marna': ['marna', 'marnaa', 'mrna'],
+    'mar': ['mar', 'marr'],
+    'jaunga': ['jaunga', 'jaaunga', 'jaounga'],
+    'jaungi': ['jaungi', 'jaaungi', 'jaoungi'],
+    'chahta': ['chahta', 'chahti', 'chahata', 'chahati'],
+    'nahi': ['nahi', 'nahin', 'nhi', 'nai', 'nahee'],
+    'jeena': ['jeena', 'jina', 'jeenaa', 'jeene'],
+    'hai': ['hai', 'h', 'he', 'hain'],
+    'jaan': ['jaan', 'jan'],
+    'khatam': ['khatam', 'khatm', 'khtm', 'khattam'],
+    'zindagi': ['zindagi', 'jindagi', 'zindgi', 'jindgi'],
+    'maut': ['maut', 'mout'],
+    'जाऊंगा': ['जाऊंगा', 'जाऊँगा'],
+    'जाऊंगी': ['जाऊंगी', 'जाऊँगी'],
+    'खुदकुशी': ['खुदकुशी', 'ख़ुदकुशी'],
+    'खुद': ['खुद', 'ख़ुद'],
+    'ज़िंदगी': ['ज़िंदगी', 'जिंदगी', 'ज़िन्दगी', 'जिन्दगी'],
+    'खत्म': ['खत्म', 'ख़त्म'],
+    'नहीं': ['नहीं', 'नही'],
+}
+
+# Letters, digits and Devanagari (including matras, which \w does not cover)
+_WORD_CHARS = r'\w\u0900-\u097F'
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFC', text.lower()).replace('’', "'").replace('-', ' ')
+    return ' '.join(text.split())
+
+
+def _expand(term):
+    """All concrete spellings of a canonical term"""
+    options = [TOKEN_VARIANTS.get(token, [token]) for token in term.split()]
+    return {_normalize(' '.join(combo)) for combo in itertools.product(*options)}
+
+
+def _trie_regex(phrases):
+    """Compile phrases into a trie-shaped alternation so matching cost doesn't grow with the lexicon"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[''] = None
+
+    def char_pattern(ch):
+        if ch == ' ':
+            return r'[\s-]+'
+        if ch == "'":
+            return "['’]"
+        return re.escape(ch)
+
+    def emit(node):
+        branches = [char_pattern(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return emit(trie)
+
+
+_NUKTA_LETTERS = {unicodedata.normalize('NFD', chr(cp)): chr(cp) for cp in range(0x958, 0x960)}
+
+
+def _precompose_nukta(text):
+    for decomposed, precomposed in _NUKTA_LETTERS.items():
+        text = text.replace(decomposed, precomposed)
+    return text
+
+
+def _build():
+    index = {}
+    for term, tier in CRISIS_LEXICON.items():
+        for spelling in _expand(term):
+            index.setdefault(spelling, (term, tier))
+            # Match both precomposed and decomposed nukta forms (e.g. U+0959 vs ख + ़)
+            index.setdefault(_precompose_nukta(spelling), (term, tier))
+    pattern = _trie_regex(index)
+    regex = re.compile(f'(?<![{_WORD_CHARS}])(?:{pattern})(?![{_WORD_CHARS}])', re.IGNORECASE)
+    return index, regex
+
+
+_TERM_INDEX, _CRISIS_REGEX = _build()
+
+
+def scan_crisis_terms(text):
+    """
+    Find every lexicon term in text in a single pass.
+    Returns [{'term', 'tier', 'start', 'end', 'text'}] in order of appearance.
+    """
+    if not text:
+        return []
+    matches = []
+    for m in _CRISIS_REGEX.finditer(text):
+        term, tier = _TERM_INDEX.get(_normalize(m.group()), (m.group().lower(), WARNING))
+        matches.append({'term': term, 'tier': tier, 'start': m.start(), 'end': m.end(), 'text': m.group()})
+    return matches
+
+
+def matched_terms(matches, tier=None):
+    """Unique canonical terms from scan_crisis_terms() output, optionally for one tier"""
+    seen = []
+    for match in matches:
+        if (tier is None or match['tier'] == tier) and match['term'] not in seen:
+            seen.append(match['term'])
+    return seen
+
+
+def has_crisis_terms(matches):
+    """True when any crisis-tier term was matched"""
+    return any(match['tier'] == CRISIS for match in matches)
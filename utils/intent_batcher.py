@@ -0,0 +1,96 @@
+"""
+Micro-batched intent classification.
+
+Chat requests hand their message to a shared IntentBatcher instead of calling
+intent_classifier themselves. A collector thread gathers messages for a short
+window (INTENT_BATCH_WINDOW_MS, up to INTENT_BATCH_MAX), coalesces identical
+messages into one model call, and dispatches the batch to a bounded pool sized to
+Ollama's parallel slots (INTENT_BATCH_CONCURRENCY). Each caller gets a Future that
+resolves to the raw generate() response.
+
+Ollama's /api/generate takes one prompt per request, so a "batch" is sent as
+concurrent requests rather than one multi-prompt call.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class IntentBatcher:
+    def __init__(self, client, model, window_ms=5, max_batch=16, max_concurrency=4, timeout=None):
+        self.client = client
+        self.model = model
+        self.timeout = timeout
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='intent')
+        self.stats = {'requests': 0, 'batches': 0, 'model_calls': 0}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        threading.Thread(target=self._collect, name='intent-batcher', daemon=True).start()
+
+    def submit(self, message):
+        """Queue a message; returns a Future resolving to the generate() response"""
+        future = Future()
+        self._queue.put((message, future))
+        return future
+
+    def classify(self, message, timeout=None):
+        return self.submit(message).result(timeout=timeout)
+
+    def _collect(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        # Identical messages in a burst share one model call
+        groups = {}
+        for message, future in batch:
+            if future.set_running_or_notify_cancel():
+                groups.setdefault(' '.join(message.lower().split()), (message, []))[1].append(future)
+        with self._lock:
+            self.stats['requests'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['model_calls'] += len(groups)
+        for message, futures in groups.values():
+            self.pool.submit(self._classify_group, message, futures)
+
+    def _classify_group(self, message, futures):
+        try:
+            response = self.client.generate(model=self.model, prompt=message, stream=False, timeout=self.timeout)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for future in futures:
+            future.set_result(response)
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_intent_batcher(client, model, config):
+    """Shared batcher per (client, model), configured from app.config"""
+    key = (id(client), model)
+    with _batchers_lock:
+        if key not in _batchers:
+            _batchers[key] = IntentBatcher(
+                client, model,
+                window_ms=config.get('INTENT_BATCH_WINDOW_MS', 5),
+                max_batch=config.get('INTENT_BATCH_MAX', 16),
+                max_concurrency=config.get('INTENT_BATCH_CONCURRENCY', 4),
+                timeout=config.get('OLLAMA_INTENT_TIMEOUT')
+            )
+        return _batchers[key]
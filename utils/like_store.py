@@ -0,0 +1,290 @@
+"""
+Redis-backed like state for venting posts, written back to the database in batches.
+
+Redis (db 3, beside the chat write-behind stream) is the source of truth while a
+post or user is loaded:
+
+    venting_liked:<user>       set of post ids the user likes (plus a '-' loaded marker)
+    venting_likes:count:<post> like count
+    venting_likes:pending      hash "<post>:<user>" -> 1 / 0, the latest state not yet written back
+
+set_like() is one script call: SADD / SREM say whether the state changed, only a
+change moves the counter and records a pending write, so repeating a like (double
+clicks, retries) is a no-op and concurrent likes never lose an update. The first
+like of a post or by a user loads its state from the database, overlaid with the
+changes not yet written back, so a reload never loses an unflushed like. Liked sets
+and counts expire LIKE_STATE_TTL_S after their last use, so idle posts and users do
+not stay in Redis.
+
+flush_likes (Celery) is scheduled at most once per LIKE_FLUSH_MS. It moves the pending
+hash aside, inserts / deletes VentingPostLike rows (ON CONFLICT DO NOTHING against
+unique_user_post_like, so a replay is harmless) and copies the absolute counts into
+VentingPost.likes, all in one transaction per batch. If the database rejects a batch it
+is applied one change at a time; changes that still fail are kept in DEAD_LETTER_KEY
+(with the error) instead of blocking every later flush. Connection errors keep the
+batch for the retry.
+"""
+import os
+import uuid
+
+from sqlalchemy import func, tuple_, update, delete
+from sqlalchemy.exc import OperationalError, InterfaceError
+
+from database import db, r_context
+from db_models import VentingPost, VentingPostLike
+from utils.celery_app import celery
+from utils.cache_events import on_event
+
+LIKED_PREFIX = 'venting_liked:'
+COUNT_PREFIX = 'venting_likes:count:'
+PENDING_KEY = 'venting_likes:pending'
+FLUSHING_KEY = 'venting_likes:flushing'
+SCHEDULED_KEY = 'venting_likes:scheduled'
+LOCK_KEY = 'venting_likes:lock'
+DEAD_LETTER_KEY = 'venting_likes:dead'
+LOADED_MARKER = '-'
+FLUSH_INTERVAL_MS = int(os.environ.get('LIKE_FLUSH_MS', 2000))
+LIKE_STATE_TTL = int(os.environ.get('LIKE_STATE_TTL_S', 86400))
+
+# KEYS: user's liked set, post's count, pending, scheduled marker
+# ARGV: post_id, user_id, wanted state ('1', '0', or '' to toggle), flush interval, state ttl ms
+# Returns {changed, count, liked, schedule}; changed = -1 when the user or post is not loaded
+SET_LIKE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 or redis.call('EXISTS', KEYS[2]) == 0 then
+    return {-1, 0, 0, 0}
+end
+local want
+if ARGV[3] == '' then
+    want = redis.call('SISMEMBER', KEYS[1], ARGV[1]) == 0
+else
+    want = ARGV[3] == '1'
+end
+local changed
+if want then
+    changed = redis.call('SADD', KEYS[1], ARGV[1])
+else
+    changed = redis.call('SREM', KEYS[1], ARGV[1])
+end
+local count
+local schedule = 0
+if changed == 1 then
+    count = redis.call('INCRBY', KEYS[2], want and 1 or -1)
+    redis.call('HSET', KEYS[3], ARGV[1] .. ':' .. ARGV[2], want and 1 or 0)
+    if redis.call('SET', KEYS[4], 1, 'NX', 'PX', ARGV[4]) then
+        schedule = 1
+    end
+else
+    count = tonumber(redis.call('GET', KEYS[2]))
+end
+redis.call('PEXPIRE', KEYS[1], ARGV[5])
+redis.call('PEXPIRE', KEYS[2], ARGV[5])
+return {changed, count, want and 1 or 0, schedule}
+"""
+
+# Loads a user's likes unless they are already loaded (and possibly ahead of the database)
+# ARGV: ttl ms, loaded marker, post ids...
+LOAD_USER_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('SADD', KEYS[1], unpack(ARGV, 2))
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+_set_like_script = r_context.register_script(SET_LIKE_LUA) if r_context else None
+_load_user_script = r_context.register_script(LOAD_USER_LUA) if r_context else None
+
+
+def _unflushed(field_pattern):
+    """{(post_id, user_id): liked} not in the database yet: a kept batch, overridden by newer pending changes"""
+    changes = {}
+    for key in (FLUSHING_KEY, PENDING_KEY):
+        for field, liked in r_context.hscan_iter(key, match=field_pattern):
+            post_id, user_id = field.decode().split(':')
+            changes[(int(post_id), int(user_id))] = liked == b'1'
+    return changes
+
+
+def _load_user(user_id):
+    # Unflushed changes are read before the database, so a write-back in between is seen by one of them
+    unflushed = _unflushed(f"*:{user_id}")
+    liked = {post_id for (post_id,) in db.session.query(VentingPostLike.post_id).filter_by(user_id=user_id)}
+    for (post_id, _), now_liked in unflushed.items():
+        if now_liked:
+            liked.add(post_id)
+        else:
+            liked.discard(post_id)
+    _load_user_script(keys=[f"{LIKED_PREFIX}{user_id}"], args=[LIKE_STATE_TTL * 1000, LOADED_MARKER, *liked])
+
+
+def _load_post(post_id):
+    """Load the post's like count (database rows plus unflushed changes); False if there is no such post"""
+    unflushed = _unflushed(f"{post_id}:*")
+    row = db.session.query(VentingPost.id, func.count(VentingPostLike.id)).outerjoin(
+        VentingPostLike, VentingPostLike.post_id == VentingPost.id
+    ).filter(VentingPost.id == post_id).group_by(VentingPost.id).first()
+    if row is None:
+        return False
+    count = row[1]
+    if unflushed:
+        in_db = {user_id for (user_id,) in db.session.query(VentingPostLike.user_id).filter(
+            VentingPostLike.post_id == post_id, VentingPostLike.user_id.in_([u for _, u in unflushed])
+        )}
+        count += sum(int(liked) - int(user_id in in_db) for (_, user_id), liked in unflushed.items())
+    r_context.set(f"{COUNT_PREFIX}{post_id}", max(count, 0), nx=True, ex=LIKE_STATE_TTL)
+    return True
+
+
+def set_like(post_id, user_id, liked=None):
+    """
+    Like (True), unlike (False) or toggle (None) a post for a user.
+    Returns (liked, count, changed), or None if the post does not exist.
+    """
+    args = [post_id, user_id, '' if liked is None else int(bool(liked)), FLUSH_INTERVAL_MS, LIKE_STATE_TTL * 1000]
+    keys = [f"{LIKED_PREFIX}{user_id}", f"{COUNT_PREFIX}{post_id}", PENDING_KEY, SCHEDULED_KEY]
+    changed, count, now_liked, schedule = _set_like_script(keys=keys, args=args)
+    if changed == -1:
+        if not _load_post(post_id):
+            return None
+        _load_user(user_id)
+        changed, count, now_liked, schedule = _set_like_script(keys=keys, args=args)
+    if schedule:
+        flush_likes.apply_async(countdown=FLUSH_INTERVAL_MS / 1000)
+    return bool(now_liked), count, bool(changed)
+
+
+def like_counts(post_ids):
+    """{post_id: count} for the loaded posts among post_ids"""
+    if not post_ids:
+        return {}
+    counts = r_context.mget([f"{COUNT_PREFIX}{post_id}" for post_id in post_ids])
+    return {post_id: int(n) for post_id, n in zip(post_ids, counts) if n is not None}
+
+
+def forget_like_state(post_id, user_id):
+    """
+    Drop the cached count and the user's liked set after a like written past Redis; both
+    are reloaded on next use from the database plus the other unflushed changes
+    """
+    pipe = r_context.pipeline()
+    # The database now holds this pair's latest state: an older unflushed change must not overwrite it
+    pipe.hdel(PENDING_KEY, f"{post_id}:{user_id}")
+    pipe.hdel(FLUSHING_KEY, f"{post_id}:{user_id}")
+    pipe.delete(f"{COUNT_PREFIX}{post_id}", f"{LIKED_PREFIX}{user_id}")
+    pipe.execute()
+
+
+def liked_ids(user_id, post_ids):
+    """The post ids among post_ids that user_id likes"""
+    key = f"{LIKED_PREFIX}{user_id}"
+    if not r_context.exists(key):
+        _load_user(user_id)
+    if not post_ids:
+        return set()
+    return {post_id for post_id, liked in zip(post_ids, r_context.smismember(key, post_ids)) if liked}
+
+
+def _insert_ignoring_duplicates():
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(VentingPostLike).on_conflict_do_nothing(index_elements=['post_id', 'user_id'])
+
+
+def write_back(changes):
+    """Apply {(post_id, user_id): liked} and the current counts of those posts to the database"""
+    post_ids = {post_id for post_id, _ in changes}
+    existing = {post_id for (post_id,) in db.session.query(VentingPost.id).filter(VentingPost.id.in_(post_ids))}
+    # Likes of posts deleted since are dropped
+    likes = [{'post_id': p, 'user_id': u} for (p, u), liked in changes.items() if liked and p in existing]
+    unlikes = [(p, u) for (p, u), liked in changes.items() if not liked and p in existing]
+    if likes:
+        db.session.execute(_insert_ignoring_duplicates(), likes)
+    if unlikes:
+        db.session.execute(delete(VentingPostLike).where(
+            tuple_(VentingPostLike.post_id, VentingPostLike.user_id).in_(unlikes)
+        ))
+    counts = like_counts(sorted(existing))
+    expired = existing - counts.keys()
+    if expired:
+        # No Redis count (expired or dropped): the rows just written are the count
+        counts.update({post_id: 0 for post_id in expired})
+        counts.update(db.session.query(VentingPostLike.post_id, func.count(VentingPostLike.id)).filter(
+            VentingPostLike.post_id.in_(expired)
+        ).group_by(VentingPostLike.post_id).all())
+    if counts:
+        db.session.execute(update(VentingPost), [{'id': p, 'likes': n} for p, n in counts.items()])
+    db.session.commit()
+    return len(likes) + len(unlikes)
+
+
+def database_unavailable(error):
+    """True when the failure is the connection, not the changes"""
+    return isinstance(error, (OperationalError, InterfaceError)) or getattr(error, 'connection_invalidated', False)
+
+
+def write_back_individually(changes):
+    """Slow path after a failed batch: apply what still applies, dead-letter the rest"""
+    written = 0
+    for (post_id, user_id), liked in changes.items():
+        try:
+            written += write_back({(post_id, user_id): liked})
+        except Exception as e:
+            db.session.rollback()
+            if database_unavailable(e):
+                raise
+            r_context.hset(DEAD_LETTER_KEY, f"{post_id}:{user_id}", f"{int(liked)}:{str(e)[:500]}")
+            print(f"⚠️ Moved like change {post_id}:{user_id} to {DEAD_LETTER_KEY}: {e}")
+    return written
+
+
+@celery.task
+def flush_likes():
+    """Write pending likes / unlikes and like counts back to the database"""
+    from app import app
+    with app.app_context():
+        token = uuid.uuid4().hex
+        if not r_context.set(LOCK_KEY, token, nx=True, ex=60):
+            flush_likes.apply_async(countdown=FLUSH_INTERVAL_MS / 1000)
+            return 0
+        total = 0
+        try:
+            # Likes from here on schedule a new flush
+            r_context.delete(SCHEDULED_KEY)
+            # A batch left by a failed flush goes first (it is safe to apply twice), then the
+            # pending one; anything pending after that has scheduled its own flush
+            for _ in range(2):
+                if not r_context.exists(FLUSHING_KEY):
+                    if not r_context.exists(PENDING_KEY):
+                        break
+                    r_context.rename(PENDING_KEY, FLUSHING_KEY)
+                changes = {}
+                for field, liked in r_context.hgetall(FLUSHING_KEY).items():
+                    post_id, user_id = field.decode().split(':')
+                    changes[(int(post_id), int(user_id))] = liked == b'1'
+                if changes:
+                    try:
+                        total += write_back(changes)
+                    except Exception as e:
+                        db.session.rollback()
+                        if database_unavailable(e):
+                            raise
+                        total += write_back_individually(changes)
+                r_context.delete(FLUSHING_KEY)
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Like write-back failed: {e}")
+            # Retry the kept batch
+            flush_likes.apply_async(countdown=FLUSH_INTERVAL_MS / 1000)
+        finally:
+            if r_context.get(LOCK_KEY) == token.encode():
+                r_context.delete(LOCK_KEY)
+        if total:
+            print(f"✅ Wrote back {total} like changes")
+        return total
+
+
+@on_event('venting.post_deleted')
+def forget_post_likes(event):
+    r_context.delete(f"{COUNT_PREFIX}{event['id']}")
@@ -0,0 +1,125 @@
+"""
+Organisation-scoped analytics for the mentor dashboard.
+
+org_dashboard_stats() returns every figure on /mentor_dashboard from one statement: a
+`students` CTE (the organisation's students, or all students for a mentor without an
+organisation) feeding four grouped selects joined with UNION ALL. Each result row is
+tagged with the figure it carries:
+
+    students     per accommodation_type: count, and count FILTER (streak in the last 7 days)
+    assessments  per assessment_type/severity_level, last 30 days: count
+    phq9         per accommodation_type: PHQ-9 count and average score
+    crisis       crisis-flagged chat sessions started in the last 30 days
+    emotions     per day/emotional_state, last 30 days: intents and elevated-intensity
+                 intents (daily_org_emotions rollup; organisations only)
+
+Results are cached per organisation (cached_org_dashboard_stats) and retired through
+the org:<id> cache tag when an assessment or crisis alert is created or a student
+joins. Chat intents (emotion trends) and profile updates (streaks, accommodation)
+happen on nearly every request, so those figures are refreshed by the TTL instead.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, cast, literal, null, union_all, Float, String
+
+from database import db
+from db_models import User, Assessment, ChatSession, DailyOrgEmotions
+from utils.cache_aside import cached_value, tagged_key, bump_tags
+from utils.cache_events import on_event
+
+ORG_DASHBOARD_CACHE_TTL = 1800
+WINDOW_DAYS = 30
+ACTIVE_DAYS = 7
+
+
+def org_tag(organization_id):
+    return f"org:{organization_id or 'all'}"
+
+
+def org_dashboard_query(organization_id, now=None):
+    now = now or datetime.utcnow()
+    since = now - timedelta(days=WINDOW_DAYS)
+    students = select(User.id, User.accommodation_type, User.last_streak_date).where(User.role == 'student')
+    if organization_id:
+        students = students.where(User.organization_id == organization_id)
+    students = students.cte('students')
+
+    def row(kind, key, detail, count, active=None, average=None):
+        return (literal(kind, String).label('kind'), key.label('key'), detail.label('detail'),
+                count.label('n'), (active if active is not None else null()).label('active'),
+                cast(average if average is not None else null(), Float).label('average'))
+
+    by_accommodation = select(*row(
+        'students', students.c.accommodation_type, null(), func.count(),
+        active=func.count().filter(students.c.last_streak_date >= (now - timedelta(days=ACTIVE_DAYS)).date())
+    )).group_by(students.c.accommodation_type)
+
+    assessments = select(*row(
+        'assessments', Assessment.assessment_type, Assessment.severity_level, func.count(Assessment.id)
+    )).join(students, students.c.id == Assessment.user_id).where(
+        Assessment.completed_at >= since
+    ).group_by(Assessment.assessment_type, Assessment.severity_level)
+
+    phq9 = select(*row(
+        'phq9', students.c.accommodation_type, null(), func.count(Assessment.id), average=func.avg(Assessment.score)
+    )).join(students, students.c.id == Assessment.user_id).where(
+        Assessment.assessment_type == 'PHQ-9'
+    ).group_by(students.c.accommodation_type)
+
+    crisis = select(*row(
+        'crisis', null(), null(), func.count(ChatSession.id)
+    )).join(students, students.c.id == ChatSession.user_id).where(
+        ChatSession.crisis_flag == True,
+        ChatSession.session_start >= since
+    )
+
+    parts = [by_accommodation, assessments, phq9, crisis]
+    if organization_id:
+        parts.append(select(*row(
+            'emotions', cast(DailyOrgEmotions.date, String), DailyOrgEmotions.emotional_state,
+            DailyOrgEmotions.count, active=DailyOrgEmotions.elevated_count
+        )).where(
+            DailyOrgEmotions.organization_id == organization_id,
+            DailyOrgEmotions.date >= since.date()
+        ))
+    return union_all(*parts)
+
+
+def org_dashboard_stats(organization_id):
+    """The /mentor_dashboard figures for one organisation, in one round trip"""
+    stats = {
+        'total_students': 0, 'hostel_students': 0, 'local_students': 0, 'active_users': 0,
+        'recent_assessments': [], 'crisis_sessions': 0, 'hostel_avg_stress': 0, 'local_avg_stress': 0,
+        'emotion_trends': []
+    }
+    for kind, key, detail, n, active, average in db.session.execute(org_dashboard_query(organization_id)):
+        if kind == 'students':
+            stats['total_students'] += n
+            stats['active_users'] += active or 0
+            if key in ('hostel', 'local'):
+                stats[f'{key}_students'] = n
+        elif kind == 'assessments':
+            stats['recent_assessments'].append({'assessment_type': key, 'severity_level': detail, 'count': n})
+        elif kind == 'phq9' and key in ('hostel', 'local'):
+            stats[f'{key}_avg_stress'] = round(average or 0, 2)
+        elif kind == 'crisis':
+            stats['crisis_sessions'] = n
+        elif kind == 'emotions':
+            stats['emotion_trends'].append({'date': key, 'emotional_state': detail, 'count': n, 'elevated': active})
+    stats['recent_assessments'].sort(key=lambda a: (a['assessment_type'] or '', a['severity_level'] or ''))
+    stats['emotion_trends'].sort(key=lambda e: (e['date'], e['emotional_state']))
+    return stats
+
+
+def cached_org_dashboard_stats(organization_id):
+    return cached_value(
+        tagged_key(f"org_dashboard:{organization_id or 'all'}", org_tag(organization_id), org_tag(None)),
+        lambda: org_dashboard_stats(organization_id),
+        ttl=ORG_DASHBOARD_CACHE_TTL
+    )
+
+
+@on_event('assessment.created', 'crisis_alert.created', 'user.created')
+def expire_org_dashboard(event):
+    # org:all covers the platform-wide view of mentors without an organisation
+    bump_tags(org_tag(event.get('organization_id')), org_tag(None))
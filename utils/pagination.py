@@ -0,0 +1,93 @@
+"""
+Keyset (seek) pagination for history listings.
+
+Pages are ordered newest first by (timestamp, id) and continue from an opaque cursor
+encoding the last row's key, so each page is one index range scan however deep the
+client has scrolled, unlike OFFSET. Listings keep returning a JSON array; the cursor
+for the next page, if any, is in the X-Next-Cursor header. Without ?limit= or ?cursor=
+the whole listing is returned, as before pagination, so existing clients see every row.
+Rows with a NULL timestamp (legacy data) sort first, the way a descending index scan
+returns them.
+
+    GET /api/assessments
+    GET /api/assessments?limit=20
+    GET /api/assessments?limit=20&cursor=<X-Next-Cursor of the previous page>
+
+    items, next_cursor = keyset_page(query, Assessment.completed_at, Assessment.id)
+    return [...], 200, page_headers(next_cursor)
+"""
+import base64
+import json
+import os
+from datetime import datetime
+
+from flask import request
+from flask_restx import abort
+from sqlalchemy import tuple_, and_, or_
+
+DEFAULT_LIMIT = int(os.environ.get('PAGE_DEFAULT_LIMIT', 50))
+MAX_LIMIT = int(os.environ.get('PAGE_MAX_LIMIT', 200))
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(timestamp, row_id):
+    raw = json.dumps([timestamp.isoformat() if timestamp else None, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(timestamp, id) from a cursor; ValueError if it was not made by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp) if timestamp is not None else None, int(row_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError(f"invalid cursor: {e}")
+
+
+def page_args():
+    """
+    (limit, cursor key or None) from the query string; 400 on bad values. limit is None
+    (no paging) when neither ?limit= nor ?cursor= is given.
+    """
+    cursor = request.args.get('cursor')
+    if 'limit' not in request.args and not cursor:
+        return None, None
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        abort(400, 'limit must be an integer')
+    try:
+        key = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        abort(400, 'Invalid cursor')
+    return max(1, min(limit, MAX_LIMIT)), key
+
+
+def keyset_page(query, timestamp_column, id_column, limit=None, after=None):
+    """
+    (rows, next_cursor) for one page of query, newest first. limit/after default to
+    the request's ?limit= and ?cursor=; with no limit every row is returned.
+    """
+    if limit is None and after is None:
+        limit, after = page_args()
+    query = query.order_by(timestamp_column.desc().nulls_first(), id_column.desc())
+    if after:
+        timestamp, row_id = after
+        if timestamp is None:
+            # Still among the NULL-timestamp rows at the top
+            query = query.filter(or_(timestamp_column.isnot(None), and_(timestamp_column.is_(None), id_column < row_id)))
+        else:
+            query = query.filter(tuple_(timestamp_column, id_column) < tuple_(timestamp, row_id))
+    if limit is None:
+        return query.all(), None
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, timestamp_column.key), getattr(last, id_column.key))
+
+
+def page_headers(next_cursor):
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
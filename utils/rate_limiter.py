@@ -0,0 +1,152 @@
+"""
+Sliding-window rate limiting shared by the API namespaces.
+
+Each (scope, user) pair gets a sorted set of request timestamps in Redis. One Lua
+script trims entries older than the window, counts what is left and records the new
+request only when it is under the limit, so concurrent requests cannot race past the
+limit and a check costs a single round trip. The script reads the Redis clock, so app
+servers with drifting clocks still share one window.
+
+If Redis is unreachable or answers with an error (read-only replica, script failure)
+the same algorithm runs in-process (per worker, so limits are looser but still
+enforced) and Redis is retried after REDIS_RETRY_SECONDS.
+
+    @ns.route('/tts')
+    class TextToSpeech(Resource):
+        @login_required
+        @rate_limit('voice')
+        def post(self): ...
+"""
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+from functools import wraps
+
+import redis
+from flask import current_app, request
+from flask_login import current_user
+from werkzeug.wrappers import Response
+
+from database import r_context
+
+# scope -> role -> (max requests, window seconds); 'default' covers every other role
+RATE_LIMITS = {
+    'chatbot': {'student': (10, 60), 'default': (30, 60)},
+    'voice': {'student': (20, 60), 'default': (60, 60)},
+    'venting': {'student': (20, 60), 'default': (60, 60)},
+    'assessments': {'student': (10, 60), 'default': (60, 60)},
+}
+REDIS_RETRY_SECONDS = 10
+
+SLIDING_WINDOW_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, now .. '-' .. ARGV[3])
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', KEYS[1], window)
+local reset = window
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window - now
+end
+return {allowed, limit - count, reset}
+"""
+
+RateLimitDecision = namedtuple('RateLimitDecision', 'allowed limit remaining reset_ms backend')
+
+
+class SlidingWindowLimiter:
+    def __init__(self, redis_client, limits=RATE_LIMITS):
+        self.redis = redis_client
+        self.limits = limits
+        self._script = redis_client.register_script(SLIDING_WINDOW_LUA) if redis_client else None
+        self._local = {}
+        self._lock = threading.Lock()
+        self._redis_down_until = 0.0
+
+    def limit_for(self, scope, role):
+        scope_limits = self.limits[scope]
+        return scope_limits.get(role, scope_limits['default'])
+
+    def check(self, scope, identity, role=None):
+        """Count one request against the window; returns a RateLimitDecision"""
+        limit, window = self.limit_for(scope, role)
+        key = f"rate_limit:{scope}:{identity}"
+        if self._script and time.monotonic() >= self._redis_down_until:
+            try:
+                allowed, remaining, reset_ms = self._script(keys=[key], args=[limit, window * 1000, uuid.uuid4().hex[:8]])
+                return RateLimitDecision(bool(allowed), limit, int(remaining), int(reset_ms), 'redis')
+            except redis.RedisError as e:
+                # Unreachable, read-only replica, script errors: never fail the request over it
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+                current_app.logger.warning(f"⚠️ Rate limiter falling back to in-process windows: {e}")
+        return self._check_local(key, limit, window * 1000)
+
+    def _check_local(self, key, limit, window_ms):
+        now = time.monotonic() * 1000
+        with self._lock:
+            hits = self._local.setdefault(key, deque())
+            while hits and hits[0] <= now - window_ms:
+                hits.popleft()
+            allowed = len(hits) < limit
+            if allowed:
+                hits.append(now)
+            reset_ms = int(hits[0] + window_ms - now) if hits else window_ms
+            remaining = limit - len(hits)
+            if not hits:
+                del self._local[key]
+        return RateLimitDecision(allowed, limit, remaining, reset_ms, 'local')
+
+
+limiter = SlidingWindowLimiter(r_context)
+
+
+def rate_limit_headers(decision):
+    return {
+        'X-RateLimit-Limit': str(decision.limit),
+        'X-RateLimit-Remaining': str(max(0, decision.remaining)),
+        'X-RateLimit-Reset': str(-(-decision.reset_ms // 1000)),
+    }
+
+
+def rate_limit(scope, body=None):
+    """
+    Resource method decorator: per-user (per-IP when anonymous) sliding window with
+    the caller's role limits. Adds X-RateLimit-* headers to every response and answers
+    429 with Retry-After (and `body`, if given) once the window is full.
+    Place it under @login_required so current_user is resolved.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_user.is_authenticated:
+                identity, role = current_user.id, current_user.role
+            else:
+                identity, role = request.remote_addr, None
+            decision = limiter.check(scope, identity, role)
+            headers = rate_limit_headers(decision)
+            if not decision.allowed:
+                headers['Retry-After'] = headers['X-RateLimit-Reset']
+                return dict(body or {'message': 'Too many requests. Please slow down.'}), 429, headers
+
+            result = func(*args, **kwargs)
+            if isinstance(result, Response):
+                result.headers.update(headers)
+                return result
+            if isinstance(result, tuple):
+                code = result[1] if len(result) > 1 else 200
+                extra = dict(result[2] or {}) if len(result) > 2 else {}
+                extra.update(headers)
+                return result[0], code, extra
+            return result, 200, headers
+        return wrapper
+    return decorator
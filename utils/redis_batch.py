@@ -0,0 +1,31 @@
+"""
+Per-request Redis write batching.
+
+Bookkeeping writes that nothing later in the request reads back (the chat context
+window, response cache entries and counters) are queued on one pipeline per Redis
+client and sent together by flush(), so a chat turn pays one round trip per Redis
+database instead of one per command.
+
+    batch = RedisBatch()
+    batch.pipeline(r_context).setex(key, 3600, value)
+    ...
+    batch.flush()
+"""
+
+
+class RedisBatch:
+    def __init__(self):
+        self._pipelines = {}
+
+    def pipeline(self, client):
+        """Pipeline collecting this request's writes for one client (created on first use)"""
+        key = id(client)
+        if key not in self._pipelines:
+            self._pipelines[key] = client.pipeline(transaction=False)
+        return self._pipelines[key]
+
+    def flush(self):
+        """Send every queued command: one round trip per client"""
+        pipelines, self._pipelines = self._pipelines, {}
+        for pipe in pipelines.values():
+            pipe.execute()
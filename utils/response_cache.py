@@ -0,0 +1,201 @@
+"""
+Near-duplicate response cache for the chatbot.
+
+Messages are normalised (case, punctuation, contractions, filler words) so that
+"im feeling anxious" and "I'm feeling so anxious" share one exact key. On an exact
+miss, a 64-bit SimHash of the normalised tokens is looked up through 8 LSH bands
+(8 bits each), which finds every cached message within 7 differing bits in one
+Redis round trip. Entries expire per intent type, crisis replies are never stored
+or served, and hit / near-hit / miss counters are kept in Redis.
+"""
+import hashlib
+import json
+import os
+import re
+
+from database import r_cache
+
+ENTRY_PREFIX = 'chatbot_resp:v2:'
+BAND_PREFIX = 'chatbot_resp:band:'
+STATS_KEY = 'chatbot_resp:stats'
+
+BANDS = 8
+BAND_BITS = 64 // BANDS
+NEAR_MIN_TOKENS = 3  # SimHash is too noisy below this; short messages only hit exactly
+
+# Cache lifetime per intent_type (seconds)
+INTENT_TTLS = {
+    'casual_chat': 3600,
+    'informational': 3600,
+    'grounding': 1800,
+    'advice': 1800,
+    'action_planning': 1200,
+    'reassurance': 900,
+    'reflection': 900,
+    'venting': 600,
+}
+DEFAULT_TTL = 600
+
+CONTRACTIONS = {
+    'im': 'i am', "i'm": 'i am', "i've": 'i have', 'ive': 'i have', "i'll": 'i will',
+    "i'd": 'i would', "don't": 'do not', 'dont': 'do not', "doesn't": 'does not',
+    "can't": 'can not', 'cant': 'can not', 'cannot': 'can not', "won't": 'will not',
+    'wont': 'will not', "isn't": 'is not', "aren't": 'are not', "wasn't": 'was not',
+    "didn't": 'did not', 'didnt': 'did not', "it's": 'it is', "that's": 'that is',
+    "what's": 'what is', "you're": 'you are', 'u': 'you', 'ur': 'your', 'r': 'are',
+    'feelin': 'feeling', 'wanna': 'want to', 'gonna': 'going to', 'nhi': 'nahi', 'nahin': 'nahi',
+}
+FILLER_WORDS = {
+    'so', 'really', 'very', 'just', 'kinda', 'sorta', 'super', 'literally', 'actually',
+    'totally', 'too', 'um', 'uh', 'umm', 'hmm', 'yaar', 'bro', 'like', 'lot', 'a', 'the',
+}
+# Messages that differ in polarity must never share a reply
+NEGATIONS = {'not', 'no', 'never', 'nahi', 'na', 'nothing', 'none', 'nor', 'without'}
+
+_TOKEN_RE = re.compile(r"[\w']+")
+
+
+def normalize_message(text):
+    """Lower-case, expand contractions and drop punctuation / filler words"""
+    tokens = []
+    for raw in _TOKEN_RE.findall((text or '').lower().replace('’', "'")):
+        for token in CONTRACTIONS.get(raw, raw).split():
+            token = token.strip("'")
+            if token and token not in FILLER_WORDS:
+                tokens.append(token)
+    return tokens
+
+
+def simhash(tokens):
+    """64-bit SimHash over unigrams and bigrams"""
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * 64
+    for feature in features:
+        h = int.from_bytes(hashlib.md5(feature.encode()).digest()[:8], 'big')
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def _bands(fingerprint):
+    mask = (1 << BAND_BITS) - 1
+    return [f"{BAND_PREFIX}{i}:{(fingerprint >> (i * BAND_BITS)) & mask:02x}" for i in range(BANDS)]
+
+
+class SemanticResponseCache:
+    def __init__(self, redis_client, similarity=0.9):
+        self.redis = redis_client
+        self.similarity = similarity
+
+    @property
+    def max_distance(self):
+        return int((1 - self.similarity) * 64)
+
+    def _count(self, field, pipe=None):
+        try:
+            (pipe or self.redis).hincrby(STATS_KEY, field, 1)
+        except Exception:
+            pass
+
+    def get(self, message, stats_pipe=None):
+        """
+        Return (response_data, 'hit' | 'near_hit' | 'miss').
+        Counters go on stats_pipe when given (e.g. a request's RedisBatch) instead of their own round trip.
+        """
+        tokens = normalize_message(message)
+        if not tokens:
+            self._count('miss', stats_pipe)
+            return None, 'miss'
+        entry_id = hashlib.md5(' '.join(tokens).encode()).hexdigest()
+        fingerprint = simhash(tokens)
+
+        # Exact lookup and LSH candidates in one round trip
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(ENTRY_PREFIX + entry_id)
+        pipe.sunion(_bands(fingerprint))
+        exact_raw, candidates = pipe.execute()
+
+        if exact_raw:
+            entry = json.loads(exact_raw)
+            if not entry['response'].get('crisis_detected'):
+                self._count('hit', stats_pipe)
+                return entry['response'], 'hit'
+
+        if len(tokens) >= NEAR_MIN_TOKENS and candidates:
+            polarity = NEGATIONS.intersection(tokens)
+            ranked = []
+            for member in candidates:
+                candidate_id, candidate_fp = member.decode().split(':')
+                distance = bin(fingerprint ^ int(candidate_fp, 16)).count('1')
+                if candidate_id != entry_id and distance <= self.max_distance:
+                    ranked.append((distance, candidate_id, member))
+            for distance, candidate_id, member in sorted(ranked)[:3]:
+                raw = self.redis.get(ENTRY_PREFIX + candidate_id)
+                if not raw:
+                    # Entry expired: drop it from the band index lazily
+                    pipe = self.redis.pipeline(transaction=False)
+                    for band in _bands(int(member.decode().split(':')[1], 16)):
+                        pipe.srem(band, member)
+                    pipe.execute()
+                    continue
+                entry = json.loads(raw)
+                if entry['response'].get('crisis_detected'):
+                    continue
+                if NEGATIONS.intersection(entry['tokens']) != polarity or len(entry['tokens']) < NEAR_MIN_TOKENS:
+                    continue
+                self._count('near_hit', stats_pipe)
+                return entry['response'], 'near_hit'
+
+        self._count('miss', stats_pipe)
+        return None, 'miss'
+
+    def set(self, message, response_data, intent_type=None, pipe=None):
+        """Cache a non-crisis reply; TTL depends on the intent type. Queued on pipe when given."""
+        if response_data.get('crisis_detected'):
+            return
+        tokens = normalize_message(message)
+        if not tokens:
+            return
+        entry_id = hashlib.md5(' '.join(tokens).encode()).hexdigest()
+        fingerprint = simhash(tokens)
+        ttl = INTENT_TTLS.get(intent_type, DEFAULT_TTL)
+        member = f"{entry_id}:{fingerprint:016x}"
+
+        target = pipe or self.redis.pipeline(transaction=False)
+        target.setex(ENTRY_PREFIX + entry_id, ttl, json.dumps({'tokens': tokens, 'response': response_data}))
+        for band in _bands(fingerprint):
+            target.sadd(band, member)
+            target.expire(band, max(INTENT_TTLS.values()))
+        if pipe is None:
+            target.execute()
+
+    def invalidate(self, message, pipe=None):
+        """Drop the exact entry for a message (used when it turns out to be a crisis)"""
+        tokens = normalize_message(message)
+        if tokens:
+            (pipe or self.redis).delete(ENTRY_PREFIX + hashlib.md5(' '.join(tokens).encode()).hexdigest())
+
+    def stats(self):
+        raw = self.redis.hgetall(STATS_KEY) or {}
+        counts = {k.decode(): int(v) for k, v in raw.items()}
+        hits = counts.get('hit', 0)
+        near_hits = counts.get('near_hit', 0)
+        misses = counts.get('miss', 0)
+        lookups = hits + near_hits + misses
+        return {
+            'hit': hits,
+            'near_hit': near_hits,
+            'miss': misses,
+            'bypass': counts.get('bypass', 0),
+            'hit_rate': round((hits + near_hits) / lookups, 4) if lookups else 0.0,
+            # Every served entry skips intent_classifier + convo_LLM
+            'ollama_calls_saved': 2 * (hits + near_hits)
+        }
+
+    def record_bypass(self, pipe=None):
+        """Count messages that skipped the cache because of crisis terms"""
+        self._count('bypass', pipe)
+
+
+# Minimum SimHash similarity (1 - hamming/64) for a near-hit; 0.9 allows 6 differing bits
+response_cache = SemanticResponseCache(r_cache, similarity=float(os.environ.get('CHAT_CACHE_SIMILARITY', 0.9)))
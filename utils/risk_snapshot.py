@@ -0,0 +1,207 @@
+"""
+Incrementally maintained StudentRiskSnapshot rows.
+
+Every ChatIntent, CrisisAlert, UserActivityLog, Assessment and MeditationSession added
+through the ORM is folded into its student's snapshot in the same flush (before_flush
+listener), so the snapshot commits or rolls back with the row that changed it. Bulk
+Core inserts (the chat write-behind flusher) call apply_events() themselves.
+
+Counters are kept per day for 30 days (daily_counts) and rolled into the *_7d/*_30d
+columns on every write; readers use rolled_counts() to get windows as of today without
+touching history. Windows are whole days: "7d" is today and the six days before it.
+rebuild_snapshots() (rebuild_risk_snapshots.py) regenerates everything from history.
+"""
+from collections import Counter, defaultdict, namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from db_models import StudentRiskSnapshot, ChatIntent, CrisisAlert, UserActivityLog, Assessment, MeditationSession
+
+NEGATIVE_STATES = ('low', 'sad', 'anxious', 'stressed', 'overwhelmed', 'frustrated', 'angry', 'numb')
+ELEVATED_INTENSITIES = ('moderate', 'high', 'critical')
+RETENTION_DAYS = 30
+RECENT_INTENTS = 10
+
+SnapshotEvent = namedtuple('SnapshotEvent', 'user_id kind at data')
+
+
+def is_negative(emotional_state, emotional_intensity):
+    return emotional_state in NEGATIVE_STATES and emotional_intensity in ELEVATED_INTENSITIES
+
+
+def _naive_utc(dt):
+    if dt is None:
+        return datetime.utcnow()
+    if isinstance(dt, datetime):
+        return dt.replace(tzinfo=None) if dt.tzinfo is None else (dt - dt.utcoffset()).replace(tzinfo=None)
+    return datetime.combine(dt, datetime.min.time())
+
+
+def event_for(obj):
+    """SnapshotEvent for a newly added ORM row (None for rows the snapshot doesn't track)"""
+    if isinstance(obj, ChatIntent):
+        return SnapshotEvent(obj.user_id, 'intent', _naive_utc(obj.timestamp),
+                             {'emotional_state': obj.emotional_state, 'emotional_intensity': obj.emotional_intensity})
+    if isinstance(obj, CrisisAlert):
+        return SnapshotEvent(obj.user_id, 'crisis_alert', _naive_utc(obj.created_at), {'severity': obj.severity})
+    if isinstance(obj, UserActivityLog):
+        return SnapshotEvent(obj.user_id, 'activity', _naive_utc(obj.timestamp), {'activity_type': obj.activity_type})
+    if isinstance(obj, Assessment):
+        return SnapshotEvent(obj.user_id, 'assessment', _naive_utc(obj.completed_at), {'assessment_type': obj.assessment_type})
+    if isinstance(obj, MeditationSession):
+        return SnapshotEvent(obj.user_id, 'meditation', _naive_utc(obj.completed_at), {'session_type': obj.session_type})
+    return None
+
+
+def event_counters(ev):
+    """Daily counters an event adds to"""
+    if ev.kind == 'intent':
+        counters = ['intents', f"state:{ev.data.get('emotional_state') or 'unknown'}",
+                    f"intensity:{ev.data.get('emotional_intensity') or 'unknown'}"]
+        if is_negative(ev.data.get('emotional_state'), ev.data.get('emotional_intensity')):
+            counters.append('negative_intents')
+        return counters
+    if ev.kind == 'crisis_alert':
+        return ['crisis_alerts', f"crisis:{ev.data.get('severity')}"]
+    if ev.kind == 'activity':
+        return ['activities', f"activity:{ev.data.get('activity_type')}"]
+    return [f"{ev.kind}s"]
+
+
+def rolled_counts(snapshot, days, today=None):
+    """Counter of every daily counter summed over the last `days` days (today included)"""
+    today = today or datetime.utcnow().date()
+    first = (today - timedelta(days=days - 1)).isoformat()
+    last = today.isoformat()
+    total = Counter()
+    for day, counters in (snapshot.daily_counts or {}).items():
+        if first <= day <= last:
+            total.update(counters)
+    return total
+
+
+def roll(snapshot, today=None):
+    """Prune day buckets past retention and refresh the windowed columns"""
+    today = today or datetime.utcnow().date()
+    cutoff = (today - timedelta(days=RETENTION_DAYS - 1)).isoformat()
+    snapshot.daily_counts = {day: c for day, c in (snapshot.daily_counts or {}).items() if day >= cutoff}
+    week, month = rolled_counts(snapshot, 7, today), rolled_counts(snapshot, RETENTION_DAYS, today)
+    snapshot.intents_7d = week['intents']
+    snapshot.negative_intents_7d = week['negative_intents']
+    snapshot.crisis_alerts_7d = week['crisis_alerts']
+    snapshot.crisis_alerts_30d = month['crisis_alerts']
+    snapshot.activities_7d = week['activities']
+    snapshot.activities_30d = month['activities']
+    snapshot.counts_as_of = today
+
+
+def apply_event(snapshot, ev):
+    """Fold one event into a snapshot (JSONB fields are reassigned so the change is tracked)"""
+    day = ev.at.date().isoformat()
+    if day >= (datetime.utcnow().date() - timedelta(days=RETENTION_DAYS - 1)).isoformat():
+        daily = dict(snapshot.daily_counts or {})
+        counters = dict(daily.get(day, {}))
+        for name in event_counters(ev):
+            counters[name] = counters.get(name, 0) + 1
+        daily[day] = counters
+        snapshot.daily_counts = daily
+
+    if ev.kind == 'intent':
+        negative = is_negative(ev.data.get('emotional_state'), ev.data.get('emotional_intensity'))
+        recent = sorted((snapshot.recent_intents or []) + [[ev.at.isoformat(), int(negative)]])
+        snapshot.recent_intents = recent[-RECENT_INTENTS:]
+        if snapshot.latest_intent_at is None or ev.at >= snapshot.latest_intent_at:
+            snapshot.latest_intent_at = ev.at
+            snapshot.latest_emotional_state = ev.data.get('emotional_state')
+            snapshot.latest_emotional_intensity = ev.data.get('emotional_intensity')
+            snapshot.negative_streak = (snapshot.negative_streak or 0) + 1 if negative else 0
+    elif ev.kind == 'crisis_alert':
+        if snapshot.latest_crisis_at is None or ev.at >= snapshot.latest_crisis_at:
+            snapshot.latest_crisis_at = ev.at
+            snapshot.latest_crisis_severity = ev.data.get('severity')
+    elif ev.kind == 'activity':
+        if snapshot.last_activity_at is None or ev.at > snapshot.last_activity_at:
+            snapshot.last_activity_at = ev.at
+
+
+def new_snapshot(user_id):
+    return StudentRiskSnapshot(user_id=user_id, daily_counts={}, recent_intents=[], negative_streak=0)
+
+
+def load_snapshots_for_update(session, user_ids):
+    """Snapshot rows for user_ids, created if missing and row-locked until commit"""
+    if session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        # Concurrent first writes for one student must not collide on the primary key
+        session.execute(pg_insert(StudentRiskSnapshot).values([
+            {'user_id': uid, 'daily_counts': {}, 'recent_intents': [], 'negative_streak': 0} for uid in user_ids
+        ]).on_conflict_do_nothing(index_elements=['user_id']))
+    snapshots = {s.user_id: s for s in session.query(StudentRiskSnapshot).filter(
+        StudentRiskSnapshot.user_id.in_(user_ids)
+    ).with_for_update().all()}
+    for uid in user_ids:
+        if uid not in snapshots:
+            snapshots[uid] = new_snapshot(uid)
+            session.add(snapshots[uid])
+    return snapshots
+
+
+def apply_events(session, events):
+    """Fold events into their students' snapshots within the caller's transaction"""
+    by_user = defaultdict(list)
+    for ev in events:
+        if ev and ev.user_id is not None:
+            by_user[ev.user_id].append(ev)
+    if not by_user:
+        return
+    with session.no_autoflush:
+        snapshots = load_snapshots_for_update(session, sorted(by_user))
+        today = datetime.utcnow().date()
+        for user_id, user_events in by_user.items():
+            snapshot = snapshots[user_id]
+            for ev in sorted(user_events, key=lambda e: e.at):
+                apply_event(snapshot, ev)
+            roll(snapshot, today)
+
+
+@event.listens_for(Session, 'before_flush')
+def update_snapshots_before_flush(session, flush_context, instances):
+    events = [event_for(obj) for obj in session.new]
+    apply_events(session, [ev for ev in events if ev])
+
+
+def rebuild_snapshots(session, user_ids, batch_size=500):
+    """Regenerate snapshots for user_ids from the last RETENTION_DAYS of history"""
+    since = datetime.utcnow() - timedelta(days=RETENTION_DAYS)
+    rebuilt = 0
+    for start in range(0, len(user_ids), batch_size):
+        chunk = user_ids[start:start + batch_size]
+        snapshots = {uid: new_snapshot(uid) for uid in chunk}
+        sources = [
+            (ChatIntent, ChatIntent.timestamp),
+            (CrisisAlert, CrisisAlert.created_at),
+            (UserActivityLog, UserActivityLog.timestamp),
+            (Assessment, Assessment.completed_at),
+            (MeditationSession, MeditationSession.completed_at),
+        ]
+        events = []
+        for model, ts_column in sources:
+            rows = session.query(model).filter(model.user_id.in_(chunk), ts_column >= since)
+            events.extend(event_for(row) for row in rows.yield_per(1000))
+        for ev in sorted(events, key=lambda e: e.at):
+            apply_event(snapshots[ev.user_id], ev)
+
+        existing = {s.user_id: s for s in session.query(StudentRiskSnapshot).filter(StudentRiskSnapshot.user_id.in_(chunk))}
+        for user_id, fresh in snapshots.items():
+            roll(fresh)
+            target = existing.get(user_id)
+            if target is None:
+                session.add(fresh)
+                continue
+            for column in StudentRiskSnapshot.__table__.columns:
+                setattr(target, column.key, getattr(fresh, column.key))
+        session.commit()
+        rebuilt += len(chunk)
+    return rebuilt
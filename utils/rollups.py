@@ -0,0 +1,203 @@
+"""
+Daily rollups for trend and stats endpoints.
+
+    daily_user_activity  (user_id, date, activity_type) -> count, total_duration
+        UserActivityLog rows under their activity_type, MeditationSession rows under
+        'meditation_session:<session_type>', Assessment rows under 'assessment:<type>'
+    daily_org_emotions   (organization_id, date, emotional_state) -> count, elevated_count
+        ChatIntent rows of the organisation's users (users without one are not rolled up)
+
+Rows added through the ORM are folded in by a before_flush listener with one
+INSERT ... ON CONFLICT DO UPDATE per table, in the same transaction as the rows
+themselves; Core bulk inserts (the chat write-behind flusher) call record_intents().
+rollup_previous_day (Celery beat, 00:15 UTC) recomputes yesterday from the raw tables,
+which also corrects for deletes and writes that bypassed the hooks.
+rebuild_rollups() / backfill_rollups.py recompute any date range.
+
+Readers sum O(days x types) rows instead of scanning events.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, select, func, case, literal
+from sqlalchemy.orm import Session
+
+from db_models import (User, UserActivityLog, MeditationSession, Assessment, ChatIntent,
+                       DailyUserActivity, DailyOrgEmotions)
+from utils.celery_app import celery
+from utils.risk_snapshot import ELEVATED_INTENSITIES
+
+MEDITATION_PREFIX = 'meditation_session:'
+ASSESSMENT_PREFIX = 'assessment:'
+
+
+def _day(value):
+    if value is None:
+        return datetime.utcnow().date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value.date() if isinstance(value, datetime) else value
+
+
+def activity_fact(obj):
+    """(user_id, date, activity_type, duration) for a new row, or None"""
+    if isinstance(obj, UserActivityLog):
+        return obj.user_id, _day(obj.timestamp), obj.activity_type, obj.duration or 0
+    if isinstance(obj, MeditationSession):
+        return obj.user_id, _day(obj.completed_at), f"{MEDITATION_PREFIX}{obj.session_type}", obj.duration or 0
+    if isinstance(obj, Assessment):
+        return obj.user_id, _day(obj.completed_at), f"{ASSESSMENT_PREFIX}{obj.assessment_type}", 0
+    return None
+
+
+def _insert_for(session):
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _upsert(session, model, rows, counters):
+    """Add rows' counters to existing rows (sorted, so concurrent writers lock in one order)"""
+    if not rows:
+        return
+    stmt = _insert_for(session)(model).values(sorted(rows, key=lambda r: tuple(r[c.key] for c in model.__table__.primary_key)))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[c.key for c in model.__table__.primary_key],
+        set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in counters}
+    )
+    session.execute(stmt)
+
+
+def record_activity(session, facts):
+    totals = defaultdict(lambda: [0, 0])
+    for user_id, day, activity_type, duration in facts:
+        totals[(user_id, day, activity_type)][0] += 1
+        totals[(user_id, day, activity_type)][1] += duration
+    _upsert(session, DailyUserActivity, [
+        {'user_id': uid, 'date': day, 'activity_type': t, 'count': n, 'total_duration': d}
+        for (uid, day, t), (n, d) in totals.items()
+    ], ('count', 'total_duration'))
+
+
+def record_intents(session, intents):
+    """Fold intents ({user_id, timestamp, emotional_state, emotional_intensity}) into daily_org_emotions"""
+    user_ids = {i['user_id'] for i in intents}
+    if not user_ids:
+        return
+    orgs = dict(session.connection().execute(
+        select(User.id, User.organization_id).where(User.id.in_(user_ids))
+    ).all())
+    totals = defaultdict(lambda: [0, 0])
+    for i in intents:
+        org_id = orgs.get(i['user_id'])
+        if org_id:
+            key = (org_id, _day(i['timestamp']), i['emotional_state'] or 'unknown')
+            totals[key][0] += 1
+            totals[key][1] += i['emotional_intensity'] in ELEVATED_INTENSITIES
+    _upsert(session, DailyOrgEmotions, [
+        {'organization_id': org, 'date': day, 'emotional_state': state, 'count': n, 'elevated_count': e}
+        for (org, day, state), (n, e) in totals.items()
+    ], ('count', 'elevated_count'))
+
+
+@event.listens_for(Session, 'before_flush')
+def update_rollups_before_flush(session, flush_context, instances):
+    facts = [f for f in (activity_fact(obj) for obj in session.new) if f]
+    intents = [{'user_id': obj.user_id, 'timestamp': obj.timestamp, 'emotional_state': obj.emotional_state,
+                'emotional_intensity': obj.emotional_intensity} for obj in session.new if isinstance(obj, ChatIntent)]
+    if facts or intents:
+        with session.no_autoflush:
+            record_activity(session, facts)
+            record_intents(session, intents)
+
+
+def activity_totals(user_id, since=None):
+    """{activity_type: (count, total_duration)} for a user, optionally from a date on"""
+    query = DailyUserActivity.query.with_entities(
+        DailyUserActivity.activity_type, func.sum(DailyUserActivity.count), func.sum(DailyUserActivity.total_duration)
+    ).filter(DailyUserActivity.user_id == user_id)
+    if since:
+        query = query.filter(DailyUserActivity.date >= since)
+    return {t: (int(n or 0), int(d or 0)) for t, n, d in query.group_by(DailyUserActivity.activity_type)}
+
+
+def logged_activity(totals):
+    """Only the UserActivityLog types (no ':'-prefixed model counters)"""
+    return {t: v for t, v in totals.items() if ':' not in t}
+
+
+def prefixed_total(totals, prefix):
+    """(count, total_duration) summed over one model's counters"""
+    matching = [v for t, v in totals.items() if t.startswith(prefix)]
+    return sum(n for n, _ in matching), sum(d for _, d in matching)
+
+
+def _merge(rows, counters):
+    merged = {}
+    for row in rows:
+        key = tuple(v for k, v in row.items() if k not in counters)
+        if key in merged:
+            for name in counters:
+                merged[key][name] += row[name]
+        else:
+            merged[key] = dict(row)
+    return list(merged.values())
+
+
+def rebuild_rollups(session, start, end):
+    """Recompute both tables for dates start..end (inclusive) from the raw rows"""
+    since = datetime.combine(start, datetime.min.time())
+    until = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    activity_rows = []
+    # Days come from the event timestamp, as on the write path
+    sources = [
+        (UserActivityLog, UserActivityLog.timestamp, UserActivityLog.activity_type, func.sum(UserActivityLog.duration)),
+        (MeditationSession, MeditationSession.completed_at,
+         literal(MEDITATION_PREFIX) + MeditationSession.session_type, func.sum(MeditationSession.duration)),
+        (Assessment, Assessment.completed_at, literal(ASSESSMENT_PREFIX) + Assessment.assessment_type, literal(0)),
+    ]
+    for model, ts, activity_type, duration in sources:
+        day = func.date(ts)
+        rows = session.query(model.user_id, day, activity_type, func.count(), duration).filter(
+            ts >= since, ts < until
+        ).group_by(model.user_id, day, activity_type)
+        activity_rows += [{'user_id': uid, 'date': _day(d), 'activity_type': t, 'count': n, 'total_duration': int(dur or 0)}
+                          for uid, d, t, n, dur in rows]
+
+    elevated = func.sum(case((ChatIntent.emotional_intensity.in_(ELEVATED_INTENSITIES), 1), else_=0))
+    intent_day = func.date(ChatIntent.timestamp)
+    emotion_rows = [
+        {'organization_id': org, 'date': _day(d), 'emotional_state': state or 'unknown', 'count': n, 'elevated_count': int(e or 0)}
+        for org, d, state, n, e in session.query(
+            User.organization_id, intent_day, ChatIntent.emotional_state, func.count(), elevated
+        ).join(User, User.id == ChatIntent.user_id).filter(
+            User.organization_id.isnot(None), ChatIntent.timestamp >= since, ChatIntent.timestamp < until
+        ).group_by(User.organization_id, intent_day, ChatIntent.emotional_state)
+    ]
+
+    session.query(DailyUserActivity).filter(DailyUserActivity.date.between(start, end)).delete(synchronize_session=False)
+    session.query(DailyOrgEmotions).filter(DailyOrgEmotions.date.between(start, end)).delete(synchronize_session=False)
+    # NULL and 'unknown' states share a key, so merge before inserting
+    _upsert(session, DailyUserActivity, _merge(activity_rows, ('count', 'total_duration')), ('count', 'total_duration'))
+    _upsert(session, DailyOrgEmotions, _merge(emotion_rows, ('count', 'elevated_count')), ('count', 'elevated_count'))
+    session.commit()
+    return len(activity_rows), len(emotion_rows)
+
+
+@celery.task
+def rollup_previous_day():
+    """Nightly (beat): recompute yesterday's rollups from the raw tables"""
+    from app import app
+    from database import db
+    with app.app_context():
+        day = datetime.utcnow().date() - timedelta(days=1)
+        try:
+            activity, emotions = rebuild_rollups(db.session, day, day)
+            print(f"📊 Rolled up {day}: {activity} activity groups, {emotions} emotion groups")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Rollup for {day} failed: {e}")
+            raise
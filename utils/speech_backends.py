@@ -0,0 +1,279 @@
+"""
+Speech backends behind SarvamVoiceService.
+
+A TTS backend has a `voice` id (part of the audio cache key, so changing voice or
+model never serves old audio) and synthesize(text, language_code) -> WAV bytes; an
+STT backend has transcribe(audio_path) -> text.
+
+    TTS_BACKEND   'sarvam' (default, the remote API), 'piper' or 'stub'
+    STT_BACKEND   'sarvam' (default) or 'vosk'
+
+The local backends load their models once per worker process and reuse them:
+
+- Vosk: one Model (VOSK_MODEL_PATH, the bundled vosk-model/ by default) and a pool of
+  up to VOSK_POOL_SIZE KaldiRecognizers per sample rate, reset between uses. Audio is
+  fed through RecognitionStream in PCM_CHUNK_BYTES chunks, the same path the
+  streaming socket uses. Non-WAV uploads are decoded with ffmpeg.
+- Piper: one PiperVoice (ONNX session) for PIPER_MODEL_PATH, with its .onnx.json
+  config beside it, serialised by a lock.
+
+StubTTSBackend needs no network or models: it renders a quiet tone as long as the
+text would take to speak, after STUB_TTS_LATENCY_MS, so the voice endpoints, the
+audio cache and benchmarks run offline.
+
+benchmarks/speech_rtf_bench.py measures latency and real-time factor per backend.
+"""
+import io
+import json
+import math
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import wave
+from contextlib import contextmanager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TTS_BACKEND = os.environ.get('TTS_BACKEND', 'sarvam')
+STT_BACKEND = os.environ.get('STT_BACKEND', 'sarvam')
+
+VOSK_MODEL_PATH = os.environ.get('VOSK_MODEL_PATH', os.path.join(ROOT_DIR, 'vosk-model'))
+VOSK_POOL_SIZE = int(os.environ.get('VOSK_POOL_SIZE', 2))
+VOSK_ACQUIRE_TIMEOUT = float(os.environ.get('VOSK_ACQUIRE_TIMEOUT', 10))
+VOSK_SAMPLE_RATE = 16000
+PCM_CHUNK_BYTES = 8000  # 0.25 s of 16 kHz 16-bit mono
+
+PIPER_MODEL_PATH = os.environ.get('PIPER_MODEL_PATH', os.path.join(ROOT_DIR, 'hi_IN-priyamvada-medium.onnx'))
+
+STUB_SAMPLE_RATE = 16000
+STUB_SECONDS_PER_CHAR = 0.06
+
+
+def pcm_to_wav(pcm, sample_rate, channels=1, sample_width=2):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def concat_wav(parts):
+    """One WAV from WAVs of the same format"""
+    if len(parts) == 1:
+        return parts[0]
+    params, frames = None, []
+    for data in parts:
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            params = params or wav.getparams()
+            frames.append(wav.readframes(wav.getnframes()))
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setparams(params)
+        wav.writeframes(b''.join(frames))
+    return buffer.getvalue()
+
+
+class StubTTSBackend:
+    voice = 'stub'
+
+    def __init__(self, latency_ms=None):
+        self.latency = (latency_ms if latency_ms is not None else int(os.environ.get('STUB_TTS_LATENCY_MS', 0))) / 1000
+
+    def synthesize(self, text, language_code):
+        if self.latency:
+            time.sleep(self.latency)
+        frames = int(max(0.3, len(text) * STUB_SECONDS_PER_CHAR) * STUB_SAMPLE_RATE)
+        pitch = 220 if language_code == 'hi-IN' else 330
+        pcm = b''.join(
+            struct.pack('<h', int(2000 * math.sin(2 * math.pi * pitch * i / STUB_SAMPLE_RATE)))
+            for i in range(frames)
+        )
+        return pcm_to_wav(pcm, STUB_SAMPLE_RATE)
+
+
+class RecognizerPool:
+    """One Vosk model and reusable recognizers for it, at most `size` per sample rate"""
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, size=VOSK_POOL_SIZE):
+        self.model_path = model_path
+        self.size = size
+        self._model = None
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._created = {}
+
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                import vosk
+                vosk.SetLogLevel(-1)
+                self._model = vosk.Model(self.model_path)
+            return self._model
+
+    def acquire(self, sample_rate=VOSK_SAMPLE_RATE):
+        """A recognizer for sample_rate; hand it back with release()"""
+        model = self.model()
+        with self._lock:
+            idle = self._idle.setdefault(sample_rate, queue.LifoQueue())
+            try:
+                return idle.get_nowait()
+            except queue.Empty:
+                pass
+            if self._created.get(sample_rate, 0) < self.size:
+                self._created[sample_rate] = self._created.get(sample_rate, 0) + 1
+                import vosk
+                return vosk.KaldiRecognizer(model, sample_rate)
+        # Every recognizer is busy: wait for one rather than load more
+        return idle.get(timeout=VOSK_ACQUIRE_TIMEOUT)
+
+    def release(self, rec, sample_rate=VOSK_SAMPLE_RATE):
+        rec.Reset()
+        self._idle[sample_rate].put(rec)
+
+    @contextmanager
+    def recognizer(self, sample_rate=VOSK_SAMPLE_RATE):
+        rec = self.acquire(sample_rate)
+        try:
+            yield rec
+        finally:
+            self.release(rec, sample_rate)
+
+
+class RecognitionStream:
+    """Incremental recognition over one checked-out recognizer"""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.segments = []
+
+    def accept(self, pcm):
+        """Feed 16-bit mono PCM; ('final', segment) at an utterance boundary, else ('partial', text so far)"""
+        if self.recognizer.AcceptWaveform(pcm):
+            text = json.loads(self.recognizer.Result()).get('text', '')
+            if text:
+                self.segments.append(text)
+            return 'final', text
+        return 'partial', json.loads(self.recognizer.PartialResult()).get('partial', '')
+
+    def finish(self):
+        """The whole transcript, flushing the recognizer"""
+        text = json.loads(self.recognizer.FinalResult()).get('text', '')
+        if text:
+            self.segments.append(text)
+        return ' '.join(self.segments)
+
+
+def pcm_chunks(audio_path, chunk_bytes=PCM_CHUNK_BYTES):
+    """(sample_rate, iterator of 16-bit mono PCM chunks) for an audio file"""
+    try:
+        wav = wave.open(audio_path, 'rb')
+    except (wave.Error, EOFError):
+        wav = None
+    if wav and wav.getsampwidth() == 2 and wav.getnchannels() == 1 and wav.getcomptype() == 'NONE':
+        def read_wav():
+            with wav:
+                frames = chunk_bytes // 2
+                while True:
+                    data = wav.readframes(frames)
+                    if not data:
+                        return
+                    yield data
+        return wav.getframerate(), read_wav()
+    if wav:
+        wav.close()
+    if not shutil.which('ffmpeg'):
+        raise ValueError("Local STT needs 16-bit mono WAV audio, or ffmpeg to decode other formats")
+
+    def decode():
+        proc = subprocess.Popen(
+            ['ffmpeg', '-loglevel', 'error', '-i', audio_path, '-ar', str(VOSK_SAMPLE_RATE), '-ac', '1', '-f', 's16le', '-'],
+            stdout=subprocess.PIPE
+        )
+        try:
+            while True:
+                data = proc.stdout.read(chunk_bytes)
+                if not data:
+                    return
+                yield data
+        finally:
+            proc.stdout.close()
+            proc.wait()
+    return VOSK_SAMPLE_RATE, decode()
+
+
+class VoskSTTBackend:
+    def __init__(self, pool=None):
+        self.pool = pool or RecognizerPool()
+
+    def transcribe(self, audio_path):
+        sample_rate, chunks = pcm_chunks(audio_path)
+        with self.pool.recognizer(sample_rate) as rec:
+            stream = RecognitionStream(rec)
+            for chunk in chunks:
+                stream.accept(chunk)
+            return stream.finish()
+
+
+class PiperTTSBackend:
+    def __init__(self, model_path=PIPER_MODEL_PATH):
+        self.model_path = model_path
+        self.voice = f"piper/{os.path.basename(model_path).removesuffix('.onnx')}"
+        self._piper = None
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, language_code):
+        # One ONNX session per worker; its phonemizer is not thread-safe
+        with self._lock:
+            if self._piper is None:
+                from piper import PiperVoice
+                self._piper = PiperVoice.load(self.model_path, config_path=f"{self.model_path}.json")
+            buffer = io.BytesIO()
+            with wave.open(buffer, 'wb') as wav:
+                if hasattr(self._piper, 'synthesize_wav'):
+                    self._piper.synthesize_wav(text, wav)
+                else:
+                    self._piper.synthesize(text, wav)
+        return buffer.getvalue()
+
+
+_local_backends = {}
+_local_backends_lock = threading.Lock()
+
+
+def _local(name, factory):
+    """Process-wide instance, so models are loaded once per worker"""
+    with _local_backends_lock:
+        if name not in _local_backends:
+            _local_backends[name] = factory()
+        return _local_backends[name]
+
+
+def tts_backend(name, sarvam):
+    """The TTS backend called name; sarvam is the service doing remote synthesis"""
+    if name == 'stub':
+        return StubTTSBackend()
+    if name == 'piper':
+        return _local('piper', PiperTTSBackend)
+    if name != 'sarvam':
+        raise ValueError(f"Unknown TTS_BACKEND {name!r}")
+    return sarvam
+
+
+def stt_backend(name, sarvam):
+    """The STT backend called name; sarvam is the service doing remote recognition"""
+    if name == 'vosk':
+        return _local('vosk', VoskSTTBackend)
+    if name != 'sarvam':
+        raise ValueError(f"Unknown STT_BACKEND {name!r}")
+    return sarvam
+
+
+def recognizer_pool():
+    """The worker's shared Vosk recognizer pool"""
+    return _local('vosk', VoskSTTBackend).pool
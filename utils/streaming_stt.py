@@ -0,0 +1,144 @@
+"""
+Incremental speech-to-text for live 16-bit mono PCM (16 kHz, or another of SAMPLE_RATES).
+
+StreamingTranscriber takes frames of any size as they arrive and returns events:
+
+    ('partial', {'text': ..., 'stable': ...})   transcript so far; `stable` is the
+                                                word prefix unchanged since the last one
+    ('final', {'transcript': ...})              the utterance ended (ENDPOINT_MS of
+                                                silence, MAX_UTTERANCE_MS, or finish())
+
+Audio is split into FRAME_MS frames for an adaptive energy VAD. A recognizer is only
+taken from the worker's Vosk pool once VAD_ONSET_FRAMES voiced frames arrive in a row
+(the PREROLL_MS before them are fed too, so the first syllable is kept), and it is
+handed back when the utterance ends. Silence between turns therefore holds no
+recognizer.
+"""
+import math
+import os
+from array import array
+from collections import deque
+
+from utils.speech_backends import VOSK_SAMPLE_RATE, RecognitionStream
+
+FRAME_MS = 20
+ENDPOINT_MS = int(os.environ.get('STT_ENDPOINT_MS', 800))
+PREROLL_MS = 300
+MAX_UTTERANCE_MS = int(os.environ.get('STT_MAX_UTTERANCE_MS', 30000))
+VAD_ONSET_FRAMES = 3
+VAD_RATIO = 3.0
+VAD_MIN_RMS = 300
+# Rates a client may ask for; each one gets its own recognizers in the pool
+SAMPLE_RATES = (8000, 16000, 48000)
+
+
+class EnergyVAD:
+    """Speech when a frame's RMS is well above the noise floor learnt from non-speech frames"""
+
+    def __init__(self, ratio=VAD_RATIO, min_rms=VAD_MIN_RMS):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.noise = None
+
+    def is_speech(self, frame):
+        samples = array('h', frame)
+        rms = math.sqrt(sum(s * s for s in samples) / len(samples)) if samples else 0.0
+        if self.noise is None:
+            self.noise = rms
+        speech = rms > max(self.min_rms, self.noise * self.ratio)
+        if not speech:
+            self.noise = 0.95 * self.noise + 0.05 * rms
+        return speech
+
+
+def _common_prefix(a, b):
+    prefix = []
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        prefix.append(x)
+    return prefix
+
+
+class StreamingTranscriber:
+    def __init__(self, pool, sample_rate=VOSK_SAMPLE_RATE, endpoint_ms=ENDPOINT_MS, max_utterance_ms=MAX_UTTERANCE_MS):
+        if type(sample_rate) is not int or sample_rate not in SAMPLE_RATES:
+            raise ValueError(f"Unsupported sample rate {sample_rate!r}; use one of {SAMPLE_RATES}")
+        self.pool = pool
+        self.sample_rate = sample_rate
+        self.endpoint_ms = endpoint_ms
+        self.max_utterance_ms = max_utterance_ms
+        self.frame_bytes = sample_rate * FRAME_MS // 1000 * 2
+        self.vad = EnergyVAD()
+        self.preroll = deque(maxlen=PREROLL_MS // FRAME_MS)
+        self.pending = b''
+        self.onset = 0
+        self.recognizer = None
+        self.stream = None
+
+    @property
+    def in_utterance(self):
+        return self.stream is not None
+
+    def feed(self, pcm):
+        """Events produced by this chunk of PCM"""
+        self.pending += pcm
+        events = []
+        while len(self.pending) >= self.frame_bytes:
+            frame, self.pending = self.pending[:self.frame_bytes], self.pending[self.frame_bytes:]
+            events += self._frame(frame)
+        return events
+
+    def finish(self):
+        """End the current utterance now (the client stopped sending)"""
+        if self.pending and self.stream:
+            self._accept(self.pending)
+        self.pending = b''
+        return self._end() if self.stream else []
+
+    def close(self):
+        """Give the recognizer back without a result"""
+        if self.recognizer is not None:
+            self.pool.release(self.recognizer, self.sample_rate)
+        self.recognizer = self.stream = None
+
+    def _frame(self, frame):
+        speech = self.vad.is_speech(frame)
+        if not self.stream:
+            self.preroll.append(frame)
+            self.onset = self.onset + 1 if speech else 0
+            if self.onset < VAD_ONSET_FRAMES:
+                return []
+            return self._begin()
+
+        self.utterance_ms += FRAME_MS
+        self.silence_ms = 0 if speech else self.silence_ms + FRAME_MS
+        events = self._accept(frame)
+        if self.silence_ms >= self.endpoint_ms or self.utterance_ms >= self.max_utterance_ms:
+            events += self._end()
+        return events
+
+    def _begin(self):
+        self.recognizer = self.pool.acquire(self.sample_rate)
+        self.stream = RecognitionStream(self.recognizer)
+        self.utterance_ms = len(self.preroll) * FRAME_MS
+        self.silence_ms = 0
+        self.words = []
+        audio = b''.join(self.preroll)
+        self.preroll.clear()
+        self.onset = 0
+        return self._accept(audio)
+
+    def _accept(self, pcm):
+        kind, text = self.stream.accept(pcm)
+        words = ' '.join(self.stream.segments if kind == 'final' else self.stream.segments + [text]).split()
+        if words == self.words:
+            return []
+        stable = _common_prefix(self.words, words)
+        self.words = words
+        return [('partial', {'text': ' '.join(words), 'stable': ' '.join(stable)})]
+
+    def _end(self):
+        transcript = self.stream.finish()
+        self.close()
+        return [('final', {'transcript': transcript})] if transcript else []
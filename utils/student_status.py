@@ -0,0 +1,124 @@
+"""
+Batched student status for mentor views.
+
+compute_student_statuses() applies the mentor status rules to a whole roster with a
+fixed number of queries instead of 5+ per student. Signals come from StudentRiskSnapshot
+rows (one query); students without a snapshot yet fall back to grouped/windowed queries
+over the history (latest crisis alert, last-10 intents, 7-day activity count). Snapshot
+activity counts use whole days (see utils/risk_snapshot.py).
+
+    Critical         latest crisis alert in the last 7 days is critical/high
+    Needs attention  >= 5 of the last 10 intents (7 days) are negative at moderate+ intensity
+    Doing well       >= 3 activities in 7 days, streak >= 3, no crisis alert in 7 days
+    Needs attention  < 2 activities in 7 days or streak < 2
+    Neutral          otherwise
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, case
+
+from database import db
+from db_models import ChatIntent, ChatSession, CrisisAlert, UserActivityLog, StudentRiskSnapshot
+from utils.risk_snapshot import NEGATIVE_STATES, ELEVATED_INTENSITIES, rolled_counts
+
+STATUS_WINDOW_DAYS = 7
+INTENT_SAMPLE = 10
+NEGATIVE_INTENT_THRESHOLD = 5
+
+
+def latest_crisis_severity(student_ids, since):
+    """user_id -> severity of the most recent crisis alert since `since`"""
+    ranked = db.session.query(
+        CrisisAlert.user_id,
+        CrisisAlert.severity,
+        func.row_number().over(partition_by=CrisisAlert.user_id, order_by=CrisisAlert.created_at.desc()).label('rn')
+    ).filter(CrisisAlert.user_id.in_(student_ids), CrisisAlert.created_at >= since).subquery()
+    rows = db.session.query(ranked.c.user_id, ranked.c.severity).filter(ranked.c.rn == 1)
+    return dict(rows.all())
+
+
+def negative_intent_counts(student_ids, since):
+    """user_id -> negative, elevated-intensity intents among the last INTENT_SAMPLE since `since`"""
+    ranked = db.session.query(
+        ChatIntent.user_id,
+        ChatIntent.emotional_state,
+        ChatIntent.emotional_intensity,
+        func.row_number().over(partition_by=ChatIntent.user_id, order_by=ChatIntent.timestamp.desc()).label('rn')
+    ).filter(ChatIntent.user_id.in_(student_ids), ChatIntent.timestamp >= since).subquery()
+    negative = case(
+        (ranked.c.emotional_state.in_(NEGATIVE_STATES) & ranked.c.emotional_intensity.in_(ELEVATED_INTENSITIES), 1),
+        else_=0
+    )
+    rows = db.session.query(ranked.c.user_id, func.sum(negative)).filter(
+        ranked.c.rn <= INTENT_SAMPLE
+    ).group_by(ranked.c.user_id)
+    return {user_id: int(count or 0) for user_id, count in rows.all()}
+
+
+def activity_counts(student_ids, since):
+    rows = db.session.query(UserActivityLog.user_id, func.count(UserActivityLog.id)).filter(
+        UserActivityLog.user_id.in_(student_ids),
+        UserActivityLog.timestamp >= since
+    ).group_by(UserActivityLog.user_id)
+    return dict(rows.all())
+
+
+def crisis_session_users(student_ids):
+    rows = db.session.query(ChatSession.user_id).filter(
+        ChatSession.user_id.in_(student_ids),
+        ChatSession.crisis_flag == True
+    ).distinct()
+    return {user_id for user_id, in rows.all()}
+
+
+def status_from_signals(crisis_severity, negative_intents, recent_activity, login_streak):
+    if crisis_severity in ('critical', 'high'):
+        return "Critical"
+    if negative_intents >= NEGATIVE_INTENT_THRESHOLD:
+        return "Needs attention"
+    if recent_activity >= 3 and login_streak >= 3 and not crisis_severity:
+        return "Doing well"
+    if recent_activity < 2 or login_streak < 2:
+        return "Needs attention"
+    return "Neutral"
+
+
+def snapshot_signals(snapshot, since):
+    """(crisis severity, negative intents, 7-day activity) from a StudentRiskSnapshot"""
+    crisis_severity = snapshot.latest_crisis_severity if snapshot.latest_crisis_at and snapshot.latest_crisis_at >= since else None
+    # recent_intents holds the last INTENT_SAMPLE intents, so the ones since `since` are exactly the rule's sample
+    negative = sum(flag for at, flag in snapshot.recent_intents or [] if at >= since.isoformat())
+    return crisis_severity, negative, rolled_counts(snapshot, STATUS_WINDOW_DAYS)['activities']
+
+
+def history_signals(student_ids, since):
+    """Same signals from grouped queries over the raw history"""
+    crisis = latest_crisis_severity(student_ids, since)
+    negative = negative_intent_counts(student_ids, since)
+    activity = activity_counts(student_ids, since)
+    return {uid: (crisis.get(uid), negative.get(uid, 0), activity.get(uid, 0)) for uid in student_ids}
+
+
+def compute_student_statuses(students):
+    """
+    {student_id: {'status', 'has_risk'}} for a list of User rows: two queries when every
+    student has a snapshot, five at most regardless of roster size.
+    """
+    if not students:
+        return {}
+    student_ids = [s.id for s in students]
+    since = datetime.utcnow() - timedelta(days=STATUS_WINDOW_DAYS)
+
+    snapshots = StudentRiskSnapshot.query.filter(StudentRiskSnapshot.user_id.in_(student_ids)).all()
+    signals = {snap.user_id: snapshot_signals(snap, since) for snap in snapshots}
+    missing = [uid for uid in student_ids if uid not in signals]
+    if missing:
+        signals.update(history_signals(missing, since))
+    at_risk = crisis_session_users(student_ids)
+
+    return {
+        s.id: {
+            'status': status_from_signals(*signals[s.id], s.login_streak or 0),
+            'has_risk': s.id in at_risk
+        } for s in students
+    }
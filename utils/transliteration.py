@@ -0,0 +1,227 @@
+"""
+Local Hinglish -> Devanagari transliteration for the voice path.
+
+Sarvam's hi-IN voices read Devanagari far better than Romanised Hindi, so replies to
+Hinglish speakers are rewritten word by word before TTS:
+
+    transliterate("Main samajh sakti hoon, thoda aaram karo")  # "मैं समझ सकती हूँ, थोड़ा आराम करो"
+
+1. HINGLISH_WORDS: common words whose spelling the rules would get wrong (retroflex
+   consonants, nasals, short/long vowels that Roman spelling hides).
+2. Rules for other words that look Hindi (an 'aa', an aspirated first consonant, or a
+   Hindi verb / possessive ending): consonants take a halant before another consonant,
+   a final 'a' / 'i' (or an 'a' before another vowel) is long, and 'n' after a vowel
+   before a consonant or at the end of a word becomes anusvara.
+3. Anything else (English, names, numbers, Devanagari) is kept as written; Sarvam reads
+   English words in Latin script naturally.
+
+Only sentences where at least half the Roman words are unambiguous Hindi words are
+rewritten, and only there do HOMOGRAPHS (main, log, mat, ...) and the rules apply, so an
+English reply ("The main thing is to keep a log") is never touched.
+
+Words and whole replies are memoised (LRU), so the fixed replies and repeated phrases
+cost a dictionary lookup. No network calls.
+"""
+import re
+from functools import lru_cache
+
+WORD_MEMO_SIZE = 8192
+TEXT_MEMO_SIZE = 1024
+
+HINGLISH_WORDS = {
+    # pronouns and possessives
+    'mai': 'मैं', 'mujhe': 'मुझे', 'mujhse': 'मुझसे', 'mera': 'मेरा', 'meri': 'मेरी',
+    'humein': 'हमें', 'hamara': 'हमारा', 'hamari': 'हमारी', 'hamare': 'हमारे',
+    'tum': 'तुम', 'tumhe': 'तुम्हें', 'tumhein': 'तुम्हें', 'tumhara': 'तुम्हारा', 'tumhari': 'तुम्हारी',
+    'tumhare': 'तुम्हारे', 'tu': 'तू', 'tera': 'तेरा', 'teri': 'तेरी', 'tere': 'तेरे', 'tujhe': 'तुझे',
+    'aap': 'आप', 'aapko': 'आपको', 'aapka': 'आपका', 'aapki': 'आपकी', 'aapke': 'आपके', 'aapse': 'आपसे',
+    'apna': 'अपना', 'apni': 'अपनी', 'apne': 'अपने', 'yeh': 'यह', 'ye': 'ये', 'woh': 'वह', 'wo': 'वो',
+    'voh': 'वह', 'isko': 'इसको', 'usko': 'उसको', 'iske': 'इसके', 'uske': 'उसके', 'koi': 'कोई', 'kisi': 'किसी',
+    'sab': 'सब', 'sabhi': 'सभी', 'kuch': 'कुछ', 'kuchh': 'कुछ',
+    # be / auxiliaries
+    'hai': 'है', 'hain': 'हैं', 'hoon': 'हूँ', 'hu': 'हूँ', 'ho': 'हो', 'hona': 'होना',
+    'hota': 'होता', 'hoti': 'होती', 'hote': 'होते', 'tha': 'था', 'thi': 'थी', 'hoga': 'होगा',
+    'hogi': 'होगी', 'honge': 'होंगे', 'raha': 'रहा', 'rahi': 'रही', 'rahe': 'रहे', 'gaya': 'गया', 'gayi': 'गई',
+    'gaye': 'गए', 'hua': 'हुआ', 'hui': 'हुई', 'jayega': 'जाएगा', 'jayegi': 'जाएगी',
+    'jaayega': 'जाएगा', 'sakta': 'सकता', 'sakti': 'सकती', 'sakte': 'सकते', 'chahiye': 'चाहिए',
+    # postpositions and particles
+    'ka': 'का', 'ki': 'की', 'ke': 'के', 'ko': 'को', 'se': 'से', 'mein': 'में', 'mei': 'में',
+    'tak': 'तक', 'liye': 'लिए', 'saath': 'साथ', 'sath': 'साथ', 'bina': 'बिना', 'bhi': 'भी',
+    'na': 'न', 'nahi': 'नहीं', 'nahin': 'नहीं', 'haan': 'हाँ', 'ji': 'जी',
+    'aur': 'और', 'lekin': 'लेकिन', 'kyunki': 'क्योंकि', 'agar': 'अगर',
+    'toh': 'तो', 'phir': 'फिर', 'fir': 'फिर', 'sirf': 'सिर्फ़',
+    'bahut': 'बहुत', 'bohot': 'बहुत', 'bahot': 'बहुत', 'zyada': 'ज़्यादा', 'jyada': 'ज़्यादा', 'kam': 'कम',
+    'thoda': 'थोड़ा', 'thodi': 'थोड़ी', 'thode': 'थोड़े', 'bilkul': 'बिल्कुल', 'zaroor': 'ज़रूर',
+    'jaroor': 'ज़रूर', 'shayad': 'शायद', 'sach': 'सच', 'sachmuch': 'सचमुच',
+    'dheere': 'धीरे', 'dhire': 'धीरे', 'gehri': 'गहरी', 'gehra': 'गहरा',
+    # questions
+    'kya': 'क्या', 'kyun': 'क्यों', 'kyu': 'क्यों', 'kyon': 'क्यों', 'kaise': 'कैसे', 'kaisa': 'कैसा',
+    'kaisi': 'कैसी', 'kab': 'कब', 'kahan': 'कहाँ', 'kaha': 'कहा', 'kaun': 'कौन', 'kitna': 'कितना',
+    'kitni': 'कितनी', 'kitne': 'कितने',
+    # time
+    'abhi': 'अभी', 'aaj': 'आज', 'raat': 'रात', 'subah': 'सुबह',
+    'shaam': 'शाम', 'waqt': 'वक़्त', 'samay': 'समय', 'pehle': 'पहले', 'baad': 'बाद', 'hamesha': 'हमेशा',
+    'kabhi': 'कभी', 'roz': 'रोज़',
+    # feelings and wellbeing
+    'acha': 'अच्छा', 'accha': 'अच्छा', 'achha': 'अच्छा', 'achi': 'अच्छी', 'acchi': 'अच्छी', 'achhi': 'अच्छी',
+    'acche': 'अच्छे', 'theek': 'ठीक', 'thik': 'ठीक', 'bura': 'बुरा', 'buri': 'बुरी',
+    'dukh': 'दुख', 'dukhi': 'दुखी', 'khush': 'ख़ुश', 'khushi': 'ख़ुशी', 'udaas': 'उदास', 'udas': 'उदास',
+    'pareshan': 'परेशान', 'pareshaan': 'परेशान', 'chinta': 'चिंता',
+    'darr': 'डर', 'gussa': 'ग़ुस्सा', 'akela': 'अकेला', 'akeli': 'अकेली', 'akele': 'अकेले', 'thaka': 'थका',
+    'thaki': 'थकी', 'thakan': 'थकान', 'dil': 'दिल', 'mann': 'मन', 'dimag': 'दिमाग़', 'dimaag': 'दिमाग़',
+    'neend': 'नींद', 'saans': 'साँस', 'aaram': 'आराम', 'araam': 'आराम', 'shanti': 'शांति', 'sukoon': 'सुकून',
+    'himmat': 'हिम्मत', 'madad': 'मदद', 'sahara': 'सहारा', 'pyaar': 'प्यार', 'pyar': 'प्यार',
+    'zindagi': 'ज़िंदगी', 'jindagi': 'ज़िंदगी', 'jeevan': 'जीवन', 'sehat': 'सेहत', 'dard': 'दर्द',
+    # people and places
+    'yaar': 'यार', 'dost': 'दोस्त', 'bhai': 'भाई', 'behen': 'बहन', 'maa': 'माँ', 'papa': 'पापा',
+    'logon': 'लोगों', 'ghar': 'घर', 'pariwar': 'परिवार', 'parivar': 'परिवार',
+    'padhai': 'पढ़ाई', 'kaam': 'काम', 'baat': 'बात', 'baatein': 'बातें', 'cheez': 'चीज़', 'cheezein': 'चीज़ें',
+    'tarah': 'तरह', 'tareeka': 'तरीका', 'tarika': 'तरीका',
+    # verbs
+    'karo': 'करो', 'karein': 'करें', 'kare': 'करे', 'karna': 'करना', 'karta': 'करता', 'karti': 'करती',
+    'karte': 'करते', 'kar': 'कर', 'kiya': 'किया', 'kijiye': 'कीजिए', 'lo': 'लो', 'lijiye': 'लीजिए',
+    'lena': 'लेना', 'dijiye': 'दीजिए', 'dena': 'देना', 'batao': 'बताओ', 'bataiye': 'बताइए',
+    'bataye': 'बताएं', 'bolo': 'बोलो', 'bolna': 'बोलना', 'suno': 'सुनो', 'sunna': 'सुनना', 'socho': 'सोचो',
+    'sochna': 'सोचना', 'samjho': 'समझो', 'samajh': 'समझ', 'samajhta': 'समझता', 'samajhti': 'समझती',
+    'samjha': 'समझा', 'lagta': 'लगता', 'lagti': 'लगती', 'lagte': 'लगते', 'laga': 'लगा', 'lage': 'लगे',
+    'chahta': 'चाहता', 'chahti': 'चाहती', 'chahte': 'चाहते', 'jao': 'जाओ', 'jana': 'जाना', 'jaata': 'जाता',
+    'jaati': 'जाती', 'aao': 'आओ', 'aana': 'आना', 'aata': 'आता', 'aati': 'आती', 'raho': 'रहो', 'rehna': 'रहना',
+    'dekho': 'देखो', 'dekhna': 'देखना', 'milna': 'मिलना', 'mila': 'मिला', 'mili': 'मिली',
+    # greetings
+    'namaste': 'नमस्ते', 'namaskar': 'नमस्कार', 'shukriya': 'शुक्रिया', 'dhanyavaad': 'धन्यवाद',
+    'dhanyawad': 'धन्यवाद', 'alvida': 'अलविदा',
+}
+
+# Hindi words that are also English words: only transliterated inside a Hindi sentence
+HOMOGRAPHS = {
+    'main': 'मैं', 'log': 'लोग', 'mat': 'मत', 'tab': 'तब', 'din': 'दिन', 'par': 'पर', 'hum': 'हम',
+    'ham': 'हम', 'ab': 'अब', 'bas': 'बस', 'kal': 'कल', 'dar': 'डर', 'jab': 'जब', 'hue': 'हुए',
+    'ache': 'अच्छे', 'mere': 'मेरे', 'ya': 'या', 'pe': 'पे', 'hun': 'हूँ',
+}
+
+# Endings English words rarely have ('-ate', '-on' and the like would catch English)
+HINDI_SUFFIXES = (
+    'iye', 'iyo', 'enge', 'engi', 'unga', 'ungi', 'oge', 'ogi', 'wala', 'wali', 'wale', 'kar', 'ega', 'egi',
+)
+ASPIRATED_STARTS = ('bh', 'dh', 'jh', 'kh', 'chh')
+
+HALANT = '्'
+ANUSVARA = 'ं'
+
+# Longest spelling first
+CONSONANTS = {
+    'cch': 'च्छ', 'chh': 'छ', 'ch': 'च', 'kh': 'ख', 'gh': 'घ', 'jh': 'झ', 'th': 'थ', 'dh': 'ध',
+    'ph': 'फ', 'bh': 'भ', 'sh': 'श', 'k': 'क', 'g': 'ग', 'c': 'क', 'j': 'ज', 't': 'त', 'd': 'द',
+    'n': 'न', 'p': 'प', 'f': 'फ़', 'b': 'ब', 'm': 'म', 'y': 'य', 'r': 'र', 'l': 'ल', 'v': 'व',
+    'w': 'व', 's': 'स', 'h': 'ह', 'z': 'ज़', 'q': 'क़', 'x': 'क्स',
+}
+# spelling -> (independent vowel, matra after a consonant)
+VOWELS = {
+    'aa': ('आ', 'ा'), 'ai': ('ऐ', 'ै'), 'au': ('औ', 'ौ'), 'ee': ('ई', 'ी'), 'ii': ('ई', 'ी'),
+    'oo': ('ऊ', 'ू'), 'uu': ('ऊ', 'ू'), 'a': ('अ', ''), 'i': ('इ', 'ि'), 'u': ('उ', 'ु'),
+    'e': ('ए', 'े'), 'o': ('ओ', 'ो'),
+}
+# Word-final short vowels that Hinglish spelling writes for long ones (mera, meri)
+FINAL_LONG = {'a': 'ा', 'i': 'ी'}
+
+WORD_RE = re.compile(r"[A-Za-z]+")
+SENTENCE_RE = re.compile(r'[^.!?।\n]+[.!?।\n]*')
+
+
+def _match(table, word, i):
+    for length in (3, 2, 1):
+        chunk = word[i:i + length]
+        if len(chunk) == length and chunk in table:
+            return chunk
+    return None
+
+
+def rule_transliterate(word):
+    """Phonetic Devanagari for a lowercase Roman Hindi word"""
+    out = []
+    previous = None  # 'consonant', 'vowel' (explicit), 'inherent' (consonant + short a)
+    i = 0
+    while i < len(word):
+        vowel = _match(VOWELS, word, i)
+        if vowel:
+            independent, matra = VOWELS[vowel]
+            at_end = i + len(vowel) == len(word)
+            if previous == 'consonant' and word[i:] == 'iye':
+                # -iye is spelt -िए (kijiye, chhodiye)
+                out.append('िए')
+                break
+            if previous == 'consonant':
+                if vowel == 'a' and _match(VOWELS, word, i + 1):
+                    # a before another vowel is long (bataoge, jaiye)
+                    matra = 'ा'
+                out.append(FINAL_LONG[vowel] if at_end and vowel in FINAL_LONG else matra)
+                previous = 'inherent' if vowel == 'a' and not at_end else 'vowel'
+            else:
+                out.append(independent)
+                previous = 'vowel'
+            i += len(vowel)
+            continue
+
+        consonant = _match(CONSONANTS, word, i)
+        if not consonant:
+            out.append(word[i])
+            previous = None
+            i += 1
+            continue
+        following = word[i + len(consonant):i + len(consonant) + 1]
+        if consonant == 'n' and previous in ('vowel', 'inherent') and following and following not in 'aeiouyh':
+            # n before another consonant: anusvara (thanda, sambandh)
+            out.append(ANUSVARA)
+            previous = 'vowel'
+        elif consonant == 'n' and previous == 'vowel' and not following:
+            # nasalised final vowel (hain, nahin)
+            out.append(ANUSVARA)
+        else:
+            if previous == 'consonant':
+                out.append(HALANT)
+            out.append(CONSONANTS[consonant])
+            previous = 'consonant'
+        i += len(consonant)
+    return ''.join(out)
+
+
+def looks_hindi(word):
+    """Whether an unknown lowercase Roman word is probably Hindi rather than English"""
+    return 'aa' in word or word.startswith(ASPIRATED_STARTS) or (len(word) > 3 and word.endswith(HINDI_SUFFIXES))
+
+
+@lru_cache(maxsize=WORD_MEMO_SIZE)
+def transliterate_word(word):
+    """Devanagari for a Roman Hindi word, or the word unchanged if it is not Hindi"""
+    lower = word.lower()
+    if lower in HINGLISH_WORDS:
+        return HINGLISH_WORDS[lower]
+    if lower in HOMOGRAPHS:
+        return HOMOGRAPHS[lower]
+    if looks_hindi(lower):
+        return rule_transliterate(lower)
+    return word
+
+
+def is_hindi_sentence(sentence):
+    """At least half of the sentence's Roman words are unambiguous Hindi words"""
+    words = [word.lower() for word in WORD_RE.findall(sentence)]
+    return bool(words) and 2 * sum(word in HINGLISH_WORDS for word in words) >= len(words)
+
+
+def _transliterate_sentence(match):
+    sentence = match.group(0)
+    if not is_hindi_sentence(sentence):
+        return sentence
+    return WORD_RE.sub(lambda m: transliterate_word(m.group(0)), sentence)
+
+
+@lru_cache(maxsize=TEXT_MEMO_SIZE)
+def transliterate(text):
+    """text with the Roman Hindi words of its Hindi sentences in Devanagari; everything else untouched"""
+    return SENTENCE_RE.sub(_transliterate_sentence, text)
+
+
+def clear_memo():
+    transliterate_word.cache_clear()
+    transliterate.cache_clear()
@@ -14,7 +14,7 @@ def upload_profile_picture(self, user_id, file_content, filename, content_type):
     try:
         from utils.supabase_client import supabase
         from db_models import User
-        from database import db, r_sessions
+        from database import db
         
         if not supabase:
             logging.error("Supabase client not initialized")
@@ -36,11 +36,9 @@ def upload_profile_picture(self, user_id, file_content, filename, content_type):
         user = User.query.get(user_id)
         if user:
             user.profile_picture = public_url
+            # The user.updated event on commit drops the cached profile
             db.session.commit()
             
-            # Invalidate profile cache
-            r_sessions.delete(f"user_profile:{user_id}")
-            
             logging.info(f"Profile picture uploaded for user {user_id}: {public_url}")
             return {'success': True, 'url': public_url}
         else:
@@ -0,0 +1,265 @@
+"""
+Shared community feed for the venting hall.
+
+Every viewer reads the same Redis structures (cache db 2):
+
+    venting_feed:index      sorted set of the newest FEED_WINDOW posts, all at score 0 and
+                            ordered by member "<created_at>#<id>", so a keyset page is one
+                            ZREVRANGEBYLEX from the cursor
+    venting_feed:posts      hash post id -> summary JSON (content, author id, responses)
+    venting_feed:authors    hash user id -> username, filled in one query per page on a miss
+
+Like counts and "liked by me" are merged in at read time from utils.like_store, so a
+new post, response or like touches one entry instead of leaving a copy of the feed
+per user stale. The feed is built from the database on the first read (one query
+for posts with their responses, one for authors) and kept current by the venting.*
+cache events; every key has FEED_TTL as a backstop. Pages beyond the
+window, and every page while Redis is unavailable, are read from the database.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+
+import redis
+from sqlalchemy.orm import selectinload
+
+from database import r_cache
+from db_models import User, VentingPost, VentingPostLike
+from utils import like_store
+from utils.cache_events import on_event
+from utils.pagination import encode_cursor, keyset_page
+
+FEED_WINDOW = int(os.environ.get('VENTING_FEED_WINDOW', 1000))
+FEED_TTL = 3600
+
+INDEX_KEY = 'venting_feed:index'
+POSTS_KEY = 'venting_feed:posts'
+AUTHORS_KEY = 'venting_feed:authors'
+WARM_LOCK_KEY = 'venting_feed:warming'
+
+
+def _member(created_at, post_id):
+    return f"{created_at:%Y-%m-%dT%H:%M:%S.%f}#{post_id:010d}"
+
+
+def _summary(post):
+    """Cacheable, viewer-independent view of a post (responses loaded)"""
+    return {
+        'id': post.id,
+        'member': _member(post.created_at, post.id),
+        'user_id': post.user_id,
+        'content': post.content,
+        'anonymous': post.anonymous,
+        'created_at': post.created_at.isoformat(),
+        # As last written back; like_store has the live count
+        'likes': post.likes or 0,
+        'responses': [{
+            'id': r.id,
+            'user_id': r.user_id,
+            'content': r.content,
+            'anonymous': r.anonymous,
+            'created_at': r.created_at.isoformat()
+        } for r in sorted(post.responses, key=lambda r: r.id)]
+    }
+
+
+def _with_responses(query):
+    return query.options(selectinload(VentingPost.responses))
+
+
+def _author_ids(summaries):
+    ids = set()
+    for s in summaries:
+        if not s['anonymous']:
+            ids.add(s['user_id'])
+        ids.update(r['user_id'] for r in s['responses'] if not r['anonymous'])
+    return ids
+
+
+def _usernames(user_ids):
+    if not user_ids:
+        return {}
+    return dict(User.query.with_entities(User.id, User.username).filter(User.id.in_(user_ids)).all())
+
+
+def render(summaries, likes, authors, liked_ids, user_id):
+    """Feed items as the Community page expects them"""
+    def author(item):
+        return 'Anonymous' if item['anonymous'] else authors.get(item['user_id'], 'Unknown')
+    return [{
+        'id': s['id'],
+        'content': s['content'],
+        'anonymous': s['anonymous'],
+        'author': author(s),
+        'created_at': s['created_at'],
+        'likes': likes.get(s['id'], s['likes']),
+        'liked_by_me': s['id'] in liked_ids,
+        'responses': [{
+            'id': r['id'],
+            'content': r['content'],
+            'author': author(r),
+            'created_at': r['created_at']
+        } for r in s['responses']],
+        'responses_count': len(s['responses']),
+        'is_owner': s['user_id'] == user_id
+    } for s in summaries]
+
+
+def _next_cursor(summaries, limit):
+    if len(summaries) <= limit:
+        return None
+    last = summaries[limit - 1]
+    return encode_cursor(datetime.fromisoformat(last['created_at']), last['id'])
+
+
+def _database_page(user_id, limit, after):
+    posts, next_cursor = keyset_page(_with_responses(VentingPost.query), VentingPost.created_at, VentingPost.id,
+                                     limit, after)
+    summaries = [_summary(p) for p in posts]
+    liked = {post_id for (post_id,) in VentingPostLike.query.with_entities(VentingPostLike.post_id).filter(
+        VentingPostLike.user_id == user_id, VentingPostLike.post_id.in_([p.id for p in posts])
+    )} if posts else set()
+    return render(summaries, {}, _usernames(_author_ids(summaries)),
+                  liked, user_id), next_cursor
+
+
+def _store(pipe, posts):
+    for post in posts:
+        summary = _summary(post)
+        pipe.hset(POSTS_KEY, post.id, json.dumps(summary))
+        pipe.zadd(INDEX_KEY, {summary['member']: 0})
+
+
+def _trim(client):
+    """Drop posts that fell out of the window (the oldest, lowest members)"""
+    excess = client.zcard(INDEX_KEY) - FEED_WINDOW
+    if excess <= 0:
+        return
+    dropped = client.zrange(INDEX_KEY, 0, excess - 1)
+    ids = [int(m.split(b'#')[1]) for m in dropped if b'#' in m]
+    pipe = client.pipeline(transaction=True)
+    pipe.zrem(INDEX_KEY, *dropped)
+    if ids:
+        pipe.hdel(POSTS_KEY, *ids)
+    pipe.execute()
+
+
+def warm_feed(client=None):
+    """Build the feed structures from the database; False if another caller is already building them"""
+    client = client or r_cache
+    if not client.set(WARM_LOCK_KEY, 1, nx=True, ex=30):
+        return False
+    try:
+        posts = _with_responses(VentingPost.query).order_by(
+            VentingPost.created_at.desc(), VentingPost.id.desc()
+        ).limit(FEED_WINDOW).all()
+        pipe = client.pipeline(transaction=True)
+        pipe.delete(INDEX_KEY, POSTS_KEY)
+        _store(pipe, posts)
+        if not posts:
+            # An empty feed is still a built feed
+            pipe.zadd(INDEX_KEY, {'': 0})
+        for key in (INDEX_KEY, POSTS_KEY):
+            pipe.expire(key, FEED_TTL)
+        pipe.execute()
+        return True
+    finally:
+        client.delete(WARM_LOCK_KEY)
+
+
+def refresh_posts(post_ids, client=None):
+    """Re-read posts (new, edited, with new responses, or deleted) into a built feed"""
+    client = client or r_cache
+    post_ids = set(post_ids)
+    try:
+        if not post_ids or not client.exists(INDEX_KEY):
+            return
+        posts = _with_responses(VentingPost.query).filter(VentingPost.id.in_(post_ids)).all()
+        gone = post_ids - {p.id for p in posts}
+        pipe = client.pipeline(transaction=True)
+        _store(pipe, posts)
+        if gone:
+            for cached in filter(None, client.hmget(POSTS_KEY, list(gone))):
+                pipe.zrem(INDEX_KEY, json.loads(cached)['member'])
+            pipe.hdel(POSTS_KEY, *gone)
+        pipe.execute()
+        _trim(client)
+    except redis.RedisError as e:
+        logging.warning(f"⚠️ Could not refresh venting feed posts {sorted(post_ids)}: {e}")
+
+
+def _authors(client, summaries):
+    ids = sorted(_author_ids(summaries))
+    if not ids:
+        return {}
+    authors = {user_id: name.decode() for user_id, name in zip(ids, client.hmget(AUTHORS_KEY, ids)) if name}
+    missing = _usernames(set(ids) - authors.keys())
+    if missing:
+        pipe = client.pipeline(transaction=True)
+        pipe.hset(AUTHORS_KEY, mapping=missing)
+        pipe.expire(AUTHORS_KEY, FEED_TTL)
+        pipe.execute()
+        authors.update(missing)
+    return authors
+
+
+def _cached_page(client, user_id, limit, after):
+    """(items, next_cursor) from the shared feed, or None when it cannot serve this page"""
+    if after and after[0] is None:
+        # A cursor among undated posts: only the database orders those
+        return None
+    if not client.exists(INDEX_KEY) and not warm_feed(client):
+        return None
+    if limit is None:
+        # The whole feed, which the cache holds only while it is shorter than the window
+        limit = client.zcard(INDEX_KEY)
+        if limit >= FEED_WINDOW:
+            return None
+    start = f"({_member(*after)}" if after else '+'
+    members = [m.decode() for m in client.zrevrangebylex(INDEX_KEY, start, '-', start=0, num=limit + 1)]
+    members = [m for m in members if m]
+    if len(members) <= limit and client.zcard(INDEX_KEY) >= FEED_WINDOW:
+        # The page runs past the oldest cached post
+        return None
+    post_ids = [int(m.split('#')[1]) for m in members]
+    if not post_ids:
+        return [], None
+
+    cached = client.hmget(POSTS_KEY, post_ids)
+    if not all(cached):
+        # Raced with a refresh or trim; the database page is exact
+        return None
+    summaries = [json.loads(s) for s in cached]
+    page = summaries[:limit]
+    page_ids = [s['id'] for s in page]
+    items = render(page, like_store.like_counts(page_ids), _authors(client, page),
+                   like_store.liked_ids(user_id, page_ids), user_id)
+    return items, _next_cursor(summaries, limit)
+
+
+def feed_page(user_id, limit, after=None, client=None):
+    """(items, next_cursor) for one page of the community feed as seen by user_id"""
+    try:
+        page = _cached_page(client or r_cache, user_id, limit, after)
+        if page is not None:
+            return page
+    except redis.RedisError as e:
+        logging.warning(f"⚠️ Venting feed cache unavailable, reading from the database: {e}")
+    return _database_page(user_id, limit, after)
+
+
+@on_event('venting.post_created', 'venting.post_updated', 'venting.post_deleted')
+def refresh_feed_post(event):
+    refresh_posts([event['id']])
+
+
+@on_event('venting.response_created', 'venting.response_deleted')
+def refresh_feed_responses(event):
+    refresh_posts([event['post_id']])
+
+
+@on_event('user.updated')
+def forget_author(event):
+    # A changed username is read again on the next page that shows it
+    r_cache.hdel(AUTHORS_KEY, event['user_id'])
@@ -0,0 +1,110 @@
+"""
+Speak a chat reply sentence by sentence while it is still being generated.
+
+speak_turn() wraps the (event, data) stream of a chat turn (stream_chat_turn with
+plain tuples) and adds
+
+    audio  {seq, text, audio_url}
+
+for each sentence of the reply, in order. Sentences are cut from the token deltas as
+they arrive (SentenceSplitter) and synthesised on tts_executor, so sentence 1 is being
+spoken while sentence 2 is generated; the client can start playback after the first
+sentence instead of after the whole reply. Audio comes from the audio cache, so
+repeated sentences cost a lookup.
+
+The chat events pass through unchanged. `done` is forwarded as soon as it arrives (the
+crisis flags must not wait for audio) and the remaining audio follows it. If no tokens
+were streamed (crisis override, keyword fallback), the final reply is spoken instead.
+"""
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+SENTENCE_END_RE = re.compile(r'(?<=[.!?।])["\')\]]*\s+|\n+')
+MIN_SENTENCE_CHARS = 20
+MAX_SENTENCE_CHARS = int(os.environ.get('TTS_MAX_CHARS', 500))
+
+tts_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('TTS_PIPELINE_WORKERS', 4)), thread_name_prefix='tts')
+
+
+class SentenceSplitter:
+    """Complete sentences out of streamed text; very short ones ("Hi!") join the next"""
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS, max_chars=MAX_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buffer = ''
+
+    def feed(self, delta):
+        self.buffer += delta
+        sentences = []
+        cut = self._cut()
+        while cut:
+            sentence, self.buffer = self.buffer[:cut].strip(), self.buffer[cut:]
+            if sentence:
+                sentences.append(sentence)
+            cut = self._cut()
+        return sentences
+
+    def finish(self):
+        rest, self.buffer = self.buffer.strip(), ''
+        return [rest] if rest else []
+
+    def _cut(self):
+        for match in SENTENCE_END_RE.finditer(self.buffer):
+            if len(self.buffer[:match.start()].strip()) >= self.min_chars:
+                return match.end()
+        if len(self.buffer) > self.max_chars:
+            # No sentence end in sight: break at the last comma or space
+            head = self.buffer[:self.max_chars]
+            cut = max(head.rfind(', '), head.rfind(' '))
+            return cut + 1 if cut > 0 else self.max_chars
+        return None
+
+
+def split_sentences(text, min_chars=MIN_SENTENCE_CHARS, max_chars=MAX_SENTENCE_CHARS):
+    splitter = SentenceSplitter(min_chars, max_chars)
+    return splitter.feed(text) + splitter.finish()
+
+
+def speaker_for(voice, user_message):
+    """speak(sentence) -> audio path for a reply to user_message, in one language throughout"""
+    language_code = voice.detect_language_and_context(user_message)['language_code']
+
+    def speak(sentence):
+        return voice.text_to_speech(voice.enhance_chat_response_for_voice(user_message, sentence), language_code)
+    return speak
+
+
+def speak_turn(events, speak):
+    """Chat (event, data) tuples with an `audio` event added per synthesised sentence"""
+    splitter = SentenceSplitter()
+    pending = deque()
+    sentences_sent = 0
+
+    def submit(sentences):
+        nonlocal sentences_sent
+        for sentence in sentences:
+            pending.append((sentences_sent, sentence, tts_executor.submit(speak, sentence)))
+            sentences_sent += 1
+
+    def ready(wait):
+        while pending and (wait or pending[0][2].done()):
+            seq, sentence, future = pending.popleft()
+            path = future.result()
+            yield 'audio', {'seq': seq, 'text': sentence, 'audio_url': f"/audio/{os.path.basename(path)}" if path else None}
+
+    try:
+        for event, data in events:
+            if event == 'token':
+                submit(splitter.feed(data['delta']))
+            elif event == 'done':
+                submit(splitter.finish() if sentences_sent or splitter.buffer.strip() else split_sentences(data['response']))
+            yield event, data
+            yield from ready(wait=event == 'done')
+        yield from ready(wait=True)
+    finally:
+        events.close()
+        for _, _, future in pending:
+            future.cancel()
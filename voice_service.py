@@ -11,8 +11,28 @@ class VoiceService:
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
     
+    def _create_engine(self):
+        """Initialise and configure the pyttsx3 engine (once per worker thread)"""
+        engine = pyttsx3.init()
+        
+        # Configure voice settings
+        try:
+            voices = engine.getProperty('voices')
+            if voices:
+                for voice in voices:
+                    if 'female' in voice.name.lower() or 'woman' in voice.name.lower():
+                        engine.setProperty('voice', voice.id)
+                        break
+        except Exception as e:
+            logging.warning(f"Could not configure voices: {e}")
+        
+        engine.setProperty('rate', 150)
+        engine.setProperty('volume', 0.8)
+        return engine
+
     def _run_loop(self):
         """Worker loop running in a separate thread to manage the voice engine."""
+        engine = None
         try:
             while True:
                 task = self.queue.get()
@@ -21,21 +41,9 @@ class VoiceService:
                 
                 cmd, args, result_holder = task
                 try:
-                    engine = pyttsx3.init()
-                    
-                    # Configure voice settings
-                    try:
-                        voices = engine.getProperty('voices')
-                        if voices:
-                            for voice in voices:
-                                if 'female' in voice.name.lower() or 'woman' in voice.name.lower():
-                                    engine.setProperty('voice', voice.id)
-                                    break
-                    except Exception as e:
-                        logging.warning(f"Could not configure voices: {e}")
-                    
-                    engine.setProperty('rate', 150)
-                    engine.setProperty('volume', 0.8)
+                    # Reused across utterances; only rebuilt after an engine error
+                    if engine is None:
+                        engine = self._create_engine()
                     
                     if cmd == 'say':
                         text = args
@@ -52,9 +60,8 @@ class VoiceService:
                         if result_holder:
                             result_holder['data'] = filename
                             result_holder['event'].set()
-                            
-                    del engine
                 except Exception as e:
+                    engine = None
                     logging.error(f"Voice engine error during {cmd}: {e}")
                     if result_holder:
                         result_holder['error'] = e